@@ -10,15 +10,20 @@ import traceback
 import time
 import sys
 import os
+import io
+import re
 from pprint import pprint
 
 # Import USPTO Parser Functions
 import USPTOLogger
 import USPTOSanitizer
+import USPTOBinaryCopy
 
 # Import the required datbase packages
 import MySQLdb
 import psycopg2
+import psycopg2.extras
+import psycopg2.errorcodes
 
 import pandas as pd
 
@@ -39,6 +44,14 @@ class SQLProcess:
         self._charset = database_args['charset']
         self._conn = None
         self._cursor = None
+        # Tables partitioned by FileName, read from the database when first needed
+        self._partitioned_tables = None
+        # Seconds to wait for the lock on a parent table when creating a partition
+        self.partition_lock_timeout = 10
+        # Rows buffered for batch insertion by table and columns
+        self._insert_buffers = {}
+        # Set if any buffered row of the current file failed to insert
+        self._insert_failed = False
 
     def connect(self):
 
@@ -86,34 +99,95 @@ class SQLProcess:
             table_list = self.get_list_of_all_uspto_tables();
 
 
-    # Load the insert query into the database
-    def load(self, sql, args_array):
-
-        logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+    # Buffers a dictionary row or a record to be inserted into a table.  The rows buffered
+    # for each table are inserted in batches of database_insert_batch_size rows.
+    def insert_row(self, args_array, table_name, insert_data_array):
 
         # Connect to database if not connected
         if self._conn == None:
             self.connect()
 
-        # Execute the query passed into funtion
+        # Rows are buffered by table and columns so each batch uses one statement
+        if isinstance(insert_data_array, dict):
+            columns = tuple(insert_data_array.keys())
+            insert_buffer = self._insert_buffers.setdefault((table_name, columns), [])
+            insert_buffer.append(tuple(insert_data_array.values()))
+        else:
+            columns = insert_data_array._fields
+            insert_buffer = self._insert_buffers.setdefault((table_name, columns), [])
+            insert_buffer.append(tuple(insert_data_array))
+
+        # Insert the rows if the batch is full
+        if len(insert_buffer) >= args_array['database_insert_batch_size']:
+            return self.flush_insert_buffer(args_array, table_name, columns)
+        return True
+
+    # Inserts the rows remaining in all insert buffers.  Returns False if any row
+    # buffered since the last call failed to insert, including the rows of batches
+    # inserted when they were full, so the file is not marked processed.
+    def flush_insert_buffers(self, args_array):
+
+        for table_name, columns in list(self._insert_buffers.keys()):
+            self.flush_insert_buffer(args_array, table_name, columns)
+        inserts_successful = not self._insert_failed
+        self._insert_failed = False
+        return inserts_successful
+
+    # Inserts the rows buffered for a table with one multi-row INSERT.  If the
+    # batch fails the rows are inserted one at a time so only the rows that fail are lost.
+    # Returns False if any row of the batch failed to insert.
+    def flush_insert_buffer(self, args_array, table_name, columns):
+
+        logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+        # Take the rows off the buffer
+        insert_rows = self._insert_buffers.pop((table_name, columns), [])
+        if not len(insert_rows):
+            return True
+
+        # Build the query with parameters for the values
+        sql = "INSERT INTO " + table_name + " (" + ", ".join(columns) + ") VALUES "
+        row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+
         try:
-            self._cursor.execute(sql)
-            #self._conn.commit()
+            # PostgreSQL sends the whole batch in one statement
+            if self.database_type == "postgresql":
+                psycopg2.extras.execute_values(self._cursor, sql + "%s", insert_rows, page_size=len(insert_rows))
+            # MySQL rewrites executemany into a multi-row INSERT
+            elif self.database_type == "mysql":
+                self._cursor.executemany(sql + row_placeholder, insert_rows)
+            return True
+
         except Exception as e:
             # If there is an error and using databse postgresql
-            # Then rollback the commit??
+            # Then rollback the commit
             if self.database_type == "postgresql":
                 self._conn.rollback()
-
-            print("Database INSERT query failed... " + args_array['file_name'] + " into table: " + args_array['table_name'] + " Document ID Number " + args_array['document_id'])
-            logger.error("Database INSERT query failed..." + args_array['file_name'] + " into table: " + args_array['table_name'] + " Document ID Number " + args_array['document_id'])
-            print("Query string: " + sql)
-            logger.error("Query string: " + sql)
+            print("Database batch INSERT failed... " + args_array['file_name'] + " into table: " + table_name + ".  Inserting " + str(len(insert_rows)) + " rows one at a time...")
+            logger.warning("Database batch INSERT failed... " + args_array['file_name'] + " into table: " + table_name + ".  Inserting " + str(len(insert_rows)) + " rows one at a time...")
             traceback.print_exc()
             exc_type, exc_obj, exc_tb = sys.exc_info()
             fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
             logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
 
+        # Insert the rows one at a time and log the rows that fail
+        rows_failed = False
+        for insert_row in insert_rows:
+            try:
+                self._cursor.execute(sql + row_placeholder, insert_row)
+            except Exception as e:
+                if self.database_type == "postgresql":
+                    self._conn.rollback()
+                rows_failed = True
+                self._insert_failed = True
+                print("Database INSERT query failed... " + args_array['file_name'] + " into table: " + table_name + " Document ID Number " + str(insert_row[0]))
+                logger.error("Database INSERT query failed..." + args_array['file_name'] + " into table: " + table_name + " Document ID Number " + str(insert_row[0]))
+                traceback.print_exc()
+                exc_type, exc_obj, exc_tb = sys.exc_info()
+                fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+                logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+        return not rows_failed
+
 
     # This function accepts an array of csv files which need to be inserted
     # using COPY command in postgresql and LOAD INFILE in MySQL
@@ -195,18 +269,10 @@ class SQLProcess:
                         exc_type, exc_obj, exc_tb = sys.exc_info()
                         fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
                         logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
-                        # If the cause was a dupllicate entry error, then try to clean the file
-                        traceback_array = traceback.format_exc().splitlines()
-                        for line in traceback_array:
-                            if "duplicate key" in line:
-                                # Insert the csv file item by item
-                                #self.insert_csv_item_by_item(csv_file_obj['csv_file_name'], args_array)
-                                # Remove the offending line from csv file
-                                self.remove_item_from_csv(traceback_array, csv_file_obj['csv_file_name'], "duplicate_key_violation")
-                            elif "violates not-null constraint" in line:
-                                # Remove the offending line from csv file
-                                self.remove_item_from_csv(traceback_array, csv_file_obj['csv_file_name'], "not_null_violation")
-
+                        # If the cause was a duplicate key or not-null violation then load
+                        # the file through a staging table which reports the rejected rows
+                        if getattr(e, "pgcode", None) in [psycopg2.errorcodes.UNIQUE_VIOLATION, psycopg2.errorcodes.NOT_NULL_VIOLATION]:
+                            return self.load_csv_staged_data(args_array, data_type, csv_file_obj)
 
                         # Return a unsucessful flag
                         if bulk_insert_failed_attempts > 20:
@@ -254,8 +320,209 @@ class SQLProcess:
         return True
 
 
+    # Loads a csv file that violates the table constraints.  The file is copied into
+    # a temporary staging table without constraints, rows with a null in a NOT NULL
+    # column or a duplicate primary key are moved to the BULK_LOAD_ERRORS table, and
+    # the remaining rows are inserted into the table with one INSERT ... SELECT.
+    def load_csv_staged_data(self, args_array, data_type, csv_file_obj):
+
+        logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+        print("[*] Database staged load started for: " + data_type + " from filename: " + csv_file_obj['csv_file_name'])
+        logger.info("[*] Database staged load started for: " + data_type + " from filename: " + csv_file_obj['csv_file_name'])
+
+        # Build the table names
+        table_name = self._dbname + "." + csv_file_obj['table_name']
+        stage_table_name = "STAGE_" + csv_file_obj['table_name']
+        error_table_name = self._dbname + ".BULK_LOAD_ERRORS"
+
+        try:
+            # Make sure the error table exists
+            self.create_bulk_load_error_table()
+
+            # Load the file and move the rows in one transaction
+            self._cursor.execute("BEGIN")
+
+            # Create a staging table with the columns of the table but no constraints
+            self._cursor.execute("CREATE TEMP TABLE " + stage_table_name + " ON COMMIT DROP AS SELECT * FROM " + table_name + " WITH NO DATA")
+            sql = "COPY " + stage_table_name + " FROM STDIN DELIMITER '|' CSV HEADER"
+            with open(csv_file_obj['csv_file_name'], "r", errors='backslashreplace') as csv_file:
+                self._cursor.copy_expert(sql, csv_file)
+
+            # Get the NOT NULL and primary key columns of the table
+            self._cursor.execute("SELECT attname FROM pg_attribute WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped AND attnotnull", (table_name,))
+            not_null_columns = [row[0] for row in self._cursor.fetchall()]
+            self._cursor.execute("SELECT a.attname FROM pg_index i JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey) WHERE i.indrelid = %s::regclass AND i.indisprimary", (table_name,))
+            primary_key_columns = [row[0] for row in self._cursor.fetchall()]
+
+            # Build the condition for each type of rejected row
+            rejected_row_conditions = []
+            if len(not_null_columns):
+                rejected_row_conditions.append(("not_null_violation", " OR ".join(["s." + column + " IS NULL" for column in not_null_columns])))
+            if len(primary_key_columns):
+                # Rows with the same key as an earlier row in the file or a row already in the table
+                primary_key = ", ".join(primary_key_columns)
+                rejected_row_conditions.append(("duplicate_key_violation",
+                    "s.ctid IN (SELECT ctid FROM (SELECT ctid, row_number() OVER (PARTITION BY " + primary_key + " ORDER BY ctid) AS row_number FROM " + stage_table_name + ") d WHERE d.row_number > 1)" +
+                    " OR EXISTS (SELECT 1 FROM " + table_name + " t WHERE " + " AND ".join(["t." + column + " = s." + column for column in primary_key_columns]) + ")"))
+
+            # Move the rejected rows to the error table
+            for violation_type, condition in rejected_row_conditions:
+                self._cursor.execute("INSERT INTO " + error_table_name + " (TableName, FileName, ErrorType, RowData) SELECT %s, %s, %s, row_to_json(s)::text FROM " + stage_table_name + " s WHERE " + condition, (csv_file_obj['table_name'], args_array['file_name'], violation_type))
+                if self._cursor.rowcount > 0:
+                    print("- " + str(self._cursor.rowcount) + " rows with " + violation_type + " moved to " + error_table_name + " from: " + csv_file_obj['csv_file_name'])
+                    logger.warning("- " + str(self._cursor.rowcount) + " rows with " + violation_type + " moved to " + error_table_name + " from: " + csv_file_obj['csv_file_name'])
+                    self._cursor.execute("DELETE FROM " + stage_table_name + " s WHERE " + condition)
+
+            # Insert the remaining rows into the table
+            self._cursor.execute("INSERT INTO " + table_name + " SELECT * FROM " + stage_table_name + " ON CONFLICT DO NOTHING")
+            print("- " + str(self._cursor.rowcount) + " rows inserted into table: " + table_name + " from: " + csv_file_obj['csv_file_name'])
+            logger.info("- " + str(self._cursor.rowcount) + " rows inserted into table: " + table_name + " from: " + csv_file_obj['csv_file_name'])
+
+            # Commit the transaction, which drops the staging table
+            self._cursor.execute("COMMIT")
+            return True
+
+        except Exception as e:
+            # Roll back the transaction started with BEGIN, which also drops the staging table
+            self._cursor.execute("ROLLBACK")
+            print("Database staged load failed... " + csv_file_obj['csv_file_name'] + " into table: " + table_name)
+            logger.error("Database staged load failed..." + csv_file_obj['csv_file_name'] + " into table: " + table_name)
+            traceback.print_exc()
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+            fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+            logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+            return False
+
+    # Create the table that rows rejected by a staged load are written to
+    def create_bulk_load_error_table(self):
+        self._cursor.execute("CREATE TABLE IF NOT EXISTS " + self._dbname + ".BULK_LOAD_ERRORS (TableName VARCHAR(45), FileName VARCHAR(45), ErrorType VARCHAR(45), RowData TEXT, ErrorDate TIMESTAMP DEFAULT NOW())")
+
+    # Copies the rows in a COPY stream memory buffer into the database.  If the
+    # COPY fails, the rows are written to a csv file and loaded with load_csv_bulk_data
+    # which loads files with rows that violate the table constraints through a staging table.
+    def load_copy_stream_data(self, args_array, data_type, csv_file_obj):
+
+        logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+        # Connect to database if not connected
+        if self._conn == None:
+            self.connect()
+
+        # Only copy buffers that have rows for a table
+        if "table_name" not in csv_file_obj:
+            return True
+
+        print("[*] Database COPY stream started for: " + data_type + " from file: " + args_array['file_name'] + " into table: " + csv_file_obj['table_name'])
+        logger.info("[*] Database COPY stream started for: " + data_type + " from file: " + args_array['file_name'] + " into table: " + csv_file_obj['table_name'])
+
+        try:
+            # Binary COPY names the columns since each value is encoded for the column type
+            if csv_file_obj['copy_format'] == "binary":
+                sql = "COPY " + self._dbname + "." + csv_file_obj['table_name'] + " (" + ", ".join(csv_file_obj['csv_writer'].fieldnames) + ") FROM STDIN WITH (FORMAT binary)"
+                self._cursor.copy_expert(sql, io.BytesIO(USPTOBinaryCopy.binary_copy_header + csv_file_obj['file'].getvalue() + USPTOBinaryCopy.binary_copy_trailer))
+            else:
+                sql = "COPY " + self._dbname + "." + csv_file_obj['table_name'] + " FROM STDIN DELIMITER '|' CSV"
+                # Copy the buffer from the start
+                csv_file_obj['file'].seek(0)
+                self._cursor.copy_expert(sql, csv_file_obj['file'])
+            return True
+
+        except Exception as e:
+            # Roll back the transaction
+            self._conn.rollback()
+            print("Database COPY stream failed... " + args_array['file_name'] + " into table: " + csv_file_obj['table_name'] + ".  Loading from .csv file...")
+            logger.error("Database COPY stream failed... " + args_array['file_name'] + " into table: " + csv_file_obj['table_name'] + ".  Loading from .csv file...")
+            traceback.print_exc()
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+            fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+            logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+
+            # Write the buffer to a csv file with a header row
+            csv_file_name = args_array['csv_directory'] + data_type + "_" + args_array['file_name'] + "_stream.csv"
+            with open(csv_file_name, "w", encoding='utf-8-sig', errors='backslashreplace') as csv_file:
+                csv_file.write("|".join(csv_file_obj['csv_writer'].fieldnames) + "\n")
+                if csv_file_obj['copy_format'] == "binary":
+                    csv_file_obj['csv_writer'].write_csv_rows(csv_file)
+                else:
+                    csv_file.write(csv_file_obj['file'].getvalue())
+            # Load the csv file and remove it
+            bulk_insert_successful = self.load_csv_bulk_data(args_array, data_type, { "csv_file_name" : csv_file_name, "table_name" : csv_file_obj['table_name'] })
+            if os.path.exists(csv_file_name):
+                os.remove(csv_file_name)
+            return bulk_insert_successful
+
+    # Returns the tables that hold the records of a file of the call_type
+    def get_file_table_names(self, call_type):
+
+        table_name_array = []
+
+        # Tables with records of patent grants
+        if call_type == "grant":
+            table_name_array = [
+                "GRANT",
+                "INTCLASS_G",
+                "CPCCLASS_G",
+                "USCLASS_G",
+                "INVENTOR_G",
+                "AGENT_G",
+                "ASSIGNEE_G",
+                "APPLICANT_G",
+                "NONPATCIT_G",
+                "EXAMINER_G",
+                "GRACIT_G",
+                "FORPATCIT_G",
+                "FOREIGNPRIORITY_G"
+            ]
+        # Tables with records of patent applications
+        elif call_type == "application":
+            table_name_array = [
+                "APPLICATION",
+                "INTCLASS_A",
+                "USCLASS_A",
+                "CPCCLASS_A",
+                "FOREIGNPRIORITY_A",
+                "AGENT_A",
+                "ASSIGNEE_A",
+                "INVENTOR_A",
+                "APPLICANT_A"
+            ]
+
+        # Tables with records of PAIR data
+        elif call_type == "PAIR":
+            table_name_array = [
+                "TRANSACTION_P",
+                "ADJUSTMENT_P",
+                "ADJUSTMENTDESC_P",
+                "CORRESPONDENCE_P",
+                "CONTINUITYCHILD_P",
+                "CONTINUITYPARENT_P",
+                "EXTENSION_P",
+                "EXTENSIONDESC_P"
+            ]
+
+        # Tables with records of classification data
+        elif call_type == "class":
+            table_name_array = [
+                "USCLASS_C",
+                "CPCCLASS_C",
+                "USCPC_C",
+                "WIPOST3_C"
+            ]
+
+        # Tables with records of patent litigation data
+        elif call_type == "legal":
+            table_name_array = [
+                "CASE_L",
+                "PATENT_L",
+                "ATTORNEY_L",
+                "PARTY_L"
+            ]
+
+        return table_name_array
+
     # Used to remove records from database when a file previously
     # started being processed and did not finish. (when insert duplicate ID error happens)
+    # Returns False if the file cannot be loaded because its partitions were not created.
     def remove_previous_file_records(self, call_type, file_name):
 
         # Set process time
@@ -269,6 +536,10 @@ class SQLProcess:
         if self._conn == None:
             self.connect()
 
+        # Discard any rows buffered for insertion by a failed attempt to process a file
+        self._insert_buffers = {}
+        self._insert_failed = False
+
         # Set the table_name
         table_name = "STARTED_FILES"
 
@@ -346,110 +617,325 @@ class SQLProcess:
             print("- Found previous attempt to process the " + call_type + " file: " + file_name + " in table: " + self._dbname + ".STARTED_FILES")
             logger.info("- Found previous attempt to process the " + call_type + " file:" + file_name + " in table: " + self._dbname + ".STARTED_FILES")
 
-            # Build array to hold all table names to have
-            # records deleted for patent grants
-            if call_type == "grant":
-                table_name_array = [
-                    "GRANT",
-                    "INTCLASS_G",
-                    "CPCCLASS_G",
-                    "USCLASS_G",
-                    "INVENTOR_G",
-                    "AGENT_G",
-                    "ASSIGNEE_G",
-                    "APPLICANT_G",
-                    "NONPATCIT_G",
-                    "EXAMINER_G",
-                    "GRACIT_G",
-                    "FORPATCIT_G",
-                    "FOREIGNPRIORITY_G"
-                ]
-            # Records deleted for patent applications
-            elif call_type == "application":
-                table_name_array = [
-                    "APPLICATION",
-                    "INTCLASS_A",
-                    "USCLASS_A",
-                    "CPCCLASS_A",
-                    "FOREIGNPRIORITY_A",
-                    "AGENT_A",
-                    "ASSIGNEE_A",
-                    "INVENTOR_A",
-                    "APPLICANT_A"
-                ]
-
-            # Records deleted for PAIR data
-            elif call_type == "PAIR":
-                table_name_array = [
-                    "TRANSACTION_P",
-                    "ADJUSTMENT_P",
-                    "ADJUSTMENTDESC_P",
-                    "CORRESPONDENCE_P",
-                    "CONTINUITYCHILD_P",
-                    "CONTINUITYPARENT_P",
-                    "EXTENSION_P",
-                    "EXTENSIONDESC_P"
-                ]
-
-            # Records deleted for classifcation data
-            elif call_type == "class":
-                table_name_array = [
-                    "USCLASS_C",
-                    "CPCCLASS_C",
-                    "USCPC_C",
-                    "WIPOST3_C"
-                ]
-
-            # Records deleted for patent litigation data
-            elif call_type == "legal":
-                table_name_array = [
-                    "CASE_L",
-                    "PATENT_L",
-                    "ATTORNEY_L",
-                    "PARTY_L"
-                ]
+            # Get the tables that hold records of the file
+            table_name_array = self.get_file_table_names(call_type)
+
+            # Remove the rows rejected by staged loads of the file
+            if self.database_type == "postgresql":
+                self.create_bulk_load_error_table()
+                table_name_array.append("BULK_LOAD_ERRORS")
 
             print("- Starting to remove previous attempt to process the " + call_type + " file: " + file_name + " in table: " + self._dbname + ".STARTED_FILES")
             logger.info("- Starting to remove previous attempt to process the " + call_type + " file:" + file_name + " in table: " + self._dbname + ".STARTED_FILES")
 
-            # Loop through each table_name defined by call_type
-            for table_name in table_name_array:
+            # Delete the records from all tables in one transaction with PostgreSQL
+            if self.database_type == "postgresql":
+                if self.delete_file_records_in_transaction(call_type, file_name, table_name_array) == False:
+                    return False
 
-                # Build the SQL query here
-                remove_previous_record_sql = "DELETE FROM " + self._dbname + "." + table_name + " WHERE FileName = %s"
-                # Create query params
-                params = (file_name,)
+            # MySQL deletes the records from each table separately
+            else:
+                # Loop through each table_name defined by call_type
+                for table_name in table_name_array:
 
-                # Set flag to determine if the query was successful
-                records_deleted = False
-                records_deleted_failed_attempts = 1
-                # Loop until the file was successfully deleted
-                # NOTE : Used because MySQL has table lock errors
-                while records_deleted == False and records_deleted_failed_attempts < 10:
-                    # Execute the query pass into funtion
-                    try:
-                        self._cursor.execute(remove_previous_record_sql, params)
-                        records_deleted = True
-                        #TODO: check the numer of records deleted from each table and log/print
-                        # Print and log finished check for previous attempt to process file
-                        print("- Finished database delete of previous attempt to process the " + call_type + " file: " + file_name + " table: " + table_name)
-                        logger.info("- Finished database delete of previous attempt to process the " + call_type + " file:" + file_name + " table: " + table_name)
+                    # Build the SQL query here
+                    remove_previous_record_sql = "DELETE FROM " + self._dbname + "." + table_name + " WHERE FileName = %s"
+                    # Create query params
+                    params = (file_name,)
 
-                    except Exception as e:
+                    # Set flag to determine if the query was successful
+                    records_deleted = False
+                    records_deleted_failed_attempts = 1
+                    # Loop until the file was successfully deleted
+                    # NOTE : Used because MySQL has table lock errors
+                    while records_deleted == False and records_deleted_failed_attempts < 10:
+                        # Execute the query pass into funtion
+                        try:
+                            self._cursor.execute(remove_previous_record_sql, params)
+                            records_deleted = True
+                            #TODO: check the numer of records deleted from each table and log/print
+                            # Print and log finished check for previous attempt to process file
+                            print("- Finished database delete of previous attempt to process the " + call_type + " file: " + file_name + " table: " + table_name)
+                            logger.info("- Finished database delete of previous attempt to process the " + call_type + " file:" + file_name + " table: " + table_name)
+
+                        except Exception as e:
+
+                            print("[X] Database delete attempt " + str(records_deleted_failed_attempts) + " failed... " + file_name + " from table: " + table_name)
+                            logger.error("[X] Database delete attempt " + str(records_deleted_failed_attempts) + " failed..." + file_name + " from table: " + table_name)
+                            # Increment the failed attempts
+                            records_deleted_failed_attempts += 1
+                            traceback.print_exc()
+                            exc_type, exc_obj, exc_tb = sys.exc_info()
+                            fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+                            logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+                            time.sleep(records_deleted_failed_attempts)
+
+                    # Fail the file instead of loading it on top of the previous records
+                    if records_deleted == False:
+                        print("[X] Database delete of previous attempt to process the " + call_type + " file failed... " + file_name + " table: " + table_name + ". The file will not be loaded.")
+                        logger.error("[X] Database delete of previous attempt to process the " + call_type + " file failed... " + file_name + " table: " + table_name + ". The file will not be loaded.")
+                        return False
+
+        # Create the partitions for the file in tables partitioned by FileName
+        if self.database_type == "postgresql":
+            return self.create_file_partitions(call_type, file_name)
+        return True
 
-                        # If there is an error and using databse postgresql
-                        # Then rollback the commit??
-                        if self.database_type == "postgresql":
-                            self._conn.rollback()
-                        print("[X] Database delete attempt " + str(records_deleted_failed_attempts) + " failed... " + file_name + " from table: " + table_name)
-                        logger.error("[X] Database delete attempt " + str(records_deleted_failed_attempts) + " failed..." + file_name + " from table: " + table_name)
-                        # Increment the failed attempts
-                        records_deleted_failed_attempts += 1
-                        traceback.print_exc()
-                        exc_type, exc_obj, exc_tb = sys.exc_info()
-                        fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
-                        logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
 
+    # Deletes all records of a file from the tables in one transaction so a failed
+    # attempt leaves no table partly cleaned.  Each delete uses the FileName index
+    # of the table, and tables partitioned by FileName truncate the file's partition.
+    # Returns False if the records could not be deleted so the file is not loaded again.
+    def delete_file_records_in_transaction(self, call_type, file_name, table_name_array):
+
+        logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+        # Set flag to determine if the transaction was successful
+        records_deleted = False
+        records_deleted_failed_attempts = 1
+        # Loop until the records were successfully deleted
+        while records_deleted == False and records_deleted_failed_attempts < 10:
+            try:
+                self._cursor.execute("BEGIN")
+                for table_name in table_name_array:
+                    # Empty the partition of the file if the table is partitioned by FileName
+                    partition_name = self.get_file_partition_name(table_name, file_name)
+                    if table_name.lower() in self.get_partitioned_tables() and self.table_exists(partition_name):
+                        self._cursor.execute("TRUNCATE " + self._dbname + "." + partition_name)
+                        print("- Truncated partition of previous attempt to process the " + call_type + " file: " + file_name + " table: " + partition_name)
+                        logger.info("- Truncated partition of previous attempt to process the " + call_type + " file:" + file_name + " table: " + partition_name)
+                    else:
+                        self._cursor.execute("DELETE FROM " + self._dbname + "." + table_name + " WHERE FileName = %s", (file_name,))
+                        print("- Deleted " + str(self._cursor.rowcount) + " records of previous attempt to process the " + call_type + " file: " + file_name + " table: " + table_name)
+                        logger.info("- Deleted " + str(self._cursor.rowcount) + " records of previous attempt to process the " + call_type + " file:" + file_name + " table: " + table_name)
+                self._cursor.execute("COMMIT")
+                records_deleted = True
+                # Print and log finished check for previous attempt to process file
+                print("- Finished database delete of previous attempt to process the " + call_type + " file: " + file_name)
+                logger.info("- Finished database delete of previous attempt to process the " + call_type + " file:" + file_name)
+
+            except Exception as e:
+                # Roll back the transaction started with BEGIN
+                self._cursor.execute("ROLLBACK")
+                print("[X] Database delete attempt " + str(records_deleted_failed_attempts) + " failed... " + file_name)
+                logger.error("[X] Database delete attempt " + str(records_deleted_failed_attempts) + " failed..." + file_name)
+                # Increment the failed attempts and wait before trying again
+                records_deleted_failed_attempts += 1
+                traceback.print_exc()
+                exc_type, exc_obj, exc_tb = sys.exc_info()
+                fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+                logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+                time.sleep(records_deleted_failed_attempts)
+
+        # Fail the file instead of loading it on top of the previous records
+        if records_deleted == False:
+            print("[X] Database delete of previous attempt to process the " + call_type + " file failed... " + file_name + ". The file will not be loaded.")
+            logger.error("[X] Database delete of previous attempt to process the " + call_type + " file failed... " + file_name + ". The file will not be loaded.")
+
+        return records_deleted
+
+    # Returns the names of the tables in the database that are partitioned
+    def get_partitioned_tables(self):
+        if self._partitioned_tables is None:
+            self._cursor.execute("SELECT c.relname FROM pg_catalog.pg_partitioned_table p JOIN pg_catalog.pg_class c ON c.oid = p.partrelid JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = %s", (self._dbname,))
+            self._partitioned_tables = [row[0].lower() for row in self._cursor.fetchall()]
+        return self._partitioned_tables
+
+    # Returns True if the table exists in the database
+    def table_exists(self, table_name):
+        self._cursor.execute("SELECT to_regclass(%s)", (self._dbname + "." + table_name,))
+        return self._cursor.fetchone()[0] is not None
+
+    # Returns the name of the partition of a table that holds the records of a file
+    def get_file_partition_name(self, table_name, file_name):
+        return (table_name + "_" + re.sub(r"\W", "_", file_name)).lower()[:63]
+
+    # Creates the partition for a file in each table partitioned by FileName.
+    # Each partition is created in its own short transaction before any rows of
+    # the file are written.  The ACCESS EXCLUSIVE lock on the parent table is taken
+    # first so the transaction never waits to upgrade a weaker lock held by itself,
+    # and lock_timeout keeps it from blocking the loads of other processes for long.
+    # The records of a previous attempt were removed from the default partition by
+    # remove_previous_file_records.  Returns False if a partition could not be
+    # created so the file is not loaded into the default partition.
+    def create_file_partitions(self, call_type, file_name):
+
+        logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+        for table_name in self.get_file_table_names(call_type):
+            if table_name.lower() not in self.get_partitioned_tables():
+                continue
+            partition_name = self.get_file_partition_name(table_name, file_name)
+            if self.table_exists(partition_name):
+                continue
+
+            # Set flag to determine if the partition was created
+            partition_created = False
+            partition_failed_attempts = 1
+            # Loop until the partition was created
+            while partition_created == False and partition_failed_attempts < 10:
+                try:
+                    self._cursor.execute("BEGIN")
+                    self._cursor.execute("SET LOCAL lock_timeout = '" + str(self.partition_lock_timeout) + "s'")
+                    self._cursor.execute("LOCK TABLE " + self._dbname + "." + table_name + " IN ACCESS EXCLUSIVE MODE")
+                    self._cursor.execute("CREATE TABLE IF NOT EXISTS " + self._dbname + "." + partition_name + " PARTITION OF " + self._dbname + "." + table_name + " FOR VALUES IN (%s)", (file_name,))
+                    self._cursor.execute("COMMIT")
+                    partition_created = True
+                    print("- Created partition for the " + call_type + " file: " + file_name + " table: " + partition_name)
+                    logger.info("- Created partition for the " + call_type + " file:" + file_name + " table: " + partition_name)
+
+                except Exception as e:
+                    # Roll back the transaction started with BEGIN
+                    self._cursor.execute("ROLLBACK")
+                    print("[X] Database partition creation attempt " + str(partition_failed_attempts) + " failed... " + file_name + " table: " + partition_name)
+                    logger.error("[X] Database partition creation attempt " + str(partition_failed_attempts) + " failed..." + file_name + " table: " + partition_name)
+                    # Increment the failed attempts and wait before trying again
+                    partition_failed_attempts += 1
+                    traceback.print_exc()
+                    exc_type, exc_obj, exc_tb = sys.exc_info()
+                    fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+                    logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+                    time.sleep(partition_failed_attempts)
+
+            # Fail the file instead of loading it into the default partition
+            if partition_created == False:
+                print("[X] Database partition creation failed... " + file_name + " table: " + partition_name + ". The file will not be loaded.")
+                logger.error("[X] Database partition creation failed... " + file_name + " table: " + partition_name + ". The file will not be loaded.")
+                return False
+
+        return True
+
+    # Create the table that stores the definitions of the primary keys and
+    # indexes dropped for an initial load until they are rebuilt
+    def create_deferred_index_table(self):
+        self._cursor.execute("CREATE TABLE IF NOT EXISTS " + self._dbname + ".DEFERRED_INDEXES (TableName VARCHAR(100), IndexName VARCHAR(100), IndexType VARCHAR(20), Definition TEXT, PRIMARY KEY (IndexName))")
+
+    # Saves the definitions of the primary keys, unique constraints and secondary
+    # indexes of the data tables and drops them so the initial load does not
+    # maintain them row by row.  The FileName indexes are kept since they are
+    # used to remove the records of a file that is processed again.
+    def defer_table_indexes(self):
+
+        logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+        print("[Dropping primary keys and indexes for initial load...]")
+        logger.info("[Dropping primary keys and indexes for initial load...]")
+
+        # Connect to database if not connected
+        if self._conn == None:
+            self.connect()
+
+        # Tables that keep their primary keys and indexes
+        excluded_tables = ('started_files', 'bulk_load_errors', 'deferred_indexes', 'parser_verification')
+
+        try:
+            self.create_deferred_index_table()
+            self._cursor.execute("BEGIN")
+
+            # Primary key and unique constraints of the top level tables
+            self._cursor.execute("SELECT c.relname, con.conname, pg_get_constraintdef(con.oid) FROM pg_catalog.pg_constraint con JOIN pg_catalog.pg_class c ON c.oid = con.conrelid JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = %s AND con.contype IN ('p', 'u') AND NOT c.relispartition AND c.relname NOT IN %s", (self._dbname, excluded_tables))
+            deferred_index_array = [[row[0], row[1], "constraint", row[2]] for row in self._cursor.fetchall()]
+            # Secondary indexes of the top level tables that do not belong to a constraint
+            self._cursor.execute("SELECT c.relname, i.relname, pg_get_indexdef(i.oid) FROM pg_catalog.pg_index x JOIN pg_catalog.pg_class i ON i.oid = x.indexrelid JOIN pg_catalog.pg_class c ON c.oid = x.indrelid JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = %s AND NOT i.relispartition AND i.relname NOT LIKE %s AND c.relname NOT IN %s AND NOT EXISTS (SELECT 1 FROM pg_catalog.pg_constraint con WHERE con.conindid = x.indexrelid)", (self._dbname, "%_filename_idx", excluded_tables))
+            deferred_index_array += [[row[0], row[1], "index", row[2]] for row in self._cursor.fetchall()]
+
+            # Save each definition and drop the constraint or index
+            for table_name, index_name, index_type, definition in deferred_index_array:
+                self._cursor.execute("INSERT INTO " + self._dbname + ".DEFERRED_INDEXES (TableName, IndexName, IndexType, Definition) VALUES (%s, %s, %s, %s) ON CONFLICT DO NOTHING", (table_name, index_name, index_type, definition))
+                if index_type == "constraint":
+                    self._cursor.execute("ALTER TABLE " + self._dbname + "." + table_name + " DROP CONSTRAINT IF EXISTS " + index_name)
+                else:
+                    self._cursor.execute("DROP INDEX IF EXISTS " + self._dbname + "." + index_name)
+                print("- Dropped " + index_type + " " + index_name + " on table: " + table_name)
+                logger.info("- Dropped " + index_type + " " + index_name + " on table: " + table_name)
+
+            self._cursor.execute("COMMIT")
+            return True
+
+        except Exception as e:
+            # Roll back the transaction started with BEGIN
+            self._cursor.execute("ROLLBACK")
+            print("[X] Database drop of primary keys and indexes for initial load failed...")
+            logger.error("[X] Database drop of primary keys and indexes for initial load failed...")
+            traceback.print_exc()
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+            fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+            logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+            return False
+
+    # Returns the primary keys and indexes waiting to be rebuilt after an initial load
+    def get_deferred_indexes(self):
+
+        # Connect to database if not connected
+        if self._conn == None:
+            self.connect()
+
+        # The table only exists if an initial load was started
+        if not self.table_exists("DEFERRED_INDEXES"):
+            return []
+        self._cursor.execute("SELECT TableName, IndexName, IndexType, Definition FROM " + self._dbname + ".DEFERRED_INDEXES")
+        return [list(row) for row in self._cursor.fetchall()]
+
+    # Moves the rows that have the same key as an earlier row to the BULK_LOAD_ERRORS
+    # table so a primary key or unique constraint can be added to the table
+    def remove_duplicate_keys(self, table_name, definition):
+
+        logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+        # Get the key columns from the constraint definition
+        key_columns = re.search(r"\((.*)\)", definition).group(1)
+        # Rows after the first row with each key.  Partitioned tables
+        # need the tableoid since the ctid is only unique in a partition.
+        duplicate_condition = "(s.tableoid, s.ctid) IN (SELECT tableoid, ctid FROM (SELECT tableoid, ctid, row_number() OVER (PARTITION BY " + key_columns + " ORDER BY tableoid, ctid) AS row_number FROM " + self._dbname + "." + table_name + ") d WHERE d.row_number > 1)"
+
+        self.create_bulk_load_error_table()
+        self._cursor.execute("BEGIN")
+        self._cursor.execute("INSERT INTO " + self._dbname + ".BULK_LOAD_ERRORS (TableName, FileName, ErrorType, RowData) SELECT %s, row_to_json(s)->>'filename', 'duplicate_key_violation', row_to_json(s)::text FROM " + self._dbname + "." + table_name + " s WHERE " + duplicate_condition, (table_name.upper(),))
+        duplicate_count = self._cursor.rowcount
+        if duplicate_count > 0:
+            self._cursor.execute("DELETE FROM " + self._dbname + "." + table_name + " s WHERE " + duplicate_condition)
+        self._cursor.execute("COMMIT")
+
+        print("- Moved " + str(duplicate_count) + " rows with duplicate keys from table: " + table_name + " to " + self._dbname + ".BULK_LOAD_ERRORS")
+        logger.info("- Moved " + str(duplicate_count) + " rows with duplicate keys from table: " + table_name + " to " + self._dbname + ".BULK_LOAD_ERRORS")
+
+    # Set the memory used by this connection to build indexes
+    def set_maintenance_work_mem(self, maintenance_work_mem):
+        # Connect to database if not connected
+        if self._conn == None:
+            self.connect()
+        self._cursor.execute("SET maintenance_work_mem = %s", (maintenance_work_mem,))
+
+    # Rebuilds a primary key or index dropped for an initial load
+    def rebuild_deferred_index(self, table_name, index_name, index_type, definition):
+
+        logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+        # Set process time
+        start_time = time.time()
+
+        try:
+            if index_type == "constraint":
+                # Remove rows that would violate the constraint
+                self.remove_duplicate_keys(table_name, definition)
+                self._cursor.execute("ALTER TABLE " + self._dbname + "." + table_name + " ADD CONSTRAINT " + index_name + " " + definition)
+            # Skip the index if it was created before an earlier attempt failed
+            elif not self.table_exists(index_name):
+                self._cursor.execute(definition)
+            self._cursor.execute("DELETE FROM " + self._dbname + ".DEFERRED_INDEXES WHERE IndexName = %s", (index_name,))
+            print("- Rebuilt " + index_type + " " + index_name + " on table: " + table_name + " Time: " + str(time.time() - start_time))
+            logger.info("- Rebuilt " + index_type + " " + index_name + " on table: " + table_name + " Time: " + str(time.time() - start_time))
+            return True
+
+        except Exception as e:
+            # Roll back the transaction if one was started
+            self._cursor.execute("ROLLBACK")
+            print("[X] Database rebuild of " + index_type + " " + index_name + " on table: " + table_name + " failed...")
+            logger.error("[X] Database rebuild of " + index_type + " " + index_name + " on table: " + table_name + " failed...")
+            traceback.print_exc()
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+            fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+            logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+            return False
 
     # Get a list of all tables in the uspto database
     def get_list_of_all_uspto_tables(self):
@@ -516,42 +1002,6 @@ class SQLProcess:
         print('[*] Connection to database closed successfully.')
         logger.info('[*] Connection to database closed successfully.')
 
-    # Searches a csv file and extracts any items with the ID in traceback string
-    def remove_item_from_csv(self, traceback_array, csv_file_name, violation_type):
-
-        # Set process time
-        start_time = time.time()
-
-        logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
-        print("[Looking for error lines in file " + csv_file_name + "]")
-        logger.warning("[Looking for error lines in file " + csv_file_name + "]")
-
-        # Search traceback_array for the item ID
-        for line in traceback_array:
-            # Find the line that indicates the line of csv file
-            # that causese error
-            if line.startswith("CONTEXT:"):
-                # Get the error line number
-                error_line = line.split("line")[1].strip()
-                if not error_line.isnumeric(): error_line = error_line.split(":")[0]
-                print("- Error line number in file " + csv_file_name + " identified as line number " + error_line)
-                logger.warning("- Error line number in file " + csv_file_name + " identified as line number " + error_line)
-
-                # Open original file in read only mode and dummy file in write mode
-                with open(csv_file_name, 'r') as read_file:
-                    # Pass the file contents into an array
-                    csv_file_array = read_file.readlines()
-                    # Pop off the error line
-                    del csv_file_array[int(error_line) - 1]
-                    #csv_file_array.pop(error_line - 1)
-                # Open the file again with write permissions
-                with open(csv_file_name, 'w') as write_file:
-                    for line in csv_file_array:
-                        write_file.write(line)
-
-                print("- Error line " + error_line + " has been found and removed from: " + csv_file_name)
-                logger.warning("- Error line " + error_line + " has been found and removed from: " + csv_file_name)
-
     # This function will open the csv file and then
     # load it into the database item by item
     def insert_csv_item_by_item(self, csv_file, args_array):
@@ -583,10 +1033,13 @@ class SQLProcess:
             insert_values = item.split("|")
             for i in range(len(fields)):
                 insert_dict[fields[i]] = insert_values[i]
-            # Build a sql query string for the item
-            sql = self.build_sql_insert_query(insert_dict, args_array)
             # Submit the item to database insertion
-            self.load(sql, args_array)
+            table_name = insert_dict['table_name']
+            del insert_dict['table_name']
+            self.insert_row(args_array, table_name, insert_dict)
+
+        # Insert the remaining buffered items
+        self.flush_insert_buffers(args_array)
 
         print("[Completed item-by-item insertion for csv file " + csv_file + "...]")
         logger.info("[Completed item-by-item insertion for csv file " + csv_file + "...]")
@@ -609,71 +1062,6 @@ class SQLProcess:
         return self._dbname + "." + table_name + table_ext
 
 
-    # This function accepts a table name and a dictionary
-    # with keys as column names and values as data.
-    # It builds an sql query out of this array.
-    def build_sql_insert_query(self, insert_data_array, args_array):
-
-        logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
-        # Get the XML format
-        uspto_xml_format = args_array['uspto_xml_format']
-
-        # Set a length counter used to find when the last item is appended to query string
-        array_length_counter = 1
-        length_of_array = len(insert_data_array) - 1
-        # Pass the table name to variable
-        table_name = insert_data_array['table_name']
-        # Pop the table name off the array to be stored into database
-        del insert_data_array['table_name']
-
-        sql_query_string = "INSERT INTO " + table_name + " "
-        sql_column_string = "("
-        sql_value_string = " VALUES ("
-        # Concatenate the list of keys and values to sql format
-        for key, value in list(insert_data_array.items()):
-
-            # Don't escape values that are None (NULL)
-            if value is not None and isinstance(value, int) == False:
-                # Escape all values for sql insertion
-                value = USPTOSanitizer.escape_value_for_sql(str(value.encode('utf-8')))
-                # Since postgresql uses `$` as delimiter, must  strip from first and last char
-                value = value.strip("$").replace("$$$", "$").replace("$$", "$")
-
-            # If the last item in the array then append line without comma at end
-            if length_of_array == array_length_counter:
-                sql_column_string += key
-                # Check for None value and append
-                if value == None:
-                    sql_value_string += 'NULL'
-                else:
-                    # PostgreSQL strings will be escaped slightly different than MySQL
-                    if args_array['database_type'] == 'postgresql':
-                        sql_value_string += "$$" + str(value)+ "$$"
-                    elif args_array['database_type'] == 'mysql':
-                        sql_value_string += '"' + str(value) + '"'
-            # If not the last item then append with comma
-            else:
-                sql_column_string += key + ", "
-                # Check if value is None
-                if value == None:
-                    sql_value_string +=  'NULL,'
-                else:
-                    if args_array['database_type'] == 'postgresql':
-                        sql_value_string +=  "$$" + str(value) + "$$,"
-                    elif args_array['database_type'] == 'mysql':
-                        sql_value_string += '"' + str(value) + '",'
-            array_length_counter += 1
-        # Add the closing bracket
-        sql_column_string += ") "
-        sql_value_string += ");"
-
-        # Concatenate the pieces of the query
-        sql_query_string += sql_column_string + sql_value_string
-        logger.info(sql_query_string)
-        # Return the query string
-        return sql_query_string
-
-
     # Check if PARSER_VERIFICATION table exists and if not create it
     def checkParserVerificationTable(self, args_array):
 
@@ -0,0 +1,122 @@
+# USPTOBinaryCopy.py
+# USPTO Bulk Data Parser - PostgreSQL Binary COPY Writer
+# Description: Imported to USPTOCSVHandler.py.  Encodes rows in the PostgreSQL binary COPY
+# format so dates, integers and text are sent to the database without string formatting.
+# Author: Joseph Lee
+# Email: joseph@ripplesoftware.ca
+# Website: www.ripplesoftware.ca
+# Github: www.github.com/rippledj/uspto
+
+# Import Python Modules
+import struct
+import datetime
+import csv
+
+# Import USPTO Parser Functions
+import USPTOLogger
+
+# The signature, flags and header extension length that start a binary COPY stream
+binary_copy_header = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+# The field count of -1 that ends a binary COPY stream
+binary_copy_trailer = struct.pack("!h", -1)
+# The field length that marks a null value
+binary_copy_null = struct.pack("!i", -1)
+# PostgreSQL dates are stored as days since 2000-01-01
+postgresql_epoch_date = datetime.date(2000, 1, 1)
+
+# Convert a date value to a datetime.date
+def convert_date_value(value):
+    if isinstance(value, datetime.date): return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+# Encode a value for an INT column
+def encode_int_value(value):
+    return struct.pack("!i", int(value))
+
+# Encode a value for a DATE column
+def encode_date_value(value):
+    return struct.pack("!i", (convert_date_value(value) - postgresql_epoch_date).days)
+
+# Encode a value for a BOOLEAN column
+def encode_boolean_value(value):
+    if str(value).lower() in ["1", "true", "t", "y"]: return b"\x01"
+    else: return b"\x00"
+
+# Encode a value for a VARCHAR or TEXT column
+def encode_text_value(value):
+    return str(value).encode("utf-8", errors="backslashreplace")
+
+# Decode a value from an INT column to text
+def decode_int_value(data):
+    return str(struct.unpack("!i", data)[0])
+
+# Decode a value from a DATE column to text
+def decode_date_value(data):
+    return (postgresql_epoch_date + datetime.timedelta(days=struct.unpack("!i", data)[0])).isoformat()
+
+# Decode a value from a BOOLEAN column to text
+def decode_boolean_value(data):
+    if data == b"\x01": return "true"
+    else: return "false"
+
+# Decode a value from a VARCHAR or TEXT column to text
+def decode_text_value(data):
+    return data.decode("utf-8")
+
+# Encoder and decoder for each SQL column type.  Other types are sent as text.
+binary_copy_types = {
+    "INT" : (encode_int_value, decode_int_value),
+    "DATE" : (encode_date_value, decode_date_value),
+    "BOOLEAN" : (encode_boolean_value, decode_boolean_value)
+}
+
+# Returns the encoder and decoder for a column
+def get_binary_copy_coders(field_name, column_types):
+    return binary_copy_types.get(column_types.get(field_name.lower(), "VARCHAR"), (encode_text_value, decode_text_value))
+
+# Writes dictionary rows, or records with the columns in fieldnames order, to a buffer
+# as binary COPY tuples.  Has the writerow method and fieldnames of csv.DictWriter so
+# it can be used in place of one.  The header and trailer are added when the buffer
+# is copied into the database.
+class BinaryCopyWriter:
+
+    def __init__(self, buffer, fieldnames, column_types):
+        self.buffer = buffer
+        self.fieldnames = fieldnames
+        self.coders = [get_binary_copy_coders(field_name, column_types) for field_name in fieldnames]
+        self.field_count = struct.pack("!h", len(fieldnames))
+
+    # Encode the row and write it to the buffer.  The whole row is encoded
+    # before writing so a value that cannot be encoded does not leave part of a row.
+    def writerow(self, row):
+        if isinstance(row, dict):
+            row = map(row.get, self.fieldnames)
+        encoded_row = [self.field_count]
+        for value, coders in zip(row, self.coders):
+            if value is None or value == "":
+                encoded_row.append(binary_copy_null)
+            else:
+                data = coders[0](value)
+                encoded_row.append(struct.pack("!i", len(data)))
+                encoded_row.append(data)
+        self.buffer.write(b"".join(encoded_row))
+
+    # Decode the binary COPY tuples in the buffer and write them to a
+    # pipe-delimited csv file in the same format as the csv.DictWriter files
+    def write_csv_rows(self, csv_file):
+        csv_writer = csv.writer(csv_file, delimiter = '|', lineterminator = "\n")
+        data = self.buffer.getvalue()
+        offset = 0
+        while offset < len(data):
+            field_count = struct.unpack_from("!h", data, offset)[0]
+            offset += 2
+            row = []
+            for coders in self.coders[:field_count]:
+                length = struct.unpack_from("!i", data, offset)[0]
+                offset += 4
+                if length == -1:
+                    row.append(None)
+                else:
+                    row.append(coders[1](data[offset:offset + length]))
+                    offset += length
+            csv_writer.writerow(row)
@@ -0,0 +1,143 @@
+# USPTOBulkLoader.py
+# USPTO Bulk Data Parser - Parallel Bulk Loader
+# Description: Imported to the USPTOProcess modules.  Loads the csv file of each table
+# over a pool of database connections so the loads of different tables overlap, and
+# loads the csv files of one file in the background while the next file is parsed.
+# Author: Joseph Lee
+# Email: joseph@ripplesoftware.ca
+# Website: www.ripplesoftware.ca
+# Github: www.github.com/rippledj/uspto
+
+# Import Python Modules
+import time
+import traceback
+import os
+import sys
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+
+# Import USPTO Parser Functions
+import USPTOLogger
+import USPTOCSVHandler
+import SQLProcessor
+
+# The pool of database connections and threads used for the bulk loads in this process
+bulk_load_connections = None
+bulk_load_executor = None
+bulk_load_pool_lock = threading.Lock()
+# Runs the pipelined file loads in this process one at a time
+pipeline_executor = None
+
+# Returns the thread pool used for the bulk loads, and creates the pool of
+# database connections on the first call.  The connections connect when first used.
+def get_bulk_load_executor(args_array):
+
+    global bulk_load_connections, bulk_load_executor
+
+    with bulk_load_pool_lock:
+        if bulk_load_executor is None:
+            bulk_load_connections = queue.Queue()
+            for i in range(args_array['bulk_load_connections']):
+                bulk_load_connections.put(SQLProcessor.SQLProcess(args_array['database_args']))
+            bulk_load_executor = ThreadPoolExecutor(max_workers=args_array['bulk_load_connections'])
+    return bulk_load_executor
+
+# Close the database connections in the pool
+def close_bulk_load_pool():
+
+    global bulk_load_connections, bulk_load_executor, pipeline_executor
+
+    if pipeline_executor is not None:
+        pipeline_executor.shutdown()
+        pipeline_executor = None
+    if bulk_load_executor is not None:
+        bulk_load_executor.shutdown()
+        bulk_load_executor = None
+        while not bulk_load_connections.empty():
+            bulk_load_connections.get().close()
+        bulk_load_connections = None
+
+# Load one csv file into the database on a connection from the pool
+def load_csv_file(args_array, key, csv_file):
+
+    database_connection = bulk_load_connections.get()
+    try:
+        return database_connection.load_csv_bulk_data(args_array, key, csv_file)
+    finally:
+        bulk_load_connections.put(database_connection)
+
+# Remove the records of a previous attempt to process the file, then
+# load the csv file of each table in parallel.  Returns False if any load failed.
+def load_csv_files(args_array):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    executor = get_bulk_load_executor(args_array)
+
+    # Check for previous attempt to process the file and clean database if required
+    database_connection = bulk_load_connections.get()
+    try:
+        if database_connection.remove_previous_file_records(args_array['document_type'], args_array['file_name']) == False:
+            return False
+    finally:
+        bulk_load_connections.put(database_connection)
+
+    # Start the largest files first so the longest loads do not finish last
+    csv_file_array = [(key, csv_file) for key, csv_file in args_array['csv_file_array'].items() if "table_name" in csv_file]
+    csv_file_array.sort(key=lambda item: os.path.getsize(item[1]['csv_file_name']), reverse=True)
+
+    # Load each csv file on a connection from the pool
+    load_futures = []
+    for key, csv_file in csv_file_array:
+        load_futures.append((csv_file, executor.submit(load_csv_file, args_array, key, csv_file)))
+
+    # Wait for all loads and check they all succeeded
+    file_processed = True
+    for csv_file, load_future in load_futures:
+        try:
+            if load_future.result() == False:
+                file_processed = False
+        except Exception as e:
+            file_processed = False
+            print("[X] Database bulk load failed... " + csv_file['csv_file_name'] + " into table: " + csv_file['table_name'])
+            logger.error("[X] Database bulk load failed... " + csv_file['csv_file_name'] + " into table: " + csv_file['table_name'])
+            traceback.print_exc()
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+            fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+            logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+
+    return file_processed
+
+# Returns True if the bulk load of a file can run while the next file is parsed.
+# Streamed COPY loads the data while the file is parsed so is not pipelined.
+def is_pipeline_mode(args_array):
+    return args_array['database_pipeline_load'] == True and "database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk" and not USPTOCSVHandler.is_copy_stream_mode(args_array)
+
+# Run the function that loads a parsed file in the background and return a Future
+# of its result.  The loads run one at a time so at most one file is being
+# loaded while the next file is parsed.
+def start_pipelined_load(load_function, args_array, start_time):
+
+    global pipeline_executor
+
+    if pipeline_executor is None:
+        pipeline_executor = ThreadPoolExecutor(max_workers=1)
+    # Copy args_array since the process changes it for the next file
+    return pipeline_executor.submit(load_function, dict(args_array), start_time)
+
+# Wait for a pipelined load to finish and return its result
+def wait_for_pipelined_load(load_future):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    try:
+        return load_future.result()
+    except Exception as e:
+        print("[X] Pipelined bulk load failed...")
+        logger.error("[X] Pipelined bulk load failed...")
+        traceback.print_exc()
+        exc_type, exc_obj, exc_tb = sys.exc_info()
+        fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+        logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+        return False
@@ -8,6 +8,8 @@
 
 # Import Python Modules
 import csv
+import io
+import re
 import time
 import traceback
 import os
@@ -15,11 +17,140 @@ import sys
 
 # Import USPTO Parser Functions
 import USPTOLogger
-
-# Function used to open the required csv files and create a csv.DictWrite object
+import USPTOParquetHandler
+import USPTOBinaryCopy
+import USPTORecords
+
+# Database table for each csv file key and file type
+csv_table_names = {
+    "grant" : {
+        "grant" : "uspto.GRANT",
+        "applicant" : "uspto.APPLICANT_G",
+        "examiner" : "uspto.EXAMINER_G",
+        "agent" : "uspto.AGENT_G",
+        "assignee" : "uspto.ASSIGNEE_G",
+        "inventor" : "uspto.INVENTOR_G",
+        "gracit" : "uspto.GRACIT_G",
+        "forpatcit" : "uspto.FORPATCIT_G",
+        "nonpatcit" : "uspto.NONPATCIT_G",
+        "usclass" : "uspto.USCLASS_G",
+        "intclass" : "uspto.INTCLASS_G",
+        "cpcclass" : "uspto.CPCCLASS_G",
+        "foreignpriority" : "uspto.FOREIGNPRIORITY_G"
+    },
+    "application" : {
+        "application" : "uspto.APPLICATION",
+        "agent" : "uspto.AGENT_A",
+        "assignee" : "uspto.ASSIGNEE_A",
+        "inventor" : "uspto.INVENTOR_A",
+        "applicant" : "uspto.APPLICANT_A",
+        "usclass" : "uspto.USCLASS_A",
+        "intclass" : "uspto.INTCLASS_A",
+        "cpcclass" : "uspto.CPCCLASS_A",
+        "foreignpriority" : "uspto.FOREIGNPRIORITY_A"
+    },
+    "PAIR" : {
+        "correspondence" : "uspto.CORRESPONDENCE_P",
+        "continuitychild" : "uspto.CONTINUITYCHILD_P",
+        "continuityparent" : "uspto.CONTINUITYPARENT_P"
+    },
+    "class" : {
+        "usclass" : "uspto.USCLASS_C",
+        "cpcclass" : "uspto.CPCCLASS_C",
+        "uscpc" : "uspto.USCPC_C",
+        "wipost3" : "uspto.WIPOST3_C"
+    },
+    "legal" : {
+        "cases" : "uspto.CASE_L",
+        "pacercases" : "uspto.PACERCASES_L",
+        "names" : "uspto.PARTY_L",
+        "attorneys" : "uspto.ATTORNEY_L",
+        "patents" : "uspto.PATENT_L"
+    }
+}
+
+# Writes rows to a pipe-delimited csv file with the columns in fieldnames order.
+# Has the writerow, writeheader and fieldnames of csv.DictWriter so it can be
+# used in place of one.  Dictionary rows are mapped to a list of values once
+# per row, and keys not in fieldnames such as table_name are ignored, so the
+# extracted rows do not need to be copied or have keys removed before writing.
+# Records from USPTORecords.py, which are tuples in fieldnames order, are written as is.
+class RowWriter:
+
+    def __init__(self, file, fieldnames, delimiter = '|', lineterminator = "\n"):
+        self.fieldnames = fieldnames
+        self.writer = csv.writer(file, delimiter = delimiter, lineterminator = lineterminator)
+
+    # Write the column names as the header row
+    def writeheader(self):
+        return self.writer.writerow(self.fieldnames)
+
+    # Write a row.  Missing columns and None are written as empty fields
+    def writerow(self, row):
+        if isinstance(row, dict):
+            return self.writer.writerow(list(map(row.get, self.fieldnames)))
+        return self.writer.writerow(row)
+
+# The database creation script the column types of each table are read from
+table_schema_sql_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "installation", "uspto_create_database_postgresql.sql")
+
+# Column types of each table read from the database creation script
+table_column_types = None
+
+# Returns a dict of column name to SQL type for a table, parsed from the
+# CREATE TABLE statements in the database creation script
+def get_table_column_types(table_name):
+
+    global table_column_types
+
+    # Only read the script once in each process
+    if table_column_types is None:
+        table_column_types = {}
+        current_table_name = None
+        with open(table_schema_sql_file, "r") as sql_file:
+            for line in sql_file:
+                line = line.strip()
+                # The start of a table
+                match = re.match(r"CREATE TABLE IF NOT EXISTS ([\w.]+)", line, re.IGNORECASE)
+                if match:
+                    current_table_name = match.group(1).lower()
+                    table_column_types[current_table_name] = {}
+                    continue
+                if current_table_name is not None:
+                    # A column in the table
+                    match = re.match(r"(\w+) ([A-Za-z]+)", line)
+                    if match and match.group(1).upper() not in ["PRIMARY", "KEY", "UNIQUE", "INDEX", "CONSTRAINT"]:
+                        table_column_types[current_table_name][match.group(1).lower()] = match.group(2).upper()
+                    # The end of the table
+                    if line.endswith(");"):
+                        current_table_name = None
+    return table_column_types.get(table_name.lower(), {})
+
+# Check if the data should be streamed to the database with COPY from memory buffers
+# instead of csv files.  Only grant and application data bulk loaded into PostgreSQL
+# without the -csv argument is streamed.  Shards are merged from csv files.
+def is_copy_stream_mode(args_array):
+    if args_array['database_copy_stream'] and "database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk" and args_array['database_type'] == "postgresql":
+        if "csv" not in args_array['command_args'] and "shard" not in args_array['command_args'] and args_array['document_type'] in ["grant", "application"]:
+            return True
+    return False
+
+# Returns the output file format for the command arguments
+def get_output_format(args_array):
+    if "parquet" in args_array['command_args']: return "parquet"
+    elif is_copy_stream_mode(args_array):
+        if args_array['database_copy_format'] == "binary": return "binary_stream"
+        else: return "stream"
+    else: return "csv"
+
+# Function used to open the required csv files and create a RowWriter object
 # for each one.  This function also creates arrays of table column names for each table
-# and returns both the csv.DictWrite and table column arrays back to the args_array.
-def open_csv_files(file_type, file_name, csv_directory, extraction_type=None):
+# and returns both the RowWriter and table column arrays back to the args_array.
+# If the output format is parquet, Parquet files are written in place of the csv files.
+# If the output format is stream or binary_stream, the rows are written to memory
+# buffers in the text or binary COPY format which are copied into the database by
+# flush_copy_streams.
+def open_csv_files(file_type, file_name, csv_directory, extraction_type=None, output_format="csv"):
 
     logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
 
@@ -40,13 +171,13 @@ def open_csv_files(file_type, file_name, csv_directory, extraction_type=None):
         field_names_array['examiner'] = ['GrantID', 'Position', 'LastName', 'FirstName', 'Department', 'FileName']
         field_names_array['agent'] = ['GrantID', 'Position', 'OrgName', 'LastName', 'FirstName', 'Country', 'FileName']
         field_names_array['assignee'] = ['GrantID', 'Position', 'OrgName', 'Role', 'City', 'State', 'Country', 'FileName']
-        field_names_array['inventor'] = ['GrantID', 'Position', 'FirstName', 'LastName', 'City', 'State', 'Country', 'Nationality', 'Residence', 'FileName']
-        field_names_array['gracit'] = ['GrantID', 'Position', 'CitedID', 'Kind', 'Name', 'Date', 'Country', 'Category', 'FileName']
-        field_names_array['forpatcit'] = ['GrantID', 'Position', 'CitedID', 'Kind', 'Name', 'Date', 'Country', 'Category', 'FileName']
+        field_names_array['inventor'] = list(USPTORecords.InventorGrantRecord._fields)
+        field_names_array['gracit'] = list(USPTORecords.GracitRecord._fields)
+        field_names_array['forpatcit'] = list(USPTORecords.ForpatcitRecord._fields)
         field_names_array['nonpatcit'] = ['GrantID', 'Position', 'Citation', 'Category', 'FileName']
         field_names_array['usclass'] = ['GrantID','Position', 'Class', 'SubClass', 'Malformed', 'FileName']
         field_names_array['intclass'] = ['GrantID', 'Position', 'Section', 'Class', 'SubClass', 'MainGroup', 'SubGroup', 'Malformed', 'FileName']
-        field_names_array['cpcclass'] = ['GrantID', 'Position', 'Section', 'Class', 'SubClass', 'MainGroup', 'SubGroup', 'Malformed', 'FileName']
+        field_names_array['cpcclass'] = list(USPTORecords.CpcclassGrantRecord._fields)
         field_names_array['foreignpriority'] = ['GrantID', 'DocumentID', 'Position', 'Kind', 'Country', 'PriorityDate', 'FileName']
 
         # Define all the dictionary arrays to hold writers and filenames
@@ -79,51 +210,6 @@ def open_csv_files(file_type, file_name, csv_directory, extraction_type=None):
         csv_writer_array['cpcclass']['csv_file_name'] = csv_directory + 'CSV_G/cpcclass_' + csv_file_name
         csv_writer_array['foreignpriority']['csv_file_name'] = csv_directory + 'CSV_G/foreignpriority_' + csv_file_name
 
-        # Define all the dictionary arrays to hold writers and filenames
-        csv_writer_array['grant']['file'] = open(csv_writer_array['grant']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['applicant']['file'] = open(csv_writer_array['applicant']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['examiner']['file'] = open(csv_writer_array['examiner']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['agent']['file'] = open(csv_writer_array['agent']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['assignee']['file'] = open(csv_writer_array['assignee']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['inventor']['file'] = open(csv_writer_array['inventor']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['gracit']['file'] = open(csv_writer_array['gracit']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['forpatcit']['file'] = open(csv_writer_array['forpatcit']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['nonpatcit']['file'] = open(csv_writer_array['nonpatcit']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['usclass']['file'] = open(csv_writer_array['usclass']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['intclass']['file'] = open(csv_writer_array['intclass']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['cpcclass']['file'] = open(csv_writer_array['cpcclass']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['foreignpriority']['file'] = open(csv_writer_array['foreignpriority']['csv_file_name'], 'w', encoding='utf-8-sig')
-
-        # Open all CSV files to write to and append to array
-        csv_writer_array['grant']['csv_writer'] = csv.DictWriter(csv_writer_array['grant']['file'], fieldnames = field_names_array['grant'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['applicant']['csv_writer'] = csv.DictWriter(csv_writer_array['applicant']['file'], fieldnames = field_names_array['applicant'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['examiner']['csv_writer'] = csv.DictWriter(csv_writer_array['examiner']['file'], fieldnames = field_names_array['examiner'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['agent']['csv_writer'] = csv.DictWriter(csv_writer_array['agent']['file'], fieldnames = field_names_array['agent'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['assignee']['csv_writer'] = csv.DictWriter(csv_writer_array['assignee']['file'], fieldnames = field_names_array['assignee'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['inventor']['csv_writer'] = csv.DictWriter(csv_writer_array['inventor']['file'], fieldnames = field_names_array['inventor'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['gracit']['csv_writer'] = csv.DictWriter(csv_writer_array['gracit']['file'], fieldnames = field_names_array['gracit'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['forpatcit']['csv_writer'] = csv.DictWriter(csv_writer_array['forpatcit']['file'], fieldnames = field_names_array['forpatcit'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['nonpatcit']['csv_writer'] = csv.DictWriter(csv_writer_array['nonpatcit']['file'], fieldnames = field_names_array['nonpatcit'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['usclass']['csv_writer'] = csv.DictWriter(csv_writer_array['usclass']['file'], fieldnames = field_names_array['usclass'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['intclass']['csv_writer'] = csv.DictWriter(csv_writer_array['intclass']['file'], fieldnames = field_names_array['intclass'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['cpcclass']['csv_writer'] = csv.DictWriter(csv_writer_array['cpcclass']['file'], fieldnames = field_names_array['cpcclass'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['foreignpriority']['csv_writer'] = csv.DictWriter(csv_writer_array['foreignpriority']['file'], fieldnames = field_names_array['foreignpriority'], delimiter = '|', lineterminator = "\n")
-
-        # Write the header to each file
-        csv_writer_array['grant']['csv_writer'].writeheader()
-        csv_writer_array['applicant']['csv_writer'].writeheader()
-        csv_writer_array['examiner']['csv_writer'].writeheader()
-        csv_writer_array['agent']['csv_writer'].writeheader()
-        csv_writer_array['assignee']['csv_writer'].writeheader()
-        csv_writer_array['inventor']['csv_writer'].writeheader()
-        csv_writer_array['gracit']['csv_writer'].writeheader()
-        csv_writer_array['forpatcit']['csv_writer'].writeheader()
-        csv_writer_array['nonpatcit']['csv_writer'].writeheader()
-        csv_writer_array['usclass']['csv_writer'].writeheader()
-        csv_writer_array['intclass']['csv_writer'].writeheader()
-        csv_writer_array['cpcclass']['csv_writer'].writeheader()
-        csv_writer_array['foreignpriority']['csv_writer'].writeheader()
-
     # If the application CSV file will be written
     elif file_type == "application":
 
@@ -161,39 +247,6 @@ def open_csv_files(file_type, file_name, csv_directory, extraction_type=None):
         csv_writer_array['cpcclass']['csv_file_name'] = csv_directory + 'CSV_A/cpcclass_' + csv_file_name
         csv_writer_array['foreignpriority']['csv_file_name'] = csv_directory + 'CSV_A/foreignpriority_' + csv_file_name
 
-        # Define all the dictionaries to hold the csv data
-        csv_writer_array['application']['file'] = open(csv_writer_array['application']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['agent']['file'] = open(csv_writer_array['agent']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['assignee']['file'] = open(csv_writer_array['assignee']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['inventor']['file'] = open(csv_writer_array['inventor']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['applicant']['file'] = open(csv_writer_array['applicant']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['usclass']['file'] = open(csv_writer_array['usclass']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['intclass']['file'] = open(csv_writer_array['intclass']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['cpcclass']['file'] = open(csv_writer_array['cpcclass']['csv_file_name'], 'w', encoding='utf-8-sig')
-        csv_writer_array['foreignpriority']['file'] = open(csv_writer_array['foreignpriority']['csv_file_name'], 'w', encoding='utf-8-sig')
-
-        # Open all CSV files to write to and append to array
-        csv_writer_array['application']['csv_writer'] = csv.DictWriter(csv_writer_array['application']['file'], fieldnames = field_names_array['application'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['agent']['csv_writer'] = csv.DictWriter(csv_writer_array['agent']['file'], fieldnames = field_names_array['agent'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['assignee']['csv_writer'] = csv.DictWriter(csv_writer_array['assignee']['file'], fieldnames = field_names_array['assignee'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['inventor']['csv_writer'] = csv.DictWriter(csv_writer_array['inventor']['file'], fieldnames = field_names_array['inventor'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['applicant']['csv_writer'] = csv.DictWriter(csv_writer_array['applicant']['file'], fieldnames = field_names_array['applicant'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['usclass']['csv_writer'] = csv.DictWriter(csv_writer_array['usclass']['file'], fieldnames = field_names_array['usclass'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['intclass']['csv_writer'] = csv.DictWriter(csv_writer_array['intclass']['file'], fieldnames = field_names_array['intclass'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['cpcclass']['csv_writer'] = csv.DictWriter(csv_writer_array['cpcclass']['file'], fieldnames = field_names_array['cpcclass'], delimiter = '|', lineterminator = "\n")
-        csv_writer_array['foreignpriority']['csv_writer'] = csv.DictWriter(csv_writer_array['foreignpriority']['file'], fieldnames = field_names_array['foreignpriority'], delimiter = '|', lineterminator = "\n")
-
-        # Write header for all application csv files
-        csv_writer_array['application']['csv_writer'].writeheader()
-        csv_writer_array['agent']['csv_writer'].writeheader()
-        csv_writer_array['assignee']['csv_writer'].writeheader()
-        csv_writer_array['inventor']['csv_writer'].writeheader()
-        csv_writer_array['applicant']['csv_writer'].writeheader()
-        csv_writer_array['usclass']['csv_writer'].writeheader()
-        csv_writer_array['intclass']['csv_writer'].writeheader()
-        csv_writer_array['cpcclass']['csv_writer'].writeheader()
-        csv_writer_array['foreignpriority']['csv_writer'].writeheader()
-
 
     # If the PAIR CSV file will be written
     elif file_type == "PAIR":
@@ -204,23 +257,14 @@ def open_csv_files(file_type, file_name, csv_directory, extraction_type=None):
             field_names_array['correspondence'] = ['ApplicationID', 'Name1', 'Name2', 'Address', 'City', 'RegionCode', 'RegionName', 'PostalCode', 'CountryCode', 'CountryName', 'CustomerNum', 'FileName']
             csv_writer_array['correspondence'] = {}
             csv_writer_array['correspondence']['csv_file_name'] = csv_directory + 'CSV_P/' + csv_file_name
-            csv_writer_array['correspondence']['file'] = open(csv_writer_array['correspondence']['csv_file_name'], 'w', encoding='utf-8-sig')
-            csv_writer_array['correspondence']['csv_writer'] = csv.DictWriter(csv_writer_array['correspondence']['file'], fieldnames = field_names_array['correspondence'], delimiter = '|', lineterminator = "\n")
-            csv_writer_array['correspondence']['csv_writer'].writeheader()
         elif extraction_type == "continuitychild":
             csv_writer_array['continuitychild'] = {}
             field_names_array['continuitychild'] = ['ApplicationID', 'ChildApplicationID', 'FileDate', 'ContinuationType', 'FileName']
             csv_writer_array['continuitychild']['csv_file_name'] = csv_directory + 'CSV_P/' + csv_file_name
-            csv_writer_array['continuitychild']['file'] = open(csv_writer_array['continuitychild']['csv_file_name'], 'w', encoding='utf-8-sig')
-            csv_writer_array['continuitychild']['csv_writer'] = csv.DictWriter(csv_writer_array['continuitychild']['file'], fieldnames = field_names_array['continuitychild'], delimiter = '|', lineterminator = "\n")
-            csv_writer_array['continuitychild']['csv_writer'].writeheader()
         elif extraction_type == "continuityparent":
             csv_writer_array['continuityparent'] = {}
             field_names_array['continuityparent'] = ['ApplicationID', 'ParentApplicationID', 'FileDate', 'ContinuationType', 'FileName']
             csv_writer_array['continuityparent']['csv_file_name'] = csv_directory + 'CSV_P/' + csv_file_name
-            csv_writer_array['continuityparent']['file'] = open(csv_writer_array['continuityparent']['csv_file_name'], 'w', encoding='utf-8-sig')
-            csv_writer_array['continuityparent']['csv_writer'] = csv.DictWriter(csv_writer_array['continuityparent']['file'], fieldnames = field_names_array['continuityparent'], delimiter = '|', lineterminator = "\n")
-            csv_writer_array['continuityparent']['csv_writer'].writeheader()
 
     # If the classification CSV file will be written
     elif file_type == "class":
@@ -231,30 +275,18 @@ def open_csv_files(file_type, file_name, csv_directory, extraction_type=None):
             field_names_array['usclass'] = ['Class', 'SubClass', 'Indent', 'SubClsSqsNum', 'NextHigherSub', 'Title', 'FileName']
             csv_writer_array['usclass'] = {}
             csv_writer_array['usclass']['csv_file_name'] = csv_directory + 'CSV_C/' + csv_file_name
-            csv_writer_array['usclass']['file'] = open(csv_writer_array['usclass']['csv_file_name'], 'w', encoding='utf-8-sig')
-            csv_writer_array['usclass']['csv_writer'] = csv.DictWriter(csv_writer_array['usclass']['file'], fieldnames = field_names_array['usclass'], delimiter = '|', lineterminator = "\n")
-            csv_writer_array['usclass']['csv_writer'].writeheader()
         elif extraction_type == "cpcclass":
             field_names_array['cpcclass'] = ['Section', 'Class', 'SubClass', 'MainGroup', 'SubGroup', 'Title', 'FileName']
             csv_writer_array['cpcclass'] = {}
             csv_writer_array['cpcclass']['csv_file_name'] = csv_directory + 'CSV_C/' + csv_file_name
-            csv_writer_array['cpcclass']['file'] = open(csv_writer_array['cpcclass']['csv_file_name'], 'w', encoding='utf-8-sig')
-            csv_writer_array['cpcclass']['csv_writer'] = csv.DictWriter(csv_writer_array['cpcclass']['file'], fieldnames = field_names_array['cpcclass'], delimiter = '|', lineterminator = "\n")
-            csv_writer_array['cpcclass']['csv_writer'].writeheader()
         elif extraction_type == "uscpc":
             field_names_array['uscpc'] = ['USClass', 'CPCClass', 'Position', 'FileName']
             csv_writer_array['uscpc'] = {}
             csv_writer_array['uscpc']['csv_file_name'] = csv_directory + 'CSV_C/' + csv_file_name
-            csv_writer_array['uscpc']['file'] = open(csv_writer_array['uscpc']['csv_file_name'], 'w', encoding='utf-8-sig')
-            csv_writer_array['uscpc']['csv_writer'] = csv.DictWriter(csv_writer_array['uscpc']['file'], fieldnames = field_names_array['uscpc'], delimiter = '|', lineterminator = "\n")
-            csv_writer_array['uscpc']['csv_writer'].writeheader()
         elif extraction_type == "wipost3":
             field_names_array['wipost3'] = ['Country', 'Code', 'FileName']
             csv_writer_array['wipost3'] = {}
             csv_writer_array['wipost3']['csv_file_name'] = csv_directory + 'CSV_C/' + csv_file_name
-            csv_writer_array['wipost3']['file'] = open(csv_writer_array['wipost3']['csv_file_name'], 'w', encoding='utf-8-sig')
-            csv_writer_array['wipost3']['csv_writer'] = csv.DictWriter(csv_writer_array['wipost3']['file'], fieldnames = field_names_array['wipost3'], delimiter = '|', lineterminator = "\n")
-            csv_writer_array['wipost3']['csv_writer'].writeheader()
 
 
     # If the legal CSV file will be written
@@ -266,37 +298,48 @@ def open_csv_files(file_type, file_name, csv_directory, extraction_type=None):
             field_names_array['cases'] = ['CaseID', 'PacerID', 'CourtTitle', 'DistrictID', 'CaseTitle', 'AssignedTo', 'ReferredTo', 'Cause', 'JurisdictionBasis', 'FileDate', 'CloseDate', 'LastFileDate', 'JuryDemand', 'Demand', 'LeadCase', 'RelatedCase', 'Settlement', 'CaseIDRaw', 'CaseType1', 'CaseType2', 'CaseType3', 'CaseTypeNote', 'FileName']
             csv_writer_array['cases'] = {}
             csv_writer_array['cases']['csv_file_name'] = csv_directory + 'CSV_L/' + csv_file_name
-            csv_writer_array['cases']['file'] = open(csv_writer_array['cases']['csv_file_name'], 'w', encoding='utf-8-sig')
-            csv_writer_array['cases']['csv_writer'] = csv.DictWriter(csv_writer_array['cases']['file'], fieldnames = field_names_array['cases'], delimiter = '|', lineterminator = "\n")
-            csv_writer_array['cases']['csv_writer'].writeheader()
         elif extraction_type == "pacercases":
             field_names_array['pacercases'] = ['USClass', 'CPCClass', 'Position', 'FileName']
             csv_writer_array['pacercases'] = {}
             csv_writer_array['pacercases']['csv_file_name'] = csv_directory + 'CSV_L/' + csv_file_name
-            csv_writer_array['pacercases']['file'] = open(csv_writer_array['pacercases']['csv_file_name'], 'w', encoding='utf-8-sig')
-            csv_writer_array['pacercases']['csv_writer'] = csv.DictWriter(csv_writer_array['pacercases']['file'], fieldnames = field_names_array['pacercases'], delimiter = '|', lineterminator = "\n")
-            csv_writer_array['pacercases']['csv_writer'].writeheader()
         elif extraction_type == "names":
             field_names_array['names'] = ['CaseID', 'PartyType', 'Name', 'FileName']
             csv_writer_array['names'] = {}
             csv_writer_array['names']['csv_file_name'] = csv_directory + 'CSV_L/' + csv_file_name
-            csv_writer_array['names']['file'] = open(csv_writer_array['names']['csv_file_name'], 'w', encoding='utf-8-sig')
-            csv_writer_array['names']['csv_writer'] = csv.DictWriter(csv_writer_array['names']['file'], fieldnames = field_names_array['names'], delimiter = '|', lineterminator = "\n")
-            csv_writer_array['names']['csv_writer'].writeheader()
         elif extraction_type == "attorneys":
             field_names_array['attorneys'] = ['CaseID', 'CaseIDRaw', 'PartyType', 'Name', 'ContactInfo', 'Position', 'FileName']
             csv_writer_array['attorneys'] = {}
             csv_writer_array['attorneys']['csv_file_name'] = csv_directory + 'CSV_L/' + csv_file_name
-            csv_writer_array['attorneys']['file'] = open(csv_writer_array['attorneys']['csv_file_name'], 'w', encoding='utf-8-sig')
-            csv_writer_array['attorneys']['csv_writer'] = csv.DictWriter(csv_writer_array['attorneys']['file'], fieldnames = field_names_array['attorneys'], delimiter = '|', lineterminator = "\n")
-            csv_writer_array['attorneys']['csv_writer'].writeheader()
         elif extraction_type == "patents":
             field_names_array['patents'] = ['CaseID', 'PacerID', 'NOS', 'PatentID', 'PatentDocType', 'FileName']
             csv_writer_array['patents'] = {}
             csv_writer_array['patents']['csv_file_name'] = csv_directory + 'CSV_L/' + csv_file_name
-            csv_writer_array['patents']['file'] = open(csv_writer_array['patents']['csv_file_name'], 'w', encoding='utf-8-sig')
-            csv_writer_array['patents']['csv_writer'] = csv.DictWriter(csv_writer_array['patents']['file'], fieldnames = field_names_array['patents'], delimiter = '|', lineterminator = "\n")
-            csv_writer_array['patents']['csv_writer'].writeheader()
+
+    # Open the file and writer of each table.  Parquet files are written in place
+    # of the .csv files, and the Parquet writer is used as both the file and the
+    # writer.  If streaming to the database, the rows are written to memory buffers
+    # which are copied without a header row, so no file is created.
+    for key, csv_file in csv_writer_array.items():
+        if output_format == "parquet":
+            csv_file['csv_file_name'] = os.path.splitext(csv_file['csv_file_name'])[0] + ".parquet"
+            csv_file['file'] = USPTOParquetHandler.open_parquet_file(file_type, key, csv_file['csv_file_name'], field_names_array[key])
+            csv_file['csv_writer'] = csv_file['file']
+        elif output_format == "stream" or output_format == "binary_stream":
+            csv_file['csv_file_name'] = None
+            csv_file['copy_stream'] = True
+            if output_format == "binary_stream":
+                csv_file['copy_format'] = "binary"
+                csv_file['file'] = io.BytesIO()
+                csv_file['csv_writer'] = USPTOBinaryCopy.BinaryCopyWriter(csv_file['file'], field_names_array[key], get_table_column_types(csv_table_names[file_type][key]))
+            else:
+                csv_file['copy_format'] = "text"
+                csv_file['file'] = io.StringIO()
+                csv_file['csv_writer'] = RowWriter(csv_file['file'], fieldnames = field_names_array[key], delimiter = '|', lineterminator = "\n")
+        else:
+            # Open the .csv file to write to and write the header
+            csv_file['file'] = open(csv_file['csv_file_name'], 'w', encoding='utf-8-sig')
+            csv_file['csv_writer'] = RowWriter(csv_file['file'], fieldnames = field_names_array[key], delimiter = '|', lineterminator = "\n")
+            csv_file['csv_writer'].writeheader()
 
     print('[Opened all .csv files for ' + file_type + ' ' + file_name + ' storage Time: {0}]'.format(time.strftime('%c')))
     logger.info('Opened all .csv files for ' + file_type + ' ' + file_name + ' storage Time: {0}]'.format(time.strftime('%c')))
@@ -315,6 +358,9 @@ def close_csv_files(args_array):
 
     # Loop through each file in array of open csv files
     for key, csv_file in list(args_array['csv_file_array'].items()):
+        # COPY stream buffers are closed when they are copied into the database
+        if "copy_stream" in csv_file:
+            continue
         try:
             # Close file being written to
             csv_file['file'].close()
@@ -340,6 +386,9 @@ def delete_csv_files(args_array):
 
     # Loop through each file in array of open csv files
     for key, csv_file in list(args_array['csv_file_array'].items()):
+        # COPY stream buffers have no file to remove
+        if "copy_stream" in csv_file:
+            continue
         try:
             # Remove csv file from the CSV directory if 'csv' not in args_array['command_args']
             if os.path.exists(csv_file['csv_file_name']):
@@ -353,3 +402,28 @@ def delete_csv_files(args_array):
             fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
             logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
             traceback.print_exc()
+
+# Copy the rows in the COPY stream buffers into the database.  Buffers are
+# copied once they reach copy_stream_buffer_size characters, or all buffers are
+# copied if final is set.  Returns False if any buffer of the file failed to copy.
+def flush_copy_streams(args_array, final=False):
+
+    file_processed = True
+
+    for key, csv_file in list(args_array['csv_file_array'].items()):
+        if "copy_stream" in csv_file:
+            # Copy the buffer if it is full, or at the end of the file
+            if final or csv_file['file'].tell() >= args_array['copy_stream_buffer_size']:
+                if csv_file['file'].tell() and csv_file.get("copy_stream_failed") != True:
+                    if args_array['database_connection'].load_copy_stream_data(args_array, key, csv_file) == False:
+                        csv_file['copy_stream_failed'] = True
+                # Empty the buffer
+                csv_file['file'].seek(0)
+                csv_file['file'].truncate(0)
+            if csv_file.get("copy_stream_failed") == True:
+                file_processed = False
+            # Free the buffer at the end of the file
+            if final:
+                csv_file['file'].close()
+
+    return file_processed
@@ -16,6 +16,7 @@ import sys
 # Import USPTO Parser Functions
 import USPTOLogger
 import USPTOSanitizer
+import USPTOFieldMapping
 
 # Function used to extract data from XML1 formatted patent applications
 def extract_XML1_application(raw_data, args_array):
@@ -40,7 +41,9 @@ def extract_XML1_application(raw_data, args_array):
     processed_cpcclass = []
 
     # Pass the xml into Element tree object
-    document_root = ET.fromstring(raw_data)
+    # unless it has already been parsed by the splitter
+    if ET.iselement(raw_data): document_root = raw_data
+    else: document_root = ET.fromstring(raw_data)
     r = document_root.find('subdoc-bibliographic-information')
 
     # Get and fix the document_id data
@@ -251,41 +254,12 @@ def extract_XML1_application(raw_data, args_array):
         # Init position
         inv_position = 1
         for inventor in invs.findall('first-named-inventor'):
-            n = inventor.find('name')
-            try: inventor_first_name = n.findtext('given-name').strip()[:100]
-            except: inventor_first_name = None
-            try: inventor_last_name = n.findtext('family-name').strip()[:100]
-            except: inventor_last_name = None
-            # Get the residence tag
-            res = inventor.find('residence')
-            if res is not None:
-                residence_us = res.find('residence-us')
-                if residence_us is not None:
-                    try: inventor_city = residence_us.findtext('city').strip()[:100]
-                    except: inventor_city = None
-                    try: inventor_state = residence_us.findtext('state').strip()[:100]
-                    except: inventor_state = None
-                    try: inventor_country = residence_us.findtext('country-code').strip()[:100]
-                    except: inventor_country = None
-                residence_non_us = res.find('residence-non-us')
-                if residence_non_us is not None:
-                    try: inventor_city = residence_non_us.findtext('city').strip()[:100]
-                    except: inventor_city = None
-                    try: inventor_state = residence_non_us.findtext('state').strip()[:100]
-                    except: inventor_state = None
-                    try: inventor_country = residence_non_us.findtext('country-code').strip()[:100]
-                    except: inventor_country = None
-
             # Append SQL data into dictionary to be written later
             processed_inventor.append({
                 "table_name" : "uspto.INVENTOR_A",
                 "ApplicationID" : app_no,
                 "Position" : inv_position,
-                "FirstName" : inventor_first_name,
-                "LastName" : inventor_last_name,
-                "City" : inventor_city,
-                "State" : inventor_state,
-                "Country" : inventor_country,
+                **USPTOFieldMapping.extract_fields("aXML1", "INVENTOR_A", inventor),
                 "FileName" : args_array['file_name']
             })
             #print(processed_inventor)
@@ -293,83 +267,33 @@ def extract_XML1_application(raw_data, args_array):
 
         # For all secordary inventors
         for inv in invs.findall('inventor'):
-            if inv is not None:
-                n = inv.find('name')
-                if n is not None:
-                    try: inventor_first_name = n.findtext('given-name').strip()[:100]
-                    except: inventor_first_name = None
-                    try: inventor_last_name = n.findtext('family-name').strip()[:100]
-                    except: inventor_last_name = None
-
-                res = inv.find('residence')
-                if res is not None:
-                    residence_us = res.find('residence-us')
-                    if residence_us is not None:
-                        try: inventor_city = residence_us.findtext('city').strip()[:100]
-                        except: inventor_city = None
-                        try: inventor_state = residence_us.findtext('state').strip()[:100]
-                        except: inventor_state = None
-                        try: inventor_country = residence_us.findtext('country-code').strip()[:100]
-                        except: inventor_country = None
-                    residence_non_us = res.find('residence-non-us')
-                    if residence_non_us is not None:
-                        try: inventor_city = residence_non_us.findtext('city').strip()[:100]
-                        except: inventor_city = None
-                        try: inventor_state = residence_non_us.findtext('state').strip()[:100]
-                        except: inventor_state = None
-                        try: inventor_country = residence_non_us.findtext('country-code').strip()[:100]
-                        except: inventor_country = None
-
-                    # Append SQL data into dictionary to be written later
-                    processed_inventor.append({
-                        "table_name" : "uspto.INVENTOR_A",
-                        "ApplicationID" : app_no,
-                        "Position" : inv_position,
-                        "FirstName" : inventor_first_name,
-                        "LastName" : inventor_last_name,
-                        "City" : inventor_city,
-                        "State" : inventor_state,
-                        "Country" : inventor_country,
-                        "FileName" : args_array['file_name']
-                    })
-                    #print(processed_inventor)
-                    inv_position += 1
+            # Only inventors with a residence are stored
+            if inv.find('residence') is not None:
+                # Append SQL data into dictionary to be written later
+                processed_inventor.append({
+                    "table_name" : "uspto.INVENTOR_A",
+                    "ApplicationID" : app_no,
+                    "Position" : inv_position,
+                    **USPTOFieldMapping.extract_fields("aXML1", "INVENTOR_A", inv),
+                    "FileName" : args_array['file_name']
+                })
+                #print(processed_inventor)
+                inv_position += 1
 
     # Get assignee data
     # Init position
     asn_position = 1
     for asn in r.findall('assignee'):
-        try: asn_role = asn.findtext('assignee-type').strip()[:100]
-        except: asn_role = None
-        try: asn_orgname = asn.findtext('organization-name').strip()[:300]
-        except: asn_orgname = None
-        adr_elem = asn.find('address')
-        try: asn_city = adr_elem.findtext('city').strip()[:100]
-        except: asn_city = None
-        try: asn_state = adr_elem.findtext('state').strip()[:100]
-        except: asn_state = None
-        try: asn_country = adr_elem.find('country').findtext('country-code').strip()[:100]
-        except: asn_country = None
-        if asn_country == None:
-            if USPTOSanitizer.is_US_state(asn_state):
-                asn_country = "US"
-        # These have not been found in XML1,
-        # but a full XML parse should be done
-        asn_firstname = None
-        asn_lastname = None
-
         # Append SQL data into dictionary to be written later
+        # The first and last names have not been found in XML1,
+        # but a full XML parse should be done
         processed_assignee.append({
             "table_name" : "uspto.ASSIGNEE_A",
             "ApplicationID" : app_no,
             "Position" : asn_position,
-            "OrgName" : asn_orgname,
-            "FirstName" : asn_firstname,
-            "LastName" : asn_lastname,
-            "Role" : asn_role,
-            "City" : asn_city,
-            "State" : asn_state,
-            "Country" : asn_country,
+            "FirstName" : None,
+            "LastName" : None,
+            **USPTOFieldMapping.extract_fields("aXML1", "ASSIGNEE_A", asn),
             "FileName" : args_array['file_name']
         })
         #print(processed_assignee)
@@ -388,6 +312,7 @@ def extract_XML1_application(raw_data, args_array):
         if agent_orgname != None and agent_orgname_2 != None:
             agent_orgname = USPTOSanitizer.strip_for_csv(agent_orgname + " " + agent_orgname_2)[:300]
         # Get the address element
+        agent_address = None
         addr_elem = agn.find('address')
         if addr_elem is not None:
             try:
@@ -397,14 +322,6 @@ def extract_XML1_application(raw_data, args_array):
                 except: agent_addr_2 = ""
                 agent_address = USPTOSanitizer.strip_for_csv(agent_addr_1 + agent_addr_2)
             except: agent_address = None
-            try:agent_city = addr_elem.findtext('city').strip()[:50]
-            except: agent_city = None
-            try: agent_state = addr_elem.findtext('state').strip()[:3]
-            except: agent_state = None
-            try: agent_country = addr_elem.find('country').findtext('country-code').strip()[:3]
-            except:
-                if USPTOSanitizer.is_US_state(agent_state): agent_country = "US"
-                else: agent_country = None
 
         # Append SQL data into dictionary to be written later
         processed_agent.append({
@@ -413,9 +330,7 @@ def extract_XML1_application(raw_data, args_array):
             "Position" : agn_position,
             "OrgName" : agent_orgname,
             "Address" : agent_address,
-            "City" : agent_city,
-            "State" : agent_state,
-            "Country" : agent_country,
+            **USPTOFieldMapping.extract_fields("aXML1", "AGENT_A", agn),
             "FileName" : args_array['file_name']
         })
         #print(processed_agent)
@@ -17,6 +17,8 @@ import re
 # Import USPTO Parser Functions
 import USPTOLogger
 import USPTOSanitizer
+import USPTORecords
+import USPTOFieldMapping
 
 # Function used to extract data from XML2 formatted patent grants
 def extract_XML2_grant(raw_data, args_array):
@@ -49,7 +51,10 @@ def extract_XML2_grant(raw_data, args_array):
     processed_foreignpriority = []
 
     # Pass the raw data into Element tree xml object
-    try: document_root = ET.fromstring(raw_data)
+    try:
+        # Use the element tree if already parsed by the splitter
+        if ET.iselement(raw_data): document_root = raw_data
+        else: document_root = ET.fromstring(raw_data)
     except ET.ParseError as e:
         print_xml = raw_data.split("\n")
         for num, line in enumerate(print_xml, start = 1):
@@ -306,8 +311,8 @@ def extract_XML2_grant(raw_data, args_array):
                                 except: citation_country = None
 
                         # Parse citation category
-                        if(len(B561.getchildren()) > 1):
-                            try: citation_category = B561.getchildren()[1].tag.replace("\n", "").replace("\r", "").upper()
+                        if(len(B561) > 1):
+                            try: citation_category = B561[1].tag.replace("\n", "").replace("\r", "").upper()
                             except: citation_category = None
                         else: citation_category = None
 
@@ -315,37 +320,35 @@ def extract_XML2_grant(raw_data, args_array):
                         # citation document number
                         if pct_kind != None:
 
-                            # Append SQL data into dictionary to be written later
-                            processed_gracit.append({
-                                "table_name" : "uspto.GRACIT_G",
-                                "GrantID" : document_id,
-                                "Position" : position,
-                                "CitedID" : citation_document_number,
-                                "Kind" : pct_kind,
-                                "Name" : citation_name,
-                                "Date" : citation_date,
-                                "Country" : citation_country,
-                                "Category" : citation_category,
-                                "FileName" : args_array['file_name']
-                            })
+                            # Append SQL data into record to be written later
+                            processed_gracit.append(USPTORecords.GracitRecord(
+                                GrantID = document_id,
+                                Position = position,
+                                CitedID = citation_document_number,
+                                Kind = pct_kind,
+                                Name = citation_name,
+                                Date = citation_date,
+                                Country = citation_country,
+                                Category = citation_category,
+                                FileName = args_array['file_name']
+                            ))
                             #print(processed_gracit)
                             position += 1
 
                         else:
 
-                            # Append SQL data into dictionary to be written later
-                            processed_forpatcit.append({
-                                "table_name" : "uspto.FORPATCIT_G",
-                                "GrantID" : document_id,
-                                "Position" : position,
-                                "CitedID" : citation_document_number,
-                                "Kind" : pct_kind,
-                                "Name" : citation_name,
-                                "Date" : citation_date,
-                                "Country" : citation_country,
-                                "Category" : citation_category,
-                                "FileName" : args_array['file_name']
-                            })
+                            # Append SQL data into record to be written later
+                            processed_forpatcit.append(USPTORecords.ForpatcitRecord(
+                                GrantID = document_id,
+                                Position = position,
+                                CitedID = citation_document_number,
+                                Kind = pct_kind,
+                                Name = citation_name,
+                                Date = citation_date,
+                                Country = citation_country,
+                                Category = citation_category,
+                                FileName = args_array['file_name']
+                            ))
                             #print(processed_forpatcit)
                             position += 1
 
@@ -362,8 +365,8 @@ def extract_XML2_grant(raw_data, args_array):
                         non_patent_citation_text = None
 
                     # Parse citation category into code
-                    if(len(B562.getchildren()) > 1):
-                        try: ncitation_category = B562.getchildren()[1].tag.replace("\n", "").replace("\r", "").upper()
+                    if(len(B562) > 1):
+                        try: ncitation_category = B562[1].tag.replace("\n", "").replace("\r", "").upper()
                         except: ncitation_category = None
                     else: ncitation_category = None
 
@@ -407,43 +410,16 @@ def extract_XML2_grant(raw_data, args_array):
                 # Collect inventor information
                 for B721 in B720.findall('B721'):
                     for i in B721.findall('PARTY-US'):
-                        # Inventor Name
-                        try: inventor_first_name = USPTOSanitizer.return_element_text(i.find('NAM').find('FNM')).strip()[:100]
-                        except: inventor_first_name = None
-                        try: inventor_last_name = USPTOSanitizer.return_element_text(i.find('NAM').find('SNM')).strip()[:100]
-                        except: inventor_last_name = None
-                        # Inventor Address info
-                        try: inventor_city = USPTOSanitizer.return_element_text(i.find('ADR').find('CITY')).strip()[:100]
-                        except: inventor_city = None
-                        try: inventor_state = USPTOSanitizer.return_element_text(i.find('ADR').find('STATE')).strip()[:3]
-                        except: inventor_state = None
-                        # Inventor country
-                        try: inventor_country = USPTOSanitizer.return_element_text(i.find("ADR").find('CTRY')).strip()[:3]
-                        except:
-                            try:
-                                # If state is a US state, set country to US
-                                if USPTOSanitizer.is_US_state(inventor_state):
-                                    inventor_country = "US"
-                                else:
-                                    inventor_country = None
-                            except: inventor_country = None
-                        inventor_nationality = None
-                        inventor_residence = None
-
-                    # Append SQL data into dictionary to be written later
-                    processed_inventor.append({
-                        "table_name" : "uspto.INVENTOR_G",
-                        "GrantID" : document_id,
-                        "Position" : position,
-                        "FirstName" : inventor_first_name,
-                        "LastName" : inventor_last_name,
-                        "City" : inventor_city,
-                        "State" : inventor_state,
-                        "Country" : inventor_country,
-                        "Nationality" : inventor_nationality,
-                        "Residence" : inventor_residence,
-                        "FileName" : args_array['file_name']
-                    })
+                        # Get the inventor columns from the field mapping
+                        inventor = USPTOFieldMapping.extract_fields("gXML2", "INVENTOR_G", i)
+
+                    # Append SQL data into record to be written later
+                    processed_inventor.append(USPTORecords.InventorGrantRecord(
+                        GrantID = document_id,
+                        Position = position,
+                        **inventor,
+                        FileName = args_array['file_name']
+                    ))
                     #print(processed_inventor)
                     position += 1
 
@@ -454,32 +430,16 @@ def extract_XML2_grant(raw_data, args_array):
             for B730 in B700.findall('B730'):
                 for B731 in B730.findall('B731'):
                     for x in B731.findall('PARTY-US'):
-                        try: asn_orgname = USPTOSanitizer.return_element_text(x.find('NAM').find("ONM")).strip()[:500]
-                        except: asn_orgname = None
-                        asn_role = None
-                        try: asn_city = USPTOSanitizer.return_element_text(x.find("ADR").find('CITY')).strip()[:100]
-                        except: asn_city = None
-                        try: asn_state = USPTOSanitizer.return_element_text(x.find("ADR").find('STATE')).strip()[:30]
-                        except: asn_state = None
-                        # Assignee country
-                        try: asn_country = USPTOSanitizer.return_element_text(x.find("ADR").find('CTRY')).strip()[:3]
-                        except:
-                            try:
-                                # Fix country if country missing
-                                if USPTOSanitizer.is_US_state(asn_state): asn_country = "US"
-                                else:asn_country = None
-                            except: asn_country = None
+                        # Get the assignee columns from the field mapping
+                        assignee = USPTOFieldMapping.extract_fields("gXML2", "ASSIGNEE_G", x)
 
                     # Append SQL data into dictionary to be written later
                     processed_assignee.append({
                         "table_name" : "uspto.ASSIGNEE_G",
                         "GrantID" : document_id,
                         "Position" : position,
-                        "OrgName" : asn_orgname,
-                        "Role" : asn_role,
-                        "City" : asn_city,
-                        "State" :  asn_state,
-                        "Country" : asn_country,
+                        "Role" : None,
+                        **assignee,
                         "FileName" : args_array['file_name']
                     })
                     #print(processed_assignee)
@@ -491,38 +451,17 @@ def extract_XML2_grant(raw_data, args_array):
                 position = 1
                 for B741 in B740.findall('B741'):
                     for x in B741.findall('PARTY-US'):
-                        # Attorney Organization
-                        try: agent_orgname = USPTOSanitizer.return_element_text(x.find('NAM').find("ONM")).strip()[:300]
-                        except: agent_orgname = None
-                        # Attorney Name
-                        try: agent_last_name = USPTOSanitizer.return_element_text(x.find('NAM').find('FNM')).strip()[:100]
-                        except: agent_last_name = None
-                        try: agent_first_name = USPTOSanitizer.return_element_text(x.find('NAM').find('SNM')).strip()[:100]
-                        except: agent_first_name = None
-                        # Attorney Address information
-                        try: agent_city = USPTOSanitizer.return_element_text(x.find("ADR").find('CITY')).strip()[:100]
-                        except: agent_city = None
-                        try: agent_state = USPTOSanitizer.return_element_text(x.find("ADR").find('STATE')).strip()[:30]
-                        except: agent_state = None
-                        # Agent country
-                        try:
-                            agent_country = USPTOSanitizer.return_element_text(x.find("ADR").find('CTRY')).strip()[:3]
-                        except:
-                            try:
-                                # Fix country if missing
-                                if USPTOSanitizer.is_US_state(agent_state): agent_country = "US"
-                                else: agent_country = None
-                            except: agent_country = None
+                        # Get the agent columns from the field mapping.  The state
+                        # is only used to fill a missing country.
+                        agent = USPTOFieldMapping.extract_fields("gXML2", "AGENT_G", x)
+                        del agent['State']
 
                         # Append SQL data into dictionary to be written later
                         processed_agent.append({
                             "table_name" : "uspto.AGENT_G",
                             "GrantID" : document_id,
                             "Position" : position,
-                            "OrgName" : agent_orgname,
-                            "LastName" : agent_last_name,
-                            "FirstName" : agent_first_name,
-                            "Country" : agent_country,
+                            **agent,
                             "FileName" : args_array['file_name']
                         })
                         #print(processed_agent)
@@ -531,23 +470,18 @@ def extract_XML2_grant(raw_data, args_array):
             # B745 Examiner
             for B745 in B700.findall('B745'):
                 position = 1
+                # The department is the same for all examiners in B745
+                examiner_department = USPTOSanitizer.return_element_text(B745.find('B748US'))
+                if examiner_department is not None: examiner_department = examiner_department.strip()[:50]
                 # Primary Examiner
                 for B746 in B745.findall('B746'):
                     for x in B746.findall('PARTY-US'):
-                        try: examiner_last_name = USPTOSanitizer.return_element_text(x.find('NAM').find('SNM')).strip()[:50]
-                        except: examiner_last_name = None
-                        try: examiner_fist_name = USPTOSanitizer.return_element_text(x.find('NAM').find('FNM')).strip()[:50]
-                        except:  examiner_fist_name = None
-                        try: examiner_department = USPTOSanitizer.return_element_text(B745.find('B748US')).strip()[:50]
-                        except: examiner_department = None
-
                         # Append SQL data into dictionary to be written later
                         processed_examiner.append({
                             "table_name" : "uspto.EXAMINER_G",
                             "GrantID" : document_id,
                             "Position" : position,
-                            "LastName" :  examiner_last_name,
-                            "FirstName" : examiner_fist_name,
+                            **USPTOFieldMapping.extract_fields("gXML2", "EXAMINER_G", x),
                             "Department" : examiner_department,
                             "FileName" : args_array['file_name']
                         })
@@ -557,20 +491,12 @@ def extract_XML2_grant(raw_data, args_array):
                 # Assistant Examiner
                 for B747 in B745.findall('B747'):
                     for x in B747.findall('PARTY-US'):
-                        try: examiner_last_name = USPTOSanitizer.return_element_text(x.find('NAM').find('SNM')).strip()[:50]
-                        except: examiner_last_name = None
-                        try: examiner_fist_name = USPTOSanitizer.return_element_text(x.find('NAM').find('FNM')).strip()[:50]
-                        except: examiner_fist_name = None
-                        try: examiner_department = USPTOSanitizer.return_element_text(B745.find('B748US')).strip()[:50]
-                        except: examiner_department = None
-
                         # Append SQL data into dictionary to be written later
                         processed_examiner.append({
                             "table_name" : "uspto.EXAMINER_G",
                             "GrantID" : document_id,
                             "Position" : position,
-                            "LastName" :  examiner_last_name,
-                            "FirstName" : examiner_fist_name,
+                            **USPTOFieldMapping.extract_fields("gXML2", "EXAMINER_G", x),
                             "Department" : examiner_department,
                             "FileName" : args_array['file_name']
                         })
@@ -16,6 +16,7 @@ import sys
 # Import USPTO Parser Functions
 import USPTOLogger
 import USPTOSanitizer
+import USPTOFieldMapping
 
 # Function used to extract data from XML4 formatted patent applications
 def extract_XML4_application(raw_data, args_array):
@@ -41,7 +42,9 @@ def extract_XML4_application(raw_data, args_array):
     processed_cpcclass = []
 
     # Pass the raw data into Element tree xml object
-    document_root = ET.fromstring(raw_data)
+    # unless it has already been parsed by the splitter
+    if ET.iselement(raw_data): document_root = raw_data
+    else: document_root = ET.fromstring(raw_data)
 
     # Start extract XML data
     for r in document_root.findall('us-bibliographic-data-application'):
@@ -111,7 +114,7 @@ def extract_XML4_application(raw_data, args_array):
         position = 1
         if ic is not None:
             for icc in ic.findall('classification-ipcr'):
-                for x in icc.getchildren():
+                for x in icc:
                     if(USPTOSanitizer.check_tag_exists(x,'section')):
                         try: i_class_sec = x.text.strip()[:15]
                         except: i_class_sec = None
@@ -307,32 +310,12 @@ def extract_XML4_application(raw_data, args_array):
             else: applicant_id_string = 'applicant'
             for appl in appl_elem.findall(applicant_id_string):
                 if(appl.find('addressbook') != None):
-                    try: appl_orgname = USPTOSanitizer.strip_for_csv(appl.find('addressbook').findtext('orgname'))[:300]
-                    except: appl_orgname = None
-                    try: appl_role = appl.find('addressbook').findtext('role')
-                    except: appl_role = None
-                    try: appl_city = appl.find('addressbook').find('address').findtext('city').strip()[:100]
-                    except: appl_city = None
-                    try: appl_state = appl.find('addressbook').find('address').findtext('state').strip()[:100]
-                    except: appl_state = None
-                    try: appl_country = appl.find('addressbook').find('address').findtext('country').strip()[:100]
-                    except: appl_country = None
-                    try: appl_firstname = USPTOSanitizer.strip_for_csv(appl.find('addressbook').findtext('first-name'))[:100]
-                    except: appl_firstname = None
-                    try: appl_lastname = USPTOSanitizer.strip_for_csv(appl.find('addressbook').findtext('last-name'))[:100]
-                    except: appl_lastname = None
-
                     # Append SQL data into dictionary to be written later
                     processed_applicant.append({
                         "table_name" : "uspto.APPLICANT_A",
                         "ApplicationID" : app_no,
                         "Position" : appl_position,
-                        "OrgName" : appl_orgname,
-                        "FirstName" : appl_firstname,
-                        "LastName" : appl_lastname,
-                        "City" : appl_city,
-                        "State" : appl_state,
-                        "Country" : appl_country,
+                        **USPTOFieldMapping.extract_fields("aXML4", "APPLICANT_A", appl),
                         "FileName" : args_array['file_name']
                     })
                     #print(processed_applicant)
@@ -346,33 +329,12 @@ def extract_XML4_application(raw_data, args_array):
                 # Get all inventors
                 for inv in invs.findall("inventor"):
                     if(inv.find('addressbook') != None):
-                        try: inv_first_name = inv.find('addressbook').findtext('first-name').strip()[:100]
-                        except: inv_first_name = None
-                        try: inv_last_name = inv.find('addressbook').findtext('last-name').strip()[:100]
-                        except: inv_last_name = None
-                        try: inv_city = inv.find('addressbook').find('address').findtext('city').strip()[:100]
-                        except: inv_city = None
-                        try: inv_state = inv.find('addressbook').find('address').findtext('state').strip()[:100]
-                        except: inv_state = None
-                        try: inv_country = inv.find('addressbook').find('address').findtext('country').strip()[:100]
-                        except: inv_country = None
-                        try: inv_nationality = inv.find('nationality').findtext('country').strip()[:100]
-                        except: inv_nationality = None
-                        try: inv_residence = inv.find('residence').findtext('country').strip()[:300]
-                        except: inv_residence = None
-
                         # Append SQL data into dictionary to be written later
                         processed_inventor.append({
                             "table_name" : "uspto.INVENTOR_A",
                             "ApplicationID" : app_no,
                             "Position" : invt_position,
-                            "FirstName" : inv_first_name,
-                            "LastName" : inv_last_name,
-                            "City" : inv_city,
-                            "State" : inv_state,
-                            "Country" : inv_country,
-                            "Nationality" : inv_nationality,
-                            "Residence" : inv_residence,
+                            **USPTOFieldMapping.extract_fields("aXML4", "INVENTOR_A", inv),
                             "FileName" : args_array['file_name']
                         })
                         #print(processed_inventor)
@@ -388,25 +350,12 @@ def extract_XML4_application(raw_data, args_array):
                     try: asn_sequence = agent_item.attrib['sequence']
                     except: asn_sequence = None
                     if(agent_item.find('addressbook') != None):
-                        try: atn_orgname = agent_item.find('addressbook').findtext('orgname').strip()[:300]
-                        except: atn_orgname = None
-                        try: atn_last_name = agent_item.find('addressbook').findtext('last-name').strip()[:100]
-                        except: atn_last_name = None
-                        try: atn_first_name = agent_item.find('addressbook').findtext('first-name').strip()[:100]
-                        except: atn_first_name = None
-                        try: atn_country = agent_item.find('addressbook').find('address').findtext('country').strip()[:100]
-                        except: atn_country = None
-                        atn_address = None
-
                         # Append SQL data into dictionary to be written later
                         processed_agent.append({
                             "table_name" : "uspto.AGENT_A",
                             "ApplicationID" : app_no,
                             "Position" : atn_position,
-                            "OrgName" : atn_orgname,
-                            "LastName" : atn_last_name,
-                            "FirstName" : atn_first_name,
-                            "Country" : atn_country,
+                            **USPTOFieldMapping.extract_fields("aXML4", "AGENT_A", agent_item),
                             "FileName" : args_array['file_name']
                         })
                         #print(processed_agent)
@@ -419,33 +368,12 @@ def extract_XML4_application(raw_data, args_array):
         if asn_elem is not None:
             for asn_item in asn_elem.findall('assignee'):
                 if(asn_item.find('addressbook') != None):
-                    try: asn_orgname = asn_item.find('addressbook').findtext('orgname').strip()[:300]
-                    except: asn_orgname = None
-                    try: asn_firstname = asn_item.find('addressbook').findtext('first-name').strip()[:100]
-                    except: asn_firstname = None
-                    try: asn_lastname = asn_item.find('addressbook').findtext('last-name').strip()[:100]
-                    except: asn_lastname = None
-                    try: asn_role = asn_item.find('addressbook').findtext('role').strip()[:5]
-                    except: asn_role = None
-                    try: asn_city = asn_item.find('addressbook').find('address').findtext('city').strip()[:50]
-                    except: asn_city = None
-                    try: asn_state = asn_item.find('addressbook').find('address').findtext('state').strip()[:10]
-                    except: asn_state = None
-                    try: asn_country = asn_item.find('addressbook').find('address').findtext('country').strip()[:3]
-                    except: asn_country = None
-
                     # Append SQL data into dictionary to be written later
                     processed_assignee.append({
                         "table_name" : "uspto.ASSIGNEE_A",
                         "ApplicationID" : app_no,
                         "Position" : position,
-                        "OrgName" : asn_orgname,
-                        "FirstName" : asn_firstname,
-                        "LastName" : asn_lastname,
-                        "Role" : asn_role,
-                        "City" : asn_city,
-                        "State" : asn_state,
-                        "Country" : asn_country,
+                        **USPTOFieldMapping.extract_fields("aXML4", "ASSIGNEE_A", asn_item),
                         "FileName" : args_array['file_name']
                     })
                     #print(processed_assignee)
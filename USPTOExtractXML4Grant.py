@@ -16,6 +16,8 @@ import sys
 # Import USPTO Parser Functions
 import USPTOLogger
 import USPTOSanitizer
+import USPTORecords
+import USPTOFieldMapping
 
 # Function used to extract data from XML4 formatted patent grants
 def extract_XML4_grant(raw_data, args_array):
@@ -45,7 +47,9 @@ def extract_XML4_grant(raw_data, args_array):
     processed_foreignpriority = []
 
     # Pass the raw_data data into Element Tree
-    document_root = ET.fromstring(raw_data)
+    # unless it has already been parsed by the splitter
+    if ET.iselement(raw_data): document_root = raw_data
+    else: document_root = ET.fromstring(raw_data)
 
     # Start the extraction of XML data
     r = document_root.find('us-bibliographic-data-grant')
@@ -90,7 +94,7 @@ def extract_XML4_grant(raw_data, args_array):
         position = 1
         if ic is not None:
             for icc in ic.findall('classification-ipcr'):
-                for x in icc.getchildren():
+                for x in icc:
                     if(USPTOSanitizer.check_tag_exists(x,'section')):
                         try: i_class_sec = x.text.strip()[:15]
                         except: i_class_sec = None
@@ -150,18 +154,17 @@ def extract_XML4_grant(raw_data, args_array):
                 try: cpc_class_sgr = cpc_item.findtext('subgroup')
                 except: cpc_class_sgr = None
 
-                # Append SQL data into dictionary to be written later
-                processed_cpcclass.append({
-                    "table_name" : "uspto.CPCCLASS_G",
-                    "GrantID" : document_id,
-                    "Position" : cpc_position,
-                    "Section" : cpc_section,
-                    "Class" : cpc_class,
-                    "SubClass" : cpc_subclass,
-                    "MainGroup" : cpc_class_mgr,
-                    "SubGroup" : cpc_class_sgr,
-                    "FileName" : args_array['file_name']
-                })
+                # Append SQL data into record to be written later
+                processed_cpcclass.append(USPTORecords.CpcclassGrantRecord(
+                    GrantID = document_id,
+                    Position = cpc_position,
+                    Section = cpc_section,
+                    Class = cpc_class,
+                    SubClass = cpc_subclass,
+                    MainGroup = cpc_class_mgr,
+                    SubGroup = cpc_class_sgr,
+                    FileName = args_array['file_name']
+                ))
                 #print(processed_cpcclass)
                 cpc_position += 1
 
@@ -185,18 +188,17 @@ def extract_XML4_grant(raw_data, args_array):
                     try: cpc_class_sgr = cpc_item.findtext('subgroup')
                     except: cpc_class_sgr = None
 
-                    # Append SQL data into dictionary to be written later
-                    processed_cpcclass.append({
-                        "table_name" : "uspto.CPCCLASS_G",
-                        "GrantID" : document_id,
-                        "Position" : cpc_position,
-                        "Section" : cpc_section,
-                        "Class" : cpc_class,
-                        "SubClass" : cpc_subclass,
-                        "MainGroup" : cpc_class_mgr,
-                        "SubGroup" : cpc_class_sgr,
-                        "FileName" : args_array['file_name']
-                    })
+                    # Append SQL data into record to be written later
+                    processed_cpcclass.append(USPTORecords.CpcclassGrantRecord(
+                        GrantID = document_id,
+                        Position = cpc_position,
+                        Section = cpc_section,
+                        Class = cpc_class,
+                        SubClass = cpc_subclass,
+                        MainGroup = cpc_class_mgr,
+                        SubGroup = cpc_class_sgr,
+                        FileName = args_array['file_name']
+                    ))
                     #print(processed_cpcclass)
                     cpc_position += 1
         """
@@ -268,18 +270,17 @@ def extract_XML4_grant(raw_data, args_array):
                     logger.warning("There was an error parsing the cpc class for Grant ID: " + document_id + " in file: " + url_link)
                     logger.warning("Traceback: " + traceback.format_exc())
 
-                # Append SQL data into dictionary to be written later
-                processed_cpcclass.append({
-                    "table_name" : "uspto.CPCCLASS_G",
-                    "GrantID" : document_id,
-                    "Position" : cpc_position,
-                    "Section" : cpc_section,
-                    "Class" : cpc_class,
-                    "SubClass" : cpc_subclass,
-                    "MainGroup" : cpc_class_mgr,
-                    "SubGroup" : cpc_class_sgr,
-                    "FileName" : args_array['file_name']
-                })
+                # Append SQL data into record to be written later
+                processed_cpcclass.append(USPTORecords.CpcclassGrantRecord(
+                    GrantID = document_id,
+                    Position = cpc_position,
+                    Section = cpc_section,
+                    Class = cpc_class,
+                    SubClass = cpc_subclass,
+                    MainGroup = cpc_class_mgr,
+                    SubGroup = cpc_class_sgr,
+                    FileName = args_array['file_name']
+                ))
                 #print(processed_cpcclass)
                 cpc_position += 1
 
@@ -385,37 +386,35 @@ def extract_XML4_grant(raw_data, args_array):
                     # US patent citations
                     if(citation_country.strip().upper() == 'US'):
 
-                        # Append SQL data into dictionary to be written later
-                        processed_gracit.append({
-                            "table_name" : "uspto.GRACIT_G",
-                            "GrantID" : document_id,
-                            "Position" : uspatcit_position,
-                            "CitedID" : citation_grant_id,
-                            "Kind" : citation_kind,
-                            "Name" : citation_name,
-                            "Date" : citation_date,
-                            "Country" : citation_country,
-                            "Category" : citation_category,
-                            "FileName" : args_array['file_name']
-                        })
+                        # Append SQL data into record to be written later
+                        processed_gracit.append(USPTORecords.GracitRecord(
+                            GrantID = document_id,
+                            Position = uspatcit_position,
+                            CitedID = citation_grant_id,
+                            Kind = citation_kind,
+                            Name = citation_name,
+                            Date = citation_date,
+                            Country = citation_country,
+                            Category = citation_category,
+                            FileName = args_array['file_name']
+                        ))
                         #print(processed_usclass)
                         uspatcit_position += 1
 
                     elif citation_country.strip().upper() != 'US':
 
-                        # Append SQL data into dictionary to be written later
-                        processed_forpatcit.append({
-                            "table_name" : "uspto.FORPATCIT_G",
-                            "GrantID" : document_id,
-                            "Position" : forpatcit_position,
-                            "CitedID" : citation_grant_id,
-                            "Kind" : citation_kind,
-                            "Name" : citation_name,
-                            "Date" : citation_date,
-                            "Country" : citation_country,
-                            "Category" : citation_category,
-                            "FileName" : args_array['file_name']
-                        })
+                        # Append SQL data into record to be written later
+                        processed_forpatcit.append(USPTORecords.ForpatcitRecord(
+                            GrantID = document_id,
+                            Position = forpatcit_position,
+                            CitedID = citation_grant_id,
+                            Kind = citation_kind,
+                            Name = citation_name,
+                            Date = citation_date,
+                            Country = citation_country,
+                            Category = citation_category,
+                            FileName = args_array['file_name']
+                        ))
                         forpatcit_position += 1
                         #print(processed_forpatcit)
 
@@ -482,18 +481,8 @@ def extract_XML4_grant(raw_data, args_array):
                     try: inventor_status = apt.attrib['app-type']
                     except: inventor_status = None
                     if(apt.find('addressbook') != None):
-                        try: applicant_orgname = apt.find('addressbook').findtext('orgname')[:300].strip()
-                        except: applicant_orgname = None
-                        try: applicant_first_name = apt.find('addressbook').findtext('first-name')[:100].strip()
-                        except: applicant_first_name = None
-                        try: applicant_last_name = apt.find('addressbook').findtext('last-name')[:100].strip()
-                        except: applicant_last_name = None
-                        try: applicant_city = apt.find('addressbook').find('address').findtext('city')[:100].strip()
-                        except: applicant_city = None
-                        try: applicant_state = apt.find('addressbook').find('address').findtext('state')[:25].strip()
-                        except: applicant_state = None
-                        try: applicant_country = apt.find('addressbook').find('address').findtext('country')[:5].strip()
-                        except: applicant_country = None
+                        # Get the applicant columns from the field mapping
+                        applicant = USPTOFieldMapping.extract_fields("gXML4", "APPLICANT_G", apt)
                         try: inventor_residence = apt.findtext('residence')[:100].strip()
                         except: inventor_residence = None
 
@@ -501,13 +490,8 @@ def extract_XML4_grant(raw_data, args_array):
                         processed_applicant.append({
                             "table_name" : "uspto.APPLICANT_G",
                             "GrantID" : document_id,
-                            "OrgName" : applicant_orgname,
                             "Position" : appl_position,
-                            "FirstName" : applicant_first_name,
-                            "LastName" : applicant_last_name,
-                            "City" : applicant_city,
-                            "State" : applicant_state,
-                            "Country" : applicant_country,
+                            **applicant,
                             "FileName" : args_array['file_name']
                         })
                         #print(processed_applicant)
@@ -515,19 +499,18 @@ def extract_XML4_grant(raw_data, args_array):
 
                         # Check if the applicant is inventor
                         if "inventor" in inventor_status:
-                            # Append SQL data into dictionary to be written later
-                            processed_inventor.append({
-                                "table_name" : "uspto.INVENTOR_G",
-                                "GrantID" : document_id,
-                                "Position" : invt_position,
-                                "FirstName" : applicant_first_name,
-                                "LastName" : applicant_last_name,
-                                "City" : applicant_city,
-                                "State" : applicant_state,
-                                "Country" : applicant_country,
-                                "Residence" : inventor_residence,
-                                "FileName" : args_array['file_name']
-                            })
+                            # Append SQL data into record to be written later
+                            processed_inventor.append(USPTORecords.InventorGrantRecord(
+                                GrantID = document_id,
+                                Position = invt_position,
+                                FirstName = applicant['FirstName'],
+                                LastName = applicant['LastName'],
+                                City = applicant['City'],
+                                State = applicant['State'],
+                                Country = applicant['Country'],
+                                Residence = inventor_residence,
+                                FileName = args_array['file_name']
+                            ))
                             #print(processed_inventor)
                             invt_position += 1
 
@@ -537,33 +520,13 @@ def extract_XML4_grant(raw_data, args_array):
                     try: inventor_sequence = USPTOSanitizer.strip_leading_zeros(inv.attrib['sequence'])
                     except: inventor_sequence = position
                     if inv.find('addressbook') != None:
-                        try: inventor_first_name = inv.find('addressbook').findtext('first-name')[:100].strip()
-                        except: inventor_first_name = None
-                        try: inventor_last_name = inv.find('addressbook').findtext('last-name')[:100].strip()
-                        except: inventor_last_name = None
-                        try: inventor_city = inv.find('addressbook').find('address').findtext('city')[:100].strip()
-                        except: inventor_city = None
-                        try: inventor_state = inv.find('addressbook').find('address').findtext('state')[:100].strip()
-                        except: inventor_state = None
-                        try:
-                            inventor_country = inv.find('addressbook').find('address').findtext('country')[:5].strip()
-                        except: inventor_country = None
-                        try: inventor_residence = inv.find('addressbook').find('address').findtext('country')[:5].strip()
-                        except: inventor_residence = None
-
-                        # Append SQL data into dictionary to be written later
-                        processed_inventor.append({
-                            "table_name" : "uspto.INVENTOR_G",
-                            "GrantID" : document_id,
-                            "Position" : invt_position,
-                            "FirstName" : inventor_first_name,
-                            "LastName" : inventor_last_name,
-                            "City" : inventor_city,
-                            "State" : inventor_state,
-                            "Country" : inventor_country,
-                            "Residence" : inventor_residence,
-                            "FileName" : args_array['file_name']
-                        })
+                        # Append SQL data into record to be written later
+                        processed_inventor.append(USPTORecords.InventorGrantRecord(
+                            GrantID = document_id,
+                            Position = invt_position,
+                            **USPTOFieldMapping.extract_fields("gXML4", "INVENTOR_G", inv),
+                            FileName = args_array['file_name']
+                        ))
                         #print(processed_inventor)
                         invt_position += 1
 
@@ -574,24 +537,12 @@ def extract_XML4_grant(raw_data, args_array):
                     try: agent_sequence = USPTOSanitizer.strip_leading_zeros(agn.attrib['sequence'])
                     except: agent_sequence = position
                     if(agn.find('addressbook') != None):
-                        try: agent_orgname = agn.find('addressbook').findtext('orgname')[:300].strip()
-                        except: agent_orgname = None
-                        try: agent_last_name = agn.find('addressbook').findtext('last-name')[:100].strip()
-                        except: agent_last_name = None
-                        try: agent_first_name = agn.find('addressbook').findtext('first-name')[:100].strip()
-                        except: agent_first_name = None
-                        try: agent_country = agn.find('addressbook').find('address').findtext('country')[:3].strip()
-                        except: agent_country = None
-
                         # Append SQL data into dictionary to be written later
                         processed_agent.append({
                             "table_name" : "uspto.AGENT_G",
                             "GrantID" : document_id,
                             "Position" : agent_sequence,
-                            "OrgName" : agent_orgname,
-                            "LastName" : agent_last_name,
-                            "FirstName" : agent_first_name,
-                            "Country" : agent_country,
+                            **USPTOFieldMapping.extract_fields("gXML4", "AGENT_G", agn),
                             "FileName" : args_array['file_name']
                         })
                         #print(processed_agent)
@@ -602,27 +553,12 @@ def extract_XML4_grant(raw_data, args_array):
             position = 1
             for x in asn.findall('assignee'):
                 if(x.find('addressbook') != None):
-                    try: asn_orgname = x.find('addressbook').findtext('orgname')[:500].strip()
-                    except: asn_orgname = None
-                    try: asn_role = x.find('addressbook').findtext('role')[:45].strip()
-                    except: asn_role = None
-                    try: asn_city = x.find('addressbook').find('address').findtext('city')[:100].strip()
-                    except: asn_city = None
-                    try: asn_state = x.find('addressbook').find('address').findtext('state')[:100].strip()
-                    except: asn_state = None
-                    try: asn_country = x.find('addressbook').find('address').findtext('country')[:5].strip()
-                    except: asn_country = None
-
                     # Append SQL data into dictionary to be written later
                     processed_assignee.append({
                         "table_name" : "uspto.ASSIGNEE_G",
                         "GrantID" : document_id,
                         "Position" : position,
-                        "OrgName" : asn_orgname,
-                        "Role" : asn_role,
-                        "City" : asn_city,
-                        "State" : asn_state,
-                        "Country" : asn_country,
+                        **USPTOFieldMapping.extract_fields("gXML4", "ASSIGNEE_G", x),
                         "FileName" : args_array['file_name']
                     })
                     #print(processed_assignee)
@@ -632,42 +568,24 @@ def extract_XML4_grant(raw_data, args_array):
         for exm in r.findall('examiners'):
             position = 1
             for x in exm.findall('primary-examiner'):
-                try: exm_last_name = x.findtext('last-name')[:50].strip()
-                except: exm_last_name = None
-                try: exm_first_name = x.findtext('first-name')[:50].strip()
-                except: exm_first_name = None
-                try: exm_department = x.findtext('department')[:100].strip()
-                except: exm_department = None
-
                 # Append SQL data into dictionary to be written later
                 processed_examiner.append({
                     "table_name" : "uspto.EXAMINER_G",
                     "GrantID" : document_id,
                     "Position" : position,
-                    "LastName" : exm_last_name,
-                    "FirstName" : exm_first_name,
-                    "Department" : exm_department,
+                    **USPTOFieldMapping.extract_fields("gXML4", "EXAMINER_G", x),
                     "FileName" : args_array['file_name']
                 })
                 #print(processed_examiner)
                 position += 1
 
             for x in exm.findall('assistant-examiner'):
-                try: exm_last_name = x.findtext('last-name')[:50].strip()
-                except: exm_last_name = None
-                try: exm_first_name = x.findtext('first-name')[:50].strip()
-                except: exm_first_name = None
-                try: exm_department = x.findtext('department')[:100].strip()
-                except: exm_department = None
-
                 # Append SQL data into dictionary to be written later
                 processed_examiner.append({
                     "table_name" : "uspto.EXAMINER_G",
                     "GrantID" : document_id,
                     "Position" : position,
-                    "LastName" : exm_last_name,
-                    "FirstName" : exm_first_name,
-                    "Department" : exm_department,
+                    **USPTOFieldMapping.extract_fields("gXML4", "EXAMINER_G", x),
                     "FileName" : args_array['file_name']
                 })
                 #print(processed_examiner)
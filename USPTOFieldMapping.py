@@ -0,0 +1,230 @@
+# USPTOFieldMapping.py
+# USPTO Bulk Data Parser - Field Mapping
+# Description: Imported to the USPTOExtract modules.  Holds the mapping of XML paths to
+# database columns for the tables of each XML format, and compiles each mapping once
+# into accessor functions that extract the columns of a record element.
+# Author: Joseph Lee
+# Email: joseph@ripplesoftware.ca
+# Website: www.ripplesoftware.ca
+# Github: www.github.com/rippledj/uspto
+
+# Import USPTO Parser Functions
+import USPTOSanitizer
+
+# The columns extracted from a record element for each XML format and table.
+# Each field is (column, path, operations).  The path is relative to the record
+# element, with '/' between child tags, or '@name' for an attribute.  A path can
+# also be a list of paths, and the first path with all of its parent elements found
+# is used.  The operations are applied in order to the text found: a number truncates
+# the text to that length, and a name calls the sanitizer of that name.  A column is
+# None if the path is not found.
+field_mappings = {
+    "gXML4" : {
+        "APPLICANT_G" : [
+            ("OrgName", "addressbook/orgname", (300, "strip")),
+            ("FirstName", "addressbook/first-name", (100, "strip")),
+            ("LastName", "addressbook/last-name", (100, "strip")),
+            ("City", "addressbook/address/city", (100, "strip")),
+            ("State", "addressbook/address/state", (25, "strip")),
+            ("Country", "addressbook/address/country", (5, "strip"))
+        ],
+        "INVENTOR_G" : [
+            ("FirstName", "addressbook/first-name", (100, "strip")),
+            ("LastName", "addressbook/last-name", (100, "strip")),
+            ("City", "addressbook/address/city", (100, "strip")),
+            ("State", "addressbook/address/state", (100, "strip")),
+            ("Country", "addressbook/address/country", (5, "strip")),
+            ("Residence", "addressbook/address/country", (5, "strip"))
+        ],
+        "AGENT_G" : [
+            ("OrgName", "addressbook/orgname", (300, "strip")),
+            ("LastName", "addressbook/last-name", (100, "strip")),
+            ("FirstName", "addressbook/first-name", (100, "strip")),
+            ("Country", "addressbook/address/country", (3, "strip"))
+        ],
+        "ASSIGNEE_G" : [
+            ("OrgName", "addressbook/orgname", (500, "strip")),
+            ("Role", "addressbook/role", (45, "strip")),
+            ("City", "addressbook/address/city", (100, "strip")),
+            ("State", "addressbook/address/state", (100, "strip")),
+            ("Country", "addressbook/address/country", (5, "strip"))
+        ],
+        "EXAMINER_G" : [
+            ("LastName", "last-name", (50, "strip")),
+            ("FirstName", "first-name", (50, "strip")),
+            ("Department", "department", (100, "strip"))
+        ]
+    },
+    "gXML2" : {
+        "INVENTOR_G" : [
+            ("FirstName", "NAM/FNM", ("strip", 100)),
+            ("LastName", "NAM/SNM", ("strip", 100)),
+            ("City", "ADR/CITY", ("strip", 100)),
+            ("State", "ADR/STATE", ("strip", 3)),
+            ("Country", "ADR/CTRY", ("strip", 3))
+        ],
+        # The first and last names are in the columns they have always been stored in
+        "AGENT_G" : [
+            ("OrgName", "NAM/ONM", ("strip", 300)),
+            ("LastName", "NAM/FNM", ("strip", 100)),
+            ("FirstName", "NAM/SNM", ("strip", 100)),
+            ("State", "ADR/STATE", ("strip", 30)),
+            ("Country", "ADR/CTRY", ("strip", 3))
+        ],
+        "ASSIGNEE_G" : [
+            ("OrgName", "NAM/ONM", ("strip", 500)),
+            ("City", "ADR/CITY", ("strip", 100)),
+            ("State", "ADR/STATE", ("strip", 30)),
+            ("Country", "ADR/CTRY", ("strip", 3))
+        ],
+        "EXAMINER_G" : [
+            ("LastName", "NAM/SNM", ("strip", 50)),
+            ("FirstName", "NAM/FNM", ("strip", 50))
+        ]
+    },
+    "aXML4" : {
+        "APPLICANT_A" : [
+            ("OrgName", "addressbook/orgname", ("strip_for_csv", 300)),
+            ("FirstName", "addressbook/first-name", ("strip_for_csv", 100)),
+            ("LastName", "addressbook/last-name", ("strip_for_csv", 100)),
+            ("City", "addressbook/address/city", ("strip", 100)),
+            ("State", "addressbook/address/state", ("strip", 100)),
+            ("Country", "addressbook/address/country", ("strip", 100))
+        ],
+        "INVENTOR_A" : [
+            ("FirstName", "addressbook/first-name", ("strip", 100)),
+            ("LastName", "addressbook/last-name", ("strip", 100)),
+            ("City", "addressbook/address/city", ("strip", 100)),
+            ("State", "addressbook/address/state", ("strip", 100)),
+            ("Country", "addressbook/address/country", ("strip", 100)),
+            ("Nationality", "nationality/country", ("strip", 100)),
+            ("Residence", "residence/country", ("strip", 300))
+        ],
+        "AGENT_A" : [
+            ("OrgName", "addressbook/orgname", ("strip", 300)),
+            ("LastName", "addressbook/last-name", ("strip", 100)),
+            ("FirstName", "addressbook/first-name", ("strip", 100)),
+            ("Country", "addressbook/address/country", ("strip", 100))
+        ],
+        "ASSIGNEE_A" : [
+            ("OrgName", "addressbook/orgname", ("strip", 300)),
+            ("FirstName", "addressbook/first-name", ("strip", 100)),
+            ("LastName", "addressbook/last-name", ("strip", 100)),
+            ("Role", "addressbook/role", ("strip", 5)),
+            ("City", "addressbook/address/city", ("strip", 50)),
+            ("State", "addressbook/address/state", ("strip", 10)),
+            ("Country", "addressbook/address/country", ("strip", 3))
+        ]
+    },
+    "aXML1" : {
+        "INVENTOR_A" : [
+            ("FirstName", "name/given-name", ("strip", 100)),
+            ("LastName", "name/family-name", ("strip", 100)),
+            ("City", ["residence/residence-non-us/city", "residence/residence-us/city"], ("strip", 100)),
+            ("State", ["residence/residence-non-us/state", "residence/residence-us/state"], ("strip", 100)),
+            ("Country", ["residence/residence-non-us/country-code", "residence/residence-us/country-code"], ("strip", 100))
+        ],
+        "AGENT_A" : [
+            ("City", "address/city", ("strip", 50)),
+            ("State", "address/state", ("strip", 3)),
+            ("Country", "address/country/country-code", ("strip", 3))
+        ],
+        "ASSIGNEE_A" : [
+            ("Role", "assignee-type", ("strip", 100)),
+            ("OrgName", "organization-name", ("strip", 300)),
+            ("City", "address/city", ("strip", 100)),
+            ("State", "address/state", ("strip", 100)),
+            ("Country", "address/country/country-code", ("strip", 100))
+        ]
+    }
+}
+
+# XML formats where the text of a field is the text of the element and all of its
+# child tags joined, since the XML2 grant text is inside tags such as PDAT
+element_text_formats = ["gXML2"]
+
+# Tables where the country is set to US if it is not found and the state is a US state
+missing_country_tables = [
+    ("gXML2", "INVENTOR_G"),
+    ("gXML2", "AGENT_G"),
+    ("gXML2", "ASSIGNEE_G"),
+    ("aXML1", "AGENT_A"),
+    ("aXML1", "ASSIGNEE_A")
+]
+
+# Sanitizers that can be named in the field operations.  USPTOSanitizer is
+# looked up when called since it may not be fully imported yet.
+field_sanitizers = {
+    "strip" : str.strip,
+    "strip_for_csv" : lambda text: USPTOSanitizer.strip_for_csv(text)
+}
+
+# Returns a function that applies the operations of a field to a string
+def compile_field_operations(operations):
+
+    functions = []
+    for operation in operations:
+        if isinstance(operation, int):
+            functions.append(lambda text, length=operation: text[:length])
+        else:
+            functions.append(field_sanitizers[operation])
+
+    def apply_operations(text):
+        for function in functions:
+            text = function(text)
+        return text
+    return apply_operations
+
+# Returns a function that finds the text of a field in a record element.  Each tag
+# in the path is found in turn, so the text is taken from the first element with each
+# tag in the same way as chained find and findtext calls.  If element_text is set the
+# text of the last element and its child tags is joined with return_element_text.
+def compile_field_accessor(path, operations, element_text):
+
+    apply_operations = compile_field_operations(operations)
+    if isinstance(path, list): paths = path
+    else: paths = [path]
+    path_steps = []
+    for path in paths:
+        steps = path.split("/")
+        path_steps.append((steps[:-1], steps[-1]))
+
+    def field_accessor(record_element):
+        for parent_steps, last_step in path_steps:
+            element = record_element
+            for step in parent_steps:
+                element = element.find(step)
+                if element is None:
+                    break
+            if element is not None:
+                break
+        if element is None:
+            return None
+        if last_step.startswith("@"):
+            text = element.get(last_step[1:])
+        elif element_text:
+            text = USPTOSanitizer.return_element_text(element.find(last_step))
+        else:
+            text = element.findtext(last_step)
+        if text is None:
+            return None
+        return apply_operations(text)
+    return field_accessor
+
+# Compile the mapping of a table into a list of columns and their accessor functions
+def compile_field_mapping(fields, element_text):
+    return [(column, compile_field_accessor(path, operations, element_text)) for column, path, operations in fields]
+
+# The mappings of all XML formats and tables, compiled once when the module is imported
+compiled_field_mappings = {}
+for xml_format, table_mappings in field_mappings.items():
+    for table_name, fields in table_mappings.items():
+        compiled_field_mappings[(xml_format, table_name)] = compile_field_mapping(fields, xml_format in element_text_formats)
+
+# Returns a dictionary of the columns of a table extracted from a record element
+def extract_fields(xml_format, table_name, element):
+    fields = {column : field_accessor(element) for column, field_accessor in compiled_field_mappings[(xml_format, table_name)]}
+    # Set the country to US if it is missing and the state is a US state
+    if (xml_format, table_name) in missing_country_tables and fields['Country'] is None:
+        if USPTOSanitizer.is_US_state(fields['State']): fields['Country'] = "US"
+    return fields
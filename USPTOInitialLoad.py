@@ -0,0 +1,96 @@
+# USPTOInitialLoad.py
+# USPTO Bulk Data Parser - Initial Load
+# Description: Imported to the main USPTOParser.py.  Drops the primary keys and indexes of the
+# PostgreSQL data tables before the first load of the database, and rebuilds them in parallel
+# after all files are loaded, removing rows with duplicate keys first.
+# Author: Joseph Lee
+# Email: joseph@ripplesoftware.ca
+# Website: www.ripplesoftware.ca
+# Github: www.github.com/rippledj/uspto
+
+# Import Python Modules
+import time
+import traceback
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Import USPTO Parser Functions
+import USPTOLogger
+import SQLProcessor
+
+# Drop the primary keys and indexes of the data tables before loading
+def start_initial_load(args_array):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+    print("[Starting initial load. Primary keys and indexes will be rebuilt when all files are loaded...]")
+    logger.info("[Starting initial load. Primary keys and indexes will be rebuilt when all files are loaded...]")
+
+    database_connection = SQLProcessor.SQLProcess(args_array['database_args'])
+    database_connection.connect()
+    indexes_deferred = database_connection.defer_table_indexes()
+    database_connection.close()
+    return indexes_deferred
+
+# Rebuild the primary keys and indexes of one table on its own connection.
+# The primary key is rebuilt first since duplicate rows are removed before it is added.
+def rebuild_table_indexes(args_array, table_name, deferred_index_array):
+
+    database_connection = SQLProcessor.SQLProcess(args_array['database_args'])
+    database_connection.connect()
+    database_connection.set_maintenance_work_mem(args_array['initial_load_maintenance_work_mem'])
+
+    indexes_rebuilt = True
+    for table_name, index_name, index_type, definition in sorted(deferred_index_array, key=lambda item: item[2] != "constraint"):
+        if database_connection.rebuild_deferred_index(table_name, index_name, index_type, definition) == False:
+            indexes_rebuilt = False
+
+    database_connection.close()
+    return indexes_rebuilt
+
+# Rebuild the primary keys and indexes dropped for an initial load.  The
+# tables are rebuilt in parallel.  Does nothing if no initial load was started.
+def finish_initial_load(args_array):
+
+    # Set process time
+    start_time = time.time()
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    # Get the primary keys and indexes waiting to be rebuilt
+    database_connection = SQLProcessor.SQLProcess(args_array['database_args'])
+    deferred_index_array = database_connection.get_deferred_indexes()
+    database_connection.close()
+    if not len(deferred_index_array):
+        return True
+
+    print("[Rebuilding " + str(len(deferred_index_array)) + " primary keys and indexes after initial load...]")
+    logger.info("[Rebuilding " + str(len(deferred_index_array)) + " primary keys and indexes after initial load...]")
+
+    # Group the indexes by table
+    table_index_array = {}
+    for deferred_index in deferred_index_array:
+        table_index_array.setdefault(deferred_index[0], []).append(deferred_index)
+
+    # Rebuild the indexes of each table on a thread
+    indexes_rebuilt = True
+    with ThreadPoolExecutor(max_workers=args_array['initial_load_index_threads']) as executor:
+        rebuild_futures = [executor.submit(rebuild_table_indexes, args_array, table_name, table_indexes) for table_name, table_indexes in table_index_array.items()]
+        for rebuild_future in rebuild_futures:
+            try:
+                if rebuild_future.result() == False:
+                    indexes_rebuilt = False
+            except Exception as e:
+                indexes_rebuilt = False
+                traceback.print_exc()
+                exc_type, exc_obj, exc_tb = sys.exc_info()
+                fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+                logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+
+    if indexes_rebuilt:
+        print("[Finished rebuilding primary keys and indexes after initial load. Time consuming:{0} Time Finished: {1}]".format(time.time() - start_time, time.strftime("%c")))
+        logger.info("Finished rebuilding primary keys and indexes after initial load. Time consuming:{0} Time Finished: {1}".format(time.time() - start_time, time.strftime("%c")))
+    else:
+        print("[X] Failed to rebuild some primary keys and indexes after initial load.  They will be rebuilt the next time all files are processed.")
+        logger.error("[X] Failed to rebuild some primary keys and indexes after initial load.  They will be rebuilt the next time all files are processed.")
+    return indexes_rebuilt
@@ -0,0 +1,134 @@
+# USPTOLinkCache.py
+# USPTO Bulk Data Parser - Caches Bulk Data Listing Pages
+# Description: Imported to USPTOProcessLinks.py.  Fetches the bulk data listing pages with a
+# per-host rate limit and caches the links found on each page with its ETag and Last-Modified
+# headers so only pages that changed are downloaded and parsed again.
+# Author: Joseph Lee
+# Email: joseph@ripplesoftware.ca
+# Website: www.ripplesoftware.ca
+# Github: www.github.com/rippledj/uspto
+
+# Import Python Modules
+import time
+import os
+import sys
+import json
+import hashlib
+import threading
+import traceback
+import urllib.request, urllib.parse, urllib.error
+import ssl
+from concurrent.futures import ThreadPoolExecutor
+from bs4 import BeautifulSoup
+
+# Import USPTO Parser Functions
+import USPTOLogger
+
+# The time each host can next be requested, shared by all fetching threads
+host_next_request_time = {}
+host_rate_limit_lock = threading.Lock()
+
+# Wait until the host of the url can be requested again.  Requests to the
+# same host are spaced at least link_request_interval seconds apart.
+def wait_for_host_rate_limit(url, args_array):
+
+    # Get the interval between requests to the same host
+    if args_array['sleep_link_building']: request_interval = args_array['link_request_interval']
+    else: request_interval = 0
+
+    host = urllib.parse.urlparse(url).netloc
+    # Reserve the next request time for the host
+    with host_rate_limit_lock:
+        request_time = max(time.time(), host_next_request_time.get(host, 0))
+        host_next_request_time[host] = request_time + request_interval
+    # Sleep until the reserved time
+    if request_time > time.time():
+        time.sleep(request_time - time.time())
+
+# Returns the filename of the cache file for a url
+def get_link_cache_file_name(url, args_array):
+    return args_array['link_cache_dirpath'] + hashlib.md5(url.encode("utf-8")).hexdigest() + ".json"
+
+# Returns the cached page for a url, or None if the url is not cached
+def read_link_cache(url, args_array):
+    cache_file_name = get_link_cache_file_name(url, args_array)
+    if os.path.isfile(cache_file_name):
+        try:
+            with open(cache_file_name, "r") as cache_file:
+                cached_page = json.load(cache_file)
+            # Check the cache file is for the url
+            if cached_page['url'] == url:
+                return cached_page
+        except Exception as e:
+            traceback.print_exc()
+    return None
+
+# Write the links found on a page to the cache with the page's headers
+def write_link_cache(url, etag, last_modified, href_array, args_array):
+    os.makedirs(args_array['link_cache_dirpath'], exist_ok=True)
+    cache_file_name = get_link_cache_file_name(url, args_array)
+    # Write to a temp file and move it into place so a cache file is never partly written
+    with open(cache_file_name + ".tmp", "w") as cache_file:
+        json.dump({
+            "url" : url,
+            "etag" : etag,
+            "last_modified" : last_modified,
+            "hrefs" : href_array
+        }, cache_file)
+    os.replace(cache_file_name + ".tmp", cache_file_name)
+
+# Returns the href of every link on a listing page.  If the page is cached
+# the request is conditional on the cached ETag and Last-Modified headers and
+# the cached links are returned if the page has not changed.
+def get_page_hrefs(url, args_array):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    # Set the context for SSL (not checking!)
+    # TODO: check the SSL context to allow validation of SSL certificate!
+    context = ssl.SSLContext()
+
+    # Build a conditional request from the cached page
+    request = urllib.request.Request(url)
+    cached_page = read_link_cache(url, args_array)
+    if cached_page is not None:
+        if cached_page['etag']:
+            request.add_header("If-None-Match", cached_page['etag'])
+        if cached_page['last_modified']:
+            request.add_header("If-Modified-Since", cached_page['last_modified'])
+
+    # Wait for the rate limit of the host
+    wait_for_host_rate_limit(url, args_array)
+
+    try:
+        response = urllib.request.urlopen(request, context=context)
+    except urllib.error.HTTPError as e:
+        # The page has not changed so use the cached links
+        if e.code == 304 and cached_page is not None:
+            if args_array['stdout_level'] == 1: print("-- Using cached links for unchanged page: " + url)
+            logger.info("-- Using cached links for unchanged page: " + url)
+            return cached_page['hrefs']
+        raise
+
+    with response:
+        content = response.read()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+
+    # Parse the page and collect all links
+    soup = BeautifulSoup(content, "html.parser")
+    href_array = []
+    for link in soup.find_all('a', href=True):
+        href_array.append(link['href'])
+
+    # Only cache pages that can be validated on the next request
+    if etag or last_modified:
+        write_link_cache(url, etag, last_modified, href_array, args_array)
+
+    return href_array
+
+# Returns the hrefs on each page in the url array, in the same order as the
+# url array.  The pages are fetched concurrently, subject to the host rate limit.
+def get_all_page_hrefs(url_array, args_array):
+    with ThreadPoolExecutor(max_workers=args_array['link_fetch_threads']) as executor:
+        return list(executor.map(lambda url: get_page_hrefs(url, args_array), url_array))
@@ -1,6 +1,6 @@
 # USPTOLogger.py
 # USPTO Bulk Data Parser - Processes for Managing Logs
-# Description: Processes handles log files.
+# Description: Processes handles log files and the process state database.
 # Author: Joseph Lee
 # Email: joseph@ripplesoftware.ca
 # Website: www.ripplesoftware.ca
@@ -13,6 +13,7 @@ import time
 import os
 import sys
 import pprint
+import sqlite3
 
 # Import USPTO Parser Functions
 import USPTOProcessLinks
@@ -34,10 +35,128 @@ def setup_logger(log_level, log_file):
     elif log_level == 3:
         logger.setLevel(logging.INFO)
 
-# Check the args_array log_lock_file and switch and write file as 'Processed'
-# TODO accept a passed arg to also write the log as processing, if needed by
-# to balance loads using log file in main_process.
-def write_process_log(args_array):
+# Document types stored in the process state database and the args_array
+# key of the link log file for each
+link_log_file_keys = {
+    "grant" : "grant_process_log_file",
+    "application" : "application_process_log_file",
+    "class" : "classification_process_log_file",
+    "PAIR" : "pair_process_log_file",
+    "legal" : "legal_process_log_file"
+}
+
+# Keys of the array of links returned for each document type
+link_array_keys = {
+    "grant" : "grants",
+    "application" : "applications",
+    "class" : "classifications",
+    "PAIR" : "PAIR",
+    "legal" : "legal"
+}
+
+# Open a connection to the process state database which stores the status of
+# each link.  The database uses WAL mode so processes can read while another
+# process updates a link, and each update is a single atomic transaction.
+def open_process_state(args_array):
+
+    connection = sqlite3.connect(args_array['process_state_database'], timeout=60)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("CREATE TABLE IF NOT EXISTS LINKS (DocumentType TEXT NOT NULL, Link TEXT NOT NULL, LinkType TEXT, Processed INTEGER DEFAULT 0, Verified INTEGER DEFAULT 0, PRIMARY KEY (DocumentType, Link))")
+    connection.execute("CREATE INDEX IF NOT EXISTS LINKS_status_idx ON LINKS (Processed, Verified)")
+    # Each status change is appended to the journal with the time it took to process the file
+    connection.execute("CREATE TABLE IF NOT EXISTS LINK_JOURNAL (DocumentType TEXT NOT NULL, Link TEXT NOT NULL, Status TEXT NOT NULL, StatusTime TEXT DEFAULT CURRENT_TIMESTAMP, Duration REAL)")
+    return connection
+
+# Set the status of a link and append the change to the journal in one transaction
+def write_link_status(args_array, status, start_time=None):
+
+    # Set the time taken to process the file if the start time is known
+    if start_time is not None: duration = time.time() - start_time
+    else: duration = None
+
+    connection = open_process_state(args_array)
+    with connection:
+        if status == "Verified":
+            cursor = connection.execute("UPDATE LINKS SET Processed = 1, Verified = 1 WHERE DocumentType = ? AND Link = ?", (args_array['document_type'], args_array['url_link']))
+        else:
+            cursor = connection.execute("UPDATE LINKS SET Processed = 1 WHERE DocumentType = ? AND Link = ?", (args_array['document_type'], args_array['url_link']))
+        connection.execute("INSERT INTO LINK_JOURNAL (DocumentType, Link, Status, Duration) VALUES (?, ?, ?, ?)", (args_array['document_type'], args_array['url_link'], status, duration))
+    connection.close()
+    # Return whether the link was found
+    return cursor.rowcount > 0
+
+# Compact the journal to the last record of each status of each link and
+# truncate the WAL file of the process state database
+def compact_process_journal(args_array):
+
+    logger = logging.getLogger("USPTO_Database_Construction")
+
+    connection = open_process_state(args_array)
+    with connection:
+        cursor = connection.execute("DELETE FROM LINK_JOURNAL WHERE rowid NOT IN (SELECT MAX(rowid) FROM LINK_JOURNAL GROUP BY DocumentType, Link, Status)")
+    connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    connection.close()
+
+    print("Compacted process state journal. Removed " + str(cursor.rowcount) + " records " + time.strftime("%c"))
+    logger.info("Compacted process state journal. Removed " + str(cursor.rowcount) + " records " + time.strftime("%c"))
+
+# Add the links in the link log files that are not in the process state
+# database yet.  The database keeps the status of links it already has.
+def import_link_files_to_process_state(args_array):
+
+    logger = logging.getLogger("USPTO_Database_Construction")
+
+    connection = open_process_state(args_array)
+    with connection:
+        for document_type, log_file_key in link_log_file_keys.items():
+            if not os.path.isfile(args_array[log_file_key]): continue
+            link_array = []
+            with open(args_array[log_file_key], "r") as link_file:
+                for line in link_file:
+                    # Ignore empty lines
+                    if line.strip() == "": continue
+                    line = line.strip().split(",")
+                    link_array.append((document_type, line[0], line[1], int(line[2] == "Processed"), int(len(line) > 3 and line[3] == "Verified")))
+            connection.executemany("INSERT OR IGNORE INTO LINKS (DocumentType, Link, LinkType, Processed, Verified) VALUES (?, ?, ?, ?, ?)", link_array)
+    connection.close()
+
+    print("Process state database updated from link log files " + time.strftime("%c"))
+    logger.info("Process state database updated from link log files " + time.strftime("%c"))
+
+# Write the status of each link in the process state database back to the
+# link log files so they can be checked after the script has completed
+def write_link_files_from_process_state(args_array):
+
+    logger = logging.getLogger("USPTO_Database_Construction")
+
+    try:
+        connection = open_process_state(args_array)
+        for document_type, log_file_key in link_log_file_keys.items():
+            if not os.path.isfile(args_array[log_file_key]): continue
+            # Write to a temporary file and replace the log file with it
+            with open(args_array[log_file_key] + ".tmp", "w") as link_file:
+                for link, link_type, processed, verified in connection.execute("SELECT Link, LinkType, Processed, Verified FROM LINKS WHERE DocumentType = ? ORDER BY rowid", (document_type,)):
+                    if verified: link_file.write(link + "," + link_type + ",Processed,Verified\n")
+                    elif processed: link_file.write(link + "," + link_type + ",Processed\n")
+                    else: link_file.write(link + "," + link_type + ",Unprocessed\n")
+            os.replace(args_array[log_file_key] + ".tmp", args_array[log_file_key])
+        connection.close()
+
+        print("Link log files updated from process state database " + time.strftime("%c"))
+        logger.info("Link log files updated from process state database " + time.strftime("%c"))
+
+    except Exception as e:
+        print("-- Exception during the writing of the link log files")
+        logger.error("-- Exception during the writing of the link log files")
+        traceback.print_exc()
+        exc_type, exc_obj, exc_tb = sys.exc_info()
+        fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+        logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+
+# Mark the link in args_array as 'Processed' in the process state database
+# and record the time taken to process the file from start_time
+def write_process_log(args_array, start_time=None):
 
     # Set the document type for processing
     document_type = args_array['document_type']
@@ -48,81 +167,19 @@ def write_process_log(args_array):
     print("Updating the log for processed file: " + args_array['url_link'])
     logger.info("Updating the log for processed file: " + args_array['url_link'])
 
-    # Set the log file to check and rewrite based on the document_type passed
-    if document_type == "grant" : log_file_to_rewrite = args_array['grant_process_log_file']
-    elif document_type == "application" : log_file_to_rewrite = args_array['application_process_log_file']
-    elif document_type == "class" : log_file_to_rewrite = args_array['classification_process_log_file']
-    elif document_type == "PAIR" : log_file_to_rewrite = args_array['pair_process_log_file']
-    elif document_type == "legal" : log_file_to_rewrite = args_array['legal_process_log_file']
-
-    # Variable hold while loop running
-    log_rewrite_success = 0
-
     try:
 
-        while log_rewrite_success == 0:
-
-            # Create an array to store all lines to be rewritten after
-            log_rewrite_array = []
-
-            # Open log_lock_file to check status
-            print("-- File locking log file for complete " + document_type + " file: " + args_array['url_link'])
-            logger.info("-- File locking log file for complete " + document_type + " file: " + args_array['url_link'])
-            log_lock = open(args_array["log_lock_file"], "r")
-            locked_status = log_lock.read().strip()
-            log_lock.close()
-
-            # If the log lock file is set to open, rewrite log with changes and end while loop
-            if locked_status == "0":
-                # Write log lock as closed
-                log_lock = open(args_array["log_lock_file"], "w")
-                log_lock.write("1")
-                log_lock.close()
-                # Open the appropriate log file
-                log_file = open(log_file_to_rewrite, "r")
-                # Separate into array of arrays of original csv
-                log_file_data_array = log_file.readlines()
-                log_file.close()
-
-                # Loop through each line in the file
-                for line in log_file_data_array:
-                    # If the first element in line is the link we have just processed
-                    line = line.split(",")
-                    if line[0] == args_array["url_link"]:
-                        print("-- Found the URL link in log file")
-                        logger.info("-- Found the URL link: " + args_array['url_link'] + " in log file")
-                        # Append the line with "Processed"
-                        log_rewrite_array.append([line[0], line[1], "Processed\n"])
-                    # If the first element is not the line we are looking for
-                    else:
-                        # Append the line as is
-                        log_rewrite_array.append(line)
-
-                # Rewrite the new array to the log file in csv
-                log_file = open(log_file_to_rewrite, "w")
-                #print log_rewrite_array
-                for line in log_rewrite_array:
-                    #print line[0] + "," + line[1] + "," + line[2]
-                    log_file.write(",".join(line))
-                log_file.close()
-
-                # Set the log_lock to open again and close the file.
-                log_lock = open(args_array["log_lock_file"], "w")
-                log_lock.write("0")
-                log_lock.close()
-
-                # Print message to stdout and log file
-                print("-- Log updated for processed file: " + args_array['url_link'])
-                logger.info("-- Log updated for processed file: " + args_array['url_link'])
-
-                # End the while loop while by setting file_locked
-                log_rewrite_success = 1
-
-            # If the file was found to be locked by another process, close file then wait 1 second
-            else:
-                #print "waiting on log lock to be opened"
-                log_lock.close()
-                time.sleep(1)
+        # Update the status of the link
+        link_found = write_link_status(args_array, "Processed", start_time)
+
+        # Print message to stdout and log file with the number of
+        # documents in the file that failed to parse
+        if link_found:
+            print("-- Log updated for processed file: " + args_array['url_link'] + " Documents failed to parse: " + str(args_array.get('document_parse_errors', 0)))
+            logger.info("-- Log updated for processed file: " + args_array['url_link'] + " Documents failed to parse: " + str(args_array.get('document_parse_errors', 0)))
+        else:
+            print("-- URL link not found in process state database: " + args_array['url_link'])
+            logger.warning("-- URL link not found in process state database: " + args_array['url_link'])
 
     except Exception as e:
         # Print and log general fail comment
@@ -134,10 +191,8 @@ def write_process_log(args_array):
         logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
 
 
-# Check the args_array log_lock_file and switch and write file as 'Verified'
-# TODO accept a passed arg to also write the log as processing, if needed by
-# to balance loads using log file in main_process.
-def write_verified_log(args_array):
+# Mark the link in args_array as 'Verified' in the process state database
+def write_verified_log(args_array, start_time=None):
 
     # Set the document type for processing
     document_type = args_array['document_type']
@@ -148,73 +203,12 @@ def write_verified_log(args_array):
     print("[Updating the log for verified file: " + args_array['url_link'] + "]")
     logger.info("[Updating the log for verified file: " + args_array['url_link'] + "]")
 
-    # Set the log file to check and rewrite based on the document_type passed
-    if document_type == "grant" : log_file_to_rewrite = args_array['grant_process_log_file']
-    elif document_type == "application" : log_file_to_rewrite = args_array['application_process_log_file']
-    elif document_type == "class" : log_file_to_rewrite = args_array['classification_process_log_file']
-    elif document_type == "PAIR" : log_file_to_rewrite = args_array['pair_process_log_file']
-    elif document_type == "legal" : log_file_to_rewrite = args_array['legal_process_log_file']
-
-    # Variable hold while loop running
-    log_rewrite_success = 0
-    # Hold the loop until log has been modified
-    while log_rewrite_success == 0:
-
-        # Create an array to store all lines to be rewritten after
-        log_rewrite_array = []
-        # Open log_lock_file to check status
-        log_lock = open(args_array["log_lock_file"], "r")
-        locked_status = log_lock.read().strip()
-        log_lock.close()
-
-        # If the log lock file is set to open, rewrite log with changes and end while loop
-        if locked_status == "0":
-            # Write log lock as closed
-            log_lock = open(args_array["log_lock_file"], "w")
-            log_lock.write("1")
-            log_lock.close()
-            # Open the appropriate log file
-            log_file = open(log_file_to_rewrite, "r")
-            # Separate into array of arrays of original csv
-            log_file_data_array = log_file.readlines()
-            log_file.close()
-
-            # Loop through each line in the file
-            for line in log_file_data_array:
-                # If the first element in line is the link we have just processed
-                line = line.split(",")
-                if line[0] == args_array["url_link"]:
-                    print("-- Found the URL link in log file")
-                    # Append the line with "Processed"
-                    log_rewrite_array.append([line[0], line[1], "Processed", "Verified\n"])
-                # If the first element is not the line we are looking for
-                else:
-                    # Append the line as is
-                    log_rewrite_array.append(line)
-
-            # Rewrite the new array to the log file in csv
-            log_file = open(log_file_to_rewrite, "w")
-            for line in log_rewrite_array:
-                #print line[0] + "," + line[1] + "," + line[2]
-                log_file.write(",".join(line))
-            log_file.close()
-
-            # Set the log_lock to open again and close the file.
-            log_lock = open(args_array["log_lock_file"], "w")
-            log_lock.write("0")
-            log_lock.close()
-
-            # Print message to stdout and log file
-            print("[Log updated for verified file: " + args_array['url_link'] + "]")
-            logger.info("[Log updated for verified file: " + args_array['url_link'] + "]")
-
-            # End the while loop while by setting file_locked
-            log_rewrite_success = 1
-
-        # If the file was found to be locked by another process, close file then wait 1 second
-        else:
-            log_lock.close()
-            time.sleep(1)
+    # Update the status of the link
+    write_link_status(args_array, "Verified", start_time)
+
+    # Print message to stdout and log file
+    print("[Log updated for verified file: " + args_array['url_link'] + "]")
+    logger.info("[Log updated for verified file: " + args_array['url_link'] + "]")
 
 # Write all log links to files
 def write_link_arrays_to_file(all_links_array, args_array):
@@ -338,111 +332,42 @@ def update_link_arrays_to_file(all_links_array, args_array):
     print("Finished updating all patent grant and application links to log files. Finshed Time: " + time.strftime("%c"))
     logger.info('Finished updating all patent grant and application links to log files ' + time.strftime("%c"))
 
-# Collect all links from file
+# Collect all links that need to be processed, or verified, from the process state database
 def collect_all_required_links_from_file(args_array):
 
     logger = logging.getLogger("USPTO_Database_Construction")
 
-    # Initialize file arrays for temp storage
-    grant_temp_array = []
-    application_temp_array = []
-    classification_temp_array = []
-    pair_temp_array = []
-    legal_temp_array = []
+    # Initialize an array for the links of each document type
+    all_links_array = {
+        "grants" : [],
+        "applications" : [],
+        "classifications" : [],
+        "PAIR" : [],
+        "legal" : []
+    }
 
     print('Reading all required links to download and parse ' + time.strftime("%c"))
     logger.info('Reading all required links to download and parse ' + time.strftime("%c"))
 
     try:
-        print('Reading all required grant links ' + time.strftime("%c"))
-        logger.info('Reading all required grant links ' + time.strftime("%c"))
-        # Read all required grant links into array
-        with open(args_array['grant_process_log_file'], "r") as grant_process_file:
-            for line in grant_process_file:
-                # Ignore empty lines
-                if line.strip() != "":
-                    # If doing verification, collect processed files that are not verified already
-                    if "verify" in args_array['command_args']:
-                        if line.strip() != "" and line.split(",")[2].replace("\n", "") == "Processed" and len(line.split(",")) == 3:
-                            grant_temp_array.append(line.split(","))
-                    # If parsing bulk-data, collect all unprocessed files
-                    else:
-                        if line.strip() != "" and line.split(",")[2].replace("\n", "") != "Processed":
-                            grant_temp_array.append(line.split(","))
-
-        print('Reading all required application links ' + time.strftime("%c"))
-        logger.info('Reading all required application links ' + time.strftime("%c"))
-        # Read all required applicaton links into array
-        with open(args_array['application_process_log_file'], "r") as application_process_file:
-            for line in application_process_file:
-                # Ignore empty lines
-                if line.strip() != "":
-                    # If doing verification, collect processed files that are not verified already
-                    if "verify" in args_array['command_args']:
-                        if line.split(",")[2].replace("\n", "") == "Processed"  and len(line.split(",")) == 3:
-                            application_temp_array.append(line.split(","))
-                    # If parsing bulk-data, collect all unprocessed files
-                    else:
-                        if line.split(",")[2].replace("\n", "") != "Processed":
-                            application_temp_array.append(line.split(","))
-
-        print('Reading all required classification links ' + time.strftime("%c"))
-        logger.info('Reading all required classification links ' + time.strftime("%c"))
-        # Read all required classification links into array
-        with open(args_array['classification_process_log_file'], "r") as classification_process_file:
-            for line in classification_process_file:
-                # If doing verification, collect processed files
-                if "verify" in args_array['command_args']:
-                    if line.split(",")[2].replace("\n", "") == "Processed" and len(line.split(",")) == 3:
-                        classification_temp_array.append(line.split(","))
-                # If parsing bulk-data, collect all unprocessed files
-                else:
-                    if line.split(",")[2].replace("\n", "") != "Processed":
-                        classification_temp_array.append(line.split(","))
-
-        print('Reading all required PAIR links ' + time.strftime("%c"))
-        logger.info('Reading all required PAIR links ' + time.strftime("%c"))
-        # Read all required PAIR links into array
-        with open(args_array['pair_process_log_file'], "r") as pair_process_file:
-            for line in pair_process_file:
-                # Ignore empty lines
-                if line.strip() != "":
-                    # If doing verification, collect processed files
-                    if "verify" in args_array['command_args']:
-                        if line.split(",")[2].replace("\n", "") == "Processed" and len(line.split(",")) == 3:
-                            pair_temp_array.append(line.split(","))
-                    # If parsing bulk-data, collect all unprocessed files
-                    else:
-                        if line.split(",")[2].replace("\n", "") != "Processed":
-                            pair_temp_array.append(line.split(","))
-
-        print('Reading all required legal links ' + time.strftime("%c"))
-        logger.info('Reading all required legal links ' + time.strftime("%c"))
-        # Read all required legal links into array
-        with open(args_array['legal_process_log_file'], "r") as legal_process_file:
-            for line in legal_process_file:
-                # Ignore empty lines
-                if line.strip() != "":
-                    # If doing verification, collect processed files
-                    if "verify" in args_array['command_args']:
-                        if line.split(",")[2].replace("\n", "") == "Processed" and len(line.split(",")) == 3:
-                            legal_temp_array.append(line.split(","))
-                    # If parsing bulk-data, collect all unprocessed files
-                    else:
-                        if line.split(",")[2].replace("\n", "") != "Processed":
-                            legal_temp_array.append(line.split(","))
+        connection = open_process_state(args_array)
+        # If doing verification, collect processed files that are not verified already
+        if "verify" in args_array['command_args']:
+            link_cursor = connection.execute("SELECT DocumentType, Link, LinkType FROM LINKS WHERE Processed = 1 AND Verified = 0 ORDER BY rowid")
+            link_status = "Processed"
+        # If parsing bulk-data, collect all unprocessed files
+        else:
+            link_cursor = connection.execute("SELECT DocumentType, Link, LinkType FROM LINKS WHERE Processed = 0 ORDER BY rowid")
+            link_status = "Unprocessed"
+        for document_type, link, link_type in link_cursor:
+            all_links_array[link_array_keys[document_type]].append([link, link_type, link_status])
+        connection.close()
 
         print('Finished reading all required links to download and parse ' + time.strftime("%c"))
         logger.info('Finished reading all required links to download and parse ' + time.strftime("%c"))
 
         # Return the array to main function
-        return({
-            "grants" : grant_temp_array,
-            "applications" : application_temp_array,
-            "classifications" : classification_temp_array,
-            "PAIR" : pair_temp_array,
-            "legal" : legal_temp_array
-        })
+        return all_links_array
 
     except Exception as e:
         print("Failed to get all links from log files " + time.strftime("%c"))
@@ -508,3 +433,8 @@ def build_or_update_link_files(args_array):
             exc_type, exc_obj, exc_tb = sys.exc_info()
             fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
             logger.error(str(e) + str(exc_type) + str(fname) + str(exc_tb.tb_lineno))
+
+    # Add any new links in the link log files to the process state database
+    import_link_files_to_process_state(args_array)
+    # Keep the journal of status changes small
+    compact_process_journal(args_array)
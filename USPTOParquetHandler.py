@@ -0,0 +1,132 @@
+# USPTOParquetHandler.py
+# USPTO Bulk Data Parser - Processes for Managing Parquet files
+# Description: Imported to USPTOCSVHandler.py.  Writes the extracted data to compressed
+# Parquet files with a schema built from the PostgreSQL database creation script
+# read by USPTOCSVHandler.py.
+# Author: Joseph Lee
+# Email: joseph@ripplesoftware.ca
+# Website: www.ripplesoftware.ca
+# Github: www.github.com/rippledj/uspto
+
+# Import Python Modules
+import time
+import traceback
+import os
+import sys
+import datetime
+
+# pyarrow is only required for the -parquet argument
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Import USPTO Parser Functions
+import USPTOLogger
+import USPTOCSVHandler
+
+# Number of rows buffered for each table before they are written to the
+# Parquet file as a row group
+parquet_batch_size = 50000
+# Compression used for the Parquet files
+parquet_compression = "zstd"
+# Returns the Parquet schema for a table with the columns in the order of the
+# csv field names.  Columns not found in the database table are stored as strings.
+def build_parquet_schema(table_name, field_names):
+
+    column_types = USPTOCSVHandler.get_table_column_types(table_name)
+
+    fields = []
+    for field_name in field_names:
+        sql_type = column_types.get(field_name.lower(), "VARCHAR")
+        if sql_type == "INT":
+            fields.append(pyarrow.field(field_name, pyarrow.int32()))
+        elif sql_type == "DATE":
+            fields.append(pyarrow.field(field_name, pyarrow.date32()))
+        elif sql_type == "BOOLEAN":
+            fields.append(pyarrow.field(field_name, pyarrow.bool_()))
+        else:
+            fields.append(pyarrow.field(field_name, pyarrow.string()))
+    return pyarrow.schema(fields)
+
+# Converts a value written to the csv file into a value of the Parquet column type.
+# Values that cannot be converted, or are out of range of the column type, are stored
+# as null so they do not fail the row group when it is written.
+def convert_parquet_value(value, arrow_type):
+
+    if value is None or value == "":
+        return None
+    try:
+        if pyarrow.types.is_integer(arrow_type):
+            value = int(value)
+            if value < -2 ** (arrow_type.bit_width - 1) or value >= 2 ** (arrow_type.bit_width - 1):
+                return None
+            return value
+        elif pyarrow.types.is_date(arrow_type):
+            if isinstance(value, datetime.date): return value
+            return datetime.date.fromisoformat(str(value)[:10])
+        elif pyarrow.types.is_boolean(arrow_type):
+            return str(value).lower() in ["1", "true", "t", "y"]
+        else:
+            return str(value)
+    except (ValueError, TypeError, OverflowError) as e:
+        return None
+
+# Writes rows to a Parquet file in row groups of parquet_batch_size rows.  Has the
+# writerow and close methods used on the csv.DictWriter and file objects in the
+# csv_file_array so it can be used in place of them.
+class ParquetDictWriter:
+
+    def __init__(self, parquet_file_name, table_name, field_names):
+        self.parquet_file_name = parquet_file_name
+        self.schema = build_parquet_schema(table_name, field_names)
+        # Buffer the rows as a list of values for each column
+        self.columns = [[] for field in self.schema]
+        self.row_count = 0
+        self.writer = pyarrow.parquet.ParquetWriter(parquet_file_name, self.schema, compression=parquet_compression)
+
+    # Buffer a dictionary row, or a record with the columns in
+    # field order, and write the buffered rows if the batch is full
+    def writerow(self, row):
+        if isinstance(row, dict):
+            row = [row.get(field.name) for field in self.schema]
+        for column, field, value in zip(self.columns, self.schema, row):
+            column.append(convert_parquet_value(value, field.type))
+        self.row_count += 1
+        if self.row_count >= parquet_batch_size:
+            self.flush()
+
+    # Write the buffered rows as a row group
+    def flush(self):
+        if self.row_count:
+            self.writer.write_table(pyarrow.Table.from_arrays([pyarrow.array(column, type=field.type) for column, field in zip(self.columns, self.schema)], schema=self.schema))
+            self.columns = [[] for field in self.schema]
+            self.row_count = 0
+
+    # Write the remaining rows and close the Parquet file
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+# Opens a Parquet file for a csv file key and returns the writer
+def open_parquet_file(file_type, key, parquet_file_name, field_names):
+    return ParquetDictWriter(parquet_file_name, USPTOCSVHandler.csv_table_names[file_type][key], field_names)
+
+# Check that the -parquet argument can be used
+def validate_parquet_arguments(command_args, args_array):
+
+    if "parquet" in command_args:
+        # pyarrow must be installed
+        if pyarrow is None:
+            print("-- The -parquet argument requires the pyarrow module.  Install it with: pip install pyarrow")
+            return False
+        # Parquet files replace the csv files so cannot be used with -csv
+        # or bulk database insertion which loads the csv files
+        if "csv" in command_args:
+            print("-- The -parquet and -csv arguments cannot be used together.")
+            return False
+        if "database" in command_args and args_array['database_insert_mode'] == "bulk":
+            print("-- The -parquet argument cannot be used with bulk database insertion.")
+            return False
+    return True
@@ -12,6 +12,7 @@ import time
 import os
 import sys
 import multiprocessing
+import queue
 import traceback
 import string
 import psutil
@@ -22,8 +23,13 @@ import USPTOLogger
 import SQLProcessor
 import USPTOSanitizer
 import USPTOProcessLinks
+import USPTOPrefetchDownloads
 import USPTOVerifyLinks
 import USPTOCSVHandler
+import USPTOParquetHandler
+import USPTOXMLSplitter
+import USPTOBulkLoader
+import USPTOInitialLoad
 import USPTOProcessAPSGrant
 import USPTOProcessXMLGrant
 import USPTOProcessXMLApplication
@@ -92,24 +98,50 @@ def start_thread_processes(links_array, args_array, database_args):
         fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
         logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
 
-    # Create a Queue to hold link pile and share between threads
-    link_queue = multiprocessing.Queue()
-    # Put all the links into the queue
+    # Create a list of all jobs with the document type appended to each link
+    job_array = []
     for link in links_array['classifications']:
         link.append("class")
-        link_queue.put(link)
+        job_array.append(link)
     for link in links_array['grants']:
         link.append("grant")
-        link_queue.put(link)
+        job_array.append(link)
     for link in links_array['applications']:
         link.append("application")
-        link_queue.put(link)
+        job_array.append(link)
     for link in links_array['PAIR']:
         link.append("PAIR")
-        link_queue.put(link)
+        job_array.append(link)
     for link in links_array['legal']:
         link.append("legal")
+        job_array.append(link)
+
+    # Order the jobs by estimated file size so the largest files are started first
+    # and the end of the run is not held up by a large file started last
+    job_array.sort(key=lambda link: USPTOProcessLinks.estimate_link_size(link, args_array), reverse=True)
+
+    # Create a Queue to hold link pile and share between threads
+    link_queue = multiprocessing.Queue()
+    # Put all the links into the queue
+    for link in job_array:
         link_queue.put(link)
+    # Put a sentinel for each process at the end of the queue to signal
+    # that there are no more links to process
+    for i in range(number_of_threads):
+        link_queue.put(None)
+
+    # Create a Queue for processes to report the status of each job and an
+    # Event to signal the load balancer when all jobs are finished
+    job_status_queue = multiprocessing.Queue()
+    all_jobs_finished = multiprocessing.Event()
+
+    # Create a Semaphore to limit the number of concurrent downloads separately
+    # from the number of processes.  Processes start parsing right away and only
+    # wait when they need to download a file and all download slots are in use.
+    args_array['download_semaphore'] = multiprocessing.Semaphore(args_array['max_concurrent_downloads'])
+    # Count of jobs taken from the queue, used by the prefetch stage to stay
+    # ahead of the processes
+    args_array['jobs_started'] = multiprocessing.Value('i', 0)
 
     print("Starting " + str(number_of_threads) + " process(es)... ")
     logger.info("Starting " + str(number_of_threads) + " process(es)... ")
@@ -119,15 +151,21 @@ def start_thread_processes(links_array, args_array, database_args):
         # If doing a verification of existing parsed database
         if "verify" in args_array['command_args']:
             # Create a thread and append to list
-            processes.append(multiprocessing.Process(target=verification_process, args=(link_queue, args_array, database_args, i)))
+            processes.append(multiprocessing.Process(target=verification_process, args=(link_queue, job_status_queue, args_array, database_args)))
         # If parsing bulk-data into database:
         else:
-            # Include argument `i` to delay start of threads to avoid to many concurrent downloads.
             # Create a thread and append to list
-            processes.append(multiprocessing.Process(target=main_process, args=(link_queue, args_array, database_args, i)))
+            processes.append(multiprocessing.Process(target=main_process, args=(link_queue, job_status_queue, args_array, database_args)))
+
+    # Keep the list of worker processes to check while tracking jobs
+    worker_processes = list(processes)
 
     # Append the load balancer thread once to the loop
-    processes.append(multiprocessing.Process(target=load_balancer_thread, args=(link_queue, args_array)))
+    processes.append(multiprocessing.Process(target=load_balancer_thread, args=(link_queue, job_status_queue, all_jobs_finished, args_array)))
+
+    # Append the download prefetch process if prefetching is set
+    if args_array['prefetch_files'] > 0:
+        processes.append(multiprocessing.Process(target=USPTOPrefetchDownloads.prefetch_process, args=(job_array, args_array, all_jobs_finished)))
 
     # Loop through and start all processes
     for p in processes:
@@ -140,29 +178,57 @@ def start_thread_processes(links_array, args_array, database_args):
     print("All " + str(number_of_threads) + " initial " + action + " process(es) have been loaded... ")
     logger.info("All " + str(number_of_threads) + " initial " + action + " process(es) have been loaded... ")
 
+    # Track the status of each job until all are finished
+    track_job_status(job_status_queue, worker_processes, len(job_array))
+    # Signal the load balancer to stop
+    all_jobs_finished.set()
+
     # This .join() function prevents the script from progressing further
     for p in processes:
         p.join()
 
+# Collect the status of each job from the processes until all jobs
+# are finished or all processes have exited
+def track_job_status(job_status_queue, processes, total_jobs_count):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    # Keep track of the jobs that have finished
+    jobs_finished_count = 0
+    jobs_failed_array = []
+
+    while jobs_finished_count < total_jobs_count:
+        # Get the next job status from the queue
+        try:
+            job_status = job_status_queue.get(timeout=10)
+        except queue.Empty:
+            # If all processes have exited then no more status will arrive
+            if not any(p.is_alive() for p in processes):
+                break
+            continue
+
+        # Each job status is [url_link, status, time_consuming]
+        if job_status[1] != "started":
+            jobs_finished_count += 1
+            if job_status[1] == "failed":
+                jobs_failed_array.append(job_status[0])
+            print('[Job {0} of {1} {2}: {3} Time consuming:{4}]'.format(jobs_finished_count, total_jobs_count, job_status[1], job_status[0], job_status[2]))
+            logger.info('Job {0} of {1} {2}: {3} Time consuming:{4}'.format(jobs_finished_count, total_jobs_count, job_status[1], job_status[0], job_status[2]))
+
+    # Print and log the summary of all jobs
+    print("[{0} of {1} jobs finished, {2} failed...]".format(jobs_finished_count, total_jobs_count, len(jobs_failed_array)))
+    logger.info("{0} of {1} jobs finished, {2} failed...".format(jobs_finished_count, total_jobs_count, len(jobs_failed_array)))
+    for url_link in jobs_failed_array:
+        logger.warning("Job failed: " + url_link)
+
 # Verification function for multiprocessing
-def verification_process(link_queue, args_array, database_args, spooling_value):
+def verification_process(link_queue, job_status_queue, args_array, database_args):
 
     # Set process start time
     process_start_time = time.time()
     # Fetch global logging object
     logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
 
-    # Check the delay value in args_array and set a wait time
-    args_array['spooling_value'] = spooling_value
-    if args_array['spooling_value'] > 4:
-        print('[Sleeping thread number ' + str(spooling_value) + ' to wait for download...]')
-        logger.info('Sleeping thread for initial spooling thread number ' + str(spooling_value) + '...')
-        time.sleep((args_array['spooling_value']) * args_array['thread_spool_delay'])
-        print('[Thread number ' + str(spooling_value) + ' is waking from sleep...]')
-        logger.info('Thread number ' + str(spooling_value) + ' is waking from sleep...')
-
-        args_array['spooling_value'] = 0
-
     print('Process {0} is starting to work! Start Time: {1}'.format(os.getpid(), time.strftime("%c")))
 
     # Create a database connection for each thread processes
@@ -170,14 +236,21 @@ def verification_process(link_queue, args_array, database_args, spooling_value):
     database_connection.connect()
     args_array['database_connection'] = database_connection
 
-    # Go through each link in link_queue
-    while not link_queue.empty():
-
-        # Set process time
-        start_time = time.time()
+    # Go through each link in link_queue until the sentinel is received
+    while True:
 
         # Get the next item in the queue
         item = link_queue.get()
+        # A None item signals there are no more links to process
+        if item is None:
+            break
+
+        # Set process time
+        start_time = time.time()
+        # Count and report that the job has started
+        with args_array['jobs_started'].get_lock():
+            args_array['jobs_started'].value += 1
+        job_status_queue.put([item[0], "started", 0])
         # Separate link item into (1) link url, (2) file format type,
         # and (3) the document type and append to args_array to be
         # passed with the item through parsing route
@@ -195,7 +268,7 @@ def verification_process(link_queue, args_array, database_args, spooling_value):
         # Call function to verify data for each link
         # and store the expected values in the PARSER_VERIFICATION table
         try:
-            USPTOVerifyLinks.verify_link_file(args_array)
+            file_processed_success = USPTOVerifyLinks.verify_link_file(args_array)
             # Print and log notification that one .zip package is finished
             print('[Finished processing one .zip package! Time consuming:{0} Time Finished: {1}]'.format(time.time() - start_time, time.strftime("%c")))
             logger.info('Finished processing one .zip package! Time consuming:{0} Time Finished: {1}]'.format(time.time() - start_time, time.strftime("%c")))
@@ -208,6 +281,11 @@ def verification_process(link_queue, args_array, database_args, spooling_value):
             exc_type, exc_obj, exc_tb = sys.exc_info()
             fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
             logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+            file_processed_success = False
+
+        # Report that the job has finished or failed
+        if file_processed_success == True: job_status_queue.put([item[0], "finished", time.time() - start_time])
+        else: job_status_queue.put([item[0], "failed", time.time() - start_time])
 
     # At this point all links have been processed
     #
@@ -221,25 +299,21 @@ def verification_process(link_queue, args_array, database_args, spooling_value):
     print('[Process {0} is finished. Time consuming:{1} Time Finished: {1}]'.format(time.time() - process_start_time, time.strftime("%c")))
 
 
+# Wait for a file being loaded in the background and report that the job has finished or failed
+def report_pipelined_load(pending_load, job_status_queue):
+    item, start_time, load_future = pending_load
+    if USPTOBulkLoader.wait_for_pipelined_load(load_future) == True: job_status_queue.put([item[0], "finished", time.time() - start_time])
+    else: job_status_queue.put([item[0], "failed", time.time() - start_time])
+
+
 # Main function for multiprocessing
-def main_process(link_queue, args_array, database_args, spooling_value):
+def main_process(link_queue, job_status_queue, args_array, database_args):
 
     # Set process start time
     process_start_time = time.time()
 
     logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
 
-    # Check the delay value in args_array and set a wait time
-    args_array['spooling_value'] = spooling_value
-    if args_array['spooling_value'] > 4:
-        print('[Sleeping thread number ' + str(spooling_value) + ' to wait for download...]')
-        logger.info('Sleeping thread for initial spooling thread number ' + str(spooling_value) + '...')
-        time.sleep((args_array['spooling_value']) * args_array['thread_spool_delay'])
-        print('[Thread number ' + str(spooling_value) + ' is waking from sleep...]')
-        logger.info('Thread number ' + str(spooling_value) + ' is waking from sleep...')
-
-        args_array['spooling_value'] = 0
-
     print('Process {0} is starting to work! Start Time: {1}'.format(os.getpid(), time.strftime("%c")))
 
     # Create the database connection here so that each process uses its own connection
@@ -249,14 +323,24 @@ def main_process(link_queue, args_array, database_args, spooling_value):
         database_connection.connect()
         args_array['database_connection'] = database_connection
 
-    # Go through each link in link_queue
-    while not link_queue.empty():
+    # The job, start time and Future of a file being loaded while the next file is parsed
+    pending_load = None
 
-        # Set process time
-        start_time = time.time()
+    # Go through each link in link_queue until the sentinel is received
+    while True:
 
         # Get the next item in the queue
         item = link_queue.get()
+        # A None item signals there are no more links to process
+        if item is None:
+            break
+
+        # Set process time
+        start_time = time.time()
+        # Count and report that the job has started
+        with args_array['jobs_started'].get_lock():
+            args_array['jobs_started'].value += 1
+        job_status_queue.put([item[0], "started", 0])
         # Separate link item into (1) link url, (2) file format type,
         # and (3) the document type and append to args_array to be
         # passed with the item through parsing route
@@ -267,6 +351,8 @@ def main_process(link_queue, args_array, database_args, spooling_value):
         # base filename (no file extension)
         # SECURITY_FIX = This needs to verify the file_name is sanitized
         args_array['file_name'] = os.path.basename(args_array['url_link']).replace(".zip", "").replace(".csv", "").replace(".txt", "")
+        # Count the XML documents of the file that fail to parse
+        args_array['document_parse_errors'] = 0
 
         print("Processing " + args_array['uspto_xml_format'] + " file: " + args_array['url_link'] + " Started at: " + time.strftime("%c"))
 
@@ -274,13 +360,16 @@ def main_process(link_queue, args_array, database_args, spooling_value):
         # has previously been partially processed.
         # If it has, then remove all database records from the previous partial processing.
         # If it has not, then insert into filename into STARTED_FILES to mark that it has been started.
+        # If the file cannot be loaded, report it as failed.
         if "database" in args_array['command_args'] and args_array['database_insert_mode'] == "each":
-            database_connection.remove_previous_file_records(args_array['document_type'], args_array['file_name'])
+            if database_connection.remove_previous_file_records(args_array['document_type'], args_array['file_name']) == False:
+                job_status_queue.put([item[0], "failed", time.time() - start_time])
+                continue
 
         # Call function to collect patent data for the link
         # and store it to specified location (csv and/or database)
         try:
-            USPTOProcessLinks.process_link_file(args_array)
+            file_processed_success = USPTOProcessLinks.process_link_file(args_array)
             # Print and log notification that one .zip package is finished
             print('[Finished processing one .zip package! Time consuming:{0} Time Finished: {1}]'.format(time.time() - start_time, time.strftime("%c")))
             logger.info('Finished processing one .zip package! Time consuming:{0} Time Finished: {1}]'.format(time.time() - start_time, time.strftime("%c")))
@@ -293,6 +382,25 @@ def main_process(link_queue, args_array, database_args, spooling_value):
             exc_type, exc_obj, exc_tb = sys.exc_info()
             fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
             logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+            file_processed_success = False
+
+        # Wait for the bulk load of the previous file, which ran while this file was parsed
+        if pending_load is not None:
+            report_pipelined_load(pending_load, job_status_queue)
+            pending_load = None
+        # If the file is being loaded in the background, report it once the next file is parsed
+        if isinstance(file_processed_success, USPTOBulkLoader.Future):
+            pending_load = [item, start_time, file_processed_success]
+            continue
+
+        # Report that the job has finished or failed
+        if file_processed_success == True: job_status_queue.put([item[0], "finished", time.time() - start_time])
+        else: job_status_queue.put([item[0], "failed", time.time() - start_time])
+
+    # Wait for the bulk load of the last file and close the bulk load connections
+    if pending_load is not None:
+        report_pipelined_load(pending_load, job_status_queue)
+    USPTOBulkLoader.close_bulk_load_pool()
 
     # At this point all links have bene processed
     #
@@ -345,7 +453,7 @@ def spool_down_load_balance():
             immediate_load_too_high = False
 
 # Load balancer thread function
-def load_balancer_thread(link_queue, args_array):
+def load_balancer_thread(link_queue, job_status_queue, all_jobs_finished, args_array):
 
     logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
 
@@ -369,10 +477,9 @@ def load_balancer_thread(link_queue, args_array):
         logger.info("Number of CPU cores could not be detected. Setting number of CPU cores to 4")
         traceback.print_exc()
 
-    # While there is still links in queue
-    while not link_queue.empty():
-        # Sleep the balancer for 5 minutes to allow initial threads and CPU load to balance
-        time.sleep(300)
+    # Until all jobs are finished, wait for 5 minutes to allow initial
+    # threads and CPU load to balance
+    while not all_jobs_finished.wait(300):
         # Check the 5 minute average CPU load balance
         # five_minute_load_average = os.getloadavg()[1] / core_count
         five_minute_load_average = psutil.getloadavg()[1] / core_count
@@ -385,10 +492,12 @@ def load_balancer_thread(link_queue, args_array):
                 # Print message and log that load balancer is starting another thread
                 print("Starting another thread group due to low CPU load balance of: " + str(five_minute_load_average * 100) + "%")
                 logger.info("Starting another thread group due to low CPU load balance of: " + str(five_minute_load_average * 100) + "%")
-                # Start another group of threads and pass in i to stagger the downloads
+                # Start another group of threads
                 # TODO: calculate the number of new threads to start
                 for i in range(1):
-                    start_new_thread = multiprocessing.Process(target=main_process,args=(link_queue, args_array, args_array['database_args'], i))
+                    # Add a sentinel to the queue for the new process
+                    link_queue.put(None)
+                    start_new_thread = multiprocessing.Process(target=main_process,args=(link_queue, job_status_queue, args_array, args_array['database_args']))
                     start_new_thread.start()
                     time.sleep(2)
 
@@ -396,8 +505,9 @@ def load_balancer_thread(link_queue, args_array):
             elif five_minute_load_average < 1:
                 print("Starting another single thread due to low CPU load balance of: " + str(five_minute_load_average * 100) + "%")
                 logger.info("Starting another single thread due to low CPU load balance of: " + str(five_minute_load_average * 100) + "%")
-                # Start another thread and pass in 0 to start right away
-                start_new_thread = multiprocessing.Process(target=main_process,args=(link_queue, args_array, args_array['database_args'], 1))
+                # Start another thread and add a sentinel to the queue for the new process
+                link_queue.put(None)
+                start_new_thread = multiprocessing.Process(target=main_process,args=(link_queue, job_status_queue, args_array, args_array['database_args']))
                 start_new_thread.start()
 
         else:
@@ -416,11 +526,6 @@ def validate_existing_file_structure(args_array):
             if not os.path.exists(args_array['working_directory'] + required_directory):
                 os.makedirs(args_array['working_directory'] + required_directory)
 
-        # Create the log file lock and set to open.
-        log_lock = open(log_lock_file, "w")
-        log_lock.write("0")
-        log_lock.close()
-
         print("Finished creating required directory structure " + time.strftime("%c"))
         logger.info('Finished creating required directory structure ' + time.strftime("%c"))
 
@@ -532,6 +637,23 @@ def build_command_arguments(argument_array, args_array):
                 print("-- The -verify command must be run alone and cannot be run with any other commands.")
                 exit()
 
+        # The -initial argument drops the database indexes, which is only
+        # supported for bulk insertion into PostgreSQL
+        if "initial" in command_args and ("database" not in command_args or args_array['database_type'] != "postgresql" or args_array['database_insert_mode'] != "bulk"):
+            print("-- The -initial argument requires -database with PostgreSQL and bulk insertion.")
+            print(build_argument_output())
+            exit(1)
+
+        # Check the -parquet argument can be used with the other arguments
+        if not USPTOParquetHandler.validate_parquet_arguments(command_args, args_array):
+            print(build_argument_output())
+            exit(1)
+
+        # Check the -lxml argument can be used
+        if not USPTOXMLSplitter.validate_xml_parser_arguments(command_args):
+            print(build_argument_output())
+            exit(1)
+
         # If arguments passed then return array of arguments
         return command_args
 
@@ -560,11 +682,15 @@ def build_argument_output():
     argument_output += "-h, -help   : print help menu.\n"
     argument_output += "-t [int]    : set the number of threads.  Must be 1-20 default = 10.\n"
     argument_output += "-balance    : if set turns on CPU load balancer.\n"
+    argument_output += "-shard      : split each grant and application file into chunks extracted by a pool of processes.\n"
     argument_output += "-csv        : write the patent data files to csv.  Setting will be saved and used on update or restart.\n"
     argument_output += "-database   : write the patent data to database.  Setting will be saved on update or restart.\n"
+    argument_output += "-parquet    : write the patent data files to compressed Parquet instead of csv.  Requires pyarrow.\n"
+    argument_output += "-lxml       : parse the XML documents with lxml instead of ElementTree.  Requires lxml.\n"
     argument_output += "-biblio     : (default) parse the USPTO bulk-data Red Book Biliographic data-set.\n"
     argument_output += "-full       : parse the USPTO bulk-data Red Book full-text data-set.\n"
     argument_output += "-update     : check for new patent bulk data files and process them.\n"
+    argument_output += "-initial    : drop primary keys and indexes for the first load and rebuild them at the end.  PostgreSQL bulk only.\n"
     argument_output += "-verify     : verify the completed database against source bulk-data files.\n"
     argument_output += "-patch      : patches missing data in the USPTO bulk data.  Requires Google BigQuery credentials.\n"
     return argument_output
@@ -593,13 +719,13 @@ def set_config_using_command_args(args_array):
         config_settings.close()
 
     # If command line args include data destination, then write to file
-    if "csv" in args_array['command_args'] or "database" in args_array['command_args'] or "source_type" in args_array['command_args']:
+    if "csv" in args_array['command_args'] or "parquet" in args_array['command_args'] or "database" in args_array['command_args'] or "source_type" in args_array['command_args']:
         config_settings = open(args_array['app_config_file'], "w")
         for argument, value in args_array['command_args'].items():
             if argument == "source_type":
                 config_settings.write(value + "\n")
-            # Do not write update command to the file
-            elif argument != "update":
+            # Do not write update or initial load commands to the file
+            elif argument != "update" and argument != "initial":
                 config_settings.write(argument + "\n")
         config_settings.close()
 
@@ -657,17 +783,47 @@ if __name__=="__main__":
         "-csv", "-database", "-update", "-t",
         "-biblio", "-full",
         "-balance", "-sandbox", "-h", "-help",
-        "-verify", "-supplement", "-patch"
+        "-verify", "-supplement", "-patch", "-shard", "-parquet", "-initial", "-lxml"
     ]
     # Default number of threads to use if not specified.
     # 5 threads is good on 4 core processor.
     # General rule of 1 thread per core, plus one seems to work well.
     default_threads = 5
 
+    # Number of processes used to extract a single file when the -shard
+    # argument is set.  Each main process starts its own pool of this size.
+    shard_processes = 4
+
+    # Number of XML documents in a file that can fail to parse before the
+    # file is marked failed instead of processed, so it is processed again.
+    document_parse_error_threshold = 0
+
     # Whether to insert the data after each item, or after each file.
     # `bulk` inserts after each file, `each` after each item.
     # Bulk insertion is much faster.
     database_insert_mode = "bulk" # values include `each` and `bulk`
+    # Number of rows of each table inserted in one query with `each` insertion
+    database_insert_batch_size = 1000
+
+    # Whether bulk insertion into PostgreSQL streams grant and application data to
+    # the database with COPY from memory buffers instead of writing .csv files.
+    # The .csv files are still written if the -csv argument is set.
+    database_copy_stream = True
+    # Format used to stream data with COPY.  `binary` sends dates and integers
+    # without converting them to text.
+    database_copy_format = "text" # values include `text` and `binary`
+
+    # Number of database connections each process uses to load the csv
+    # files of different tables at the same time with bulk insertion
+    bulk_load_connections = 4
+    # Whether each process loads the csv files of a file into the database
+    # while it parses the next file
+    database_pipeline_load = True
+
+    # Number of tables that have their primary keys and indexes rebuilt at the
+    # same time after an initial load, and the memory each rebuild can use
+    initial_load_index_threads = 4
+    initial_load_maintenance_work_mem = "1GB"
 
     # Declare filepaths
     if sandbox: app_temp_dirpath = "/Volumes/Thar/uspto/TMP/downloads/"
@@ -675,7 +831,7 @@ if __name__=="__main__":
     app_csv_dirpath = working_directory + "/CSV/"
     app_log_file = working_directory + "/LOG/USPTO_app.log"
     app_config_file = working_directory + "/.USPTO_config.cnf"
-    log_lock_file = working_directory + "/LOG/.logfile.lock"
+    process_state_database = working_directory + "/LOG/process_state.db"
     grant_process_log_file = working_directory + "/LOG/grant_links.log"
     application_process_log_file = working_directory + "/LOG/application_links.log"
     application_pair_process_log_file = working_directory + "/LOG/application_pair_links.log"
@@ -716,7 +872,8 @@ if __name__=="__main__":
         "/LOG",
         "/TMP",
         "/TMP/downloads",
-        "/TMP/unzip"
+        "/TMP/unzip",
+        "/TMP/link_cache"
     ]
 
     # Create an array of core variables that can be passed as a group
@@ -734,17 +891,50 @@ if __name__=="__main__":
         "stdout_level" : stdout_level,
         "working_directory" : working_directory,
         "default_threads" : default_threads,
+        "shard_processes" : shard_processes,
+        "document_parse_error_threshold" : document_parse_error_threshold,
         'default_source_type' : "biblio",
         "target_load_float" : 0.75,
-        "thread_spool_delay" : 3600,
+        "max_concurrent_downloads" : 3,
+        # Number of files to download ahead of the processes and the maximum
+        # size in bytes of the downloads directory for prefetching.
+        # Set prefetch_files to 0 to turn off prefetching.
+        "prefetch_files" : 4,
+        "prefetch_disk_budget" : 20000000000,
+        # Estimated .zip file size in bytes for each file format used to
+        # order the jobs largest first and to reserve prefetch disk budget
+        # when the file is not downloaded yet
+        "estimated_link_sizes" : {
+            "PAIR" : 2000000000,
+            "LEGAL" : 500000000,
+            "gXML4" : 100000000,
+            "aXML4" : 100000000,
+            "gXML2" : 80000000,
+            "aXML1" : 60000000,
+            "gAPS" : 30000000,
+            "CLS" : 1000000
+        },
+        # Space the requests to each host when collecting links to prevent getting blocked
         "sleep_link_building" : True,
+        "link_request_interval" : 2,
+        "link_fetch_threads" : 4,
+        "link_cache_dirpath" : working_directory + "/TMP/link_cache/",
         "database_type" : database_args['database_type'],
         "database_args" : database_args,
         "database_insert_mode" : database_insert_mode,
+        "database_insert_batch_size" : database_insert_batch_size,
+        "database_copy_stream" : database_copy_stream,
+        "database_copy_format" : database_copy_format,
+        "bulk_load_connections" : bulk_load_connections,
+        "database_pipeline_load" : database_pipeline_load,
+        "initial_load_index_threads" : initial_load_index_threads,
+        "initial_load_maintenance_work_mem" : initial_load_maintenance_work_mem,
+        # Number of characters buffered for each table before streaming to the database
+        "copy_stream_buffer_size" : 16000000,
         "required_directory_array" : required_directory_array,
         "app_config_file" : app_config_file,
         "allowed_args_array" : allowed_args_array,
-        "log_lock_file" : log_lock_file,
+        "process_state_database" : process_state_database,
         "classification_process_log_file" : classification_process_log_file,
         "us_classification_text_filename" : us_classification_text_filename,
         "cpc_classification_text_filename" : cpc_classification_text_filename,
@@ -790,6 +980,10 @@ if __name__=="__main__":
         # Collect all links, or update with new links to log files
         USPTOLogger.build_or_update_link_files(args_array)
 
+        # Drop the primary keys and indexes before the first load of the database
+        if "initial" in args_array['command_args']:
+            USPTOInitialLoad.start_initial_load(args_array)
+
         # Main loop that checks if all links have been processed.
         # Read the list of files to process and eliminate the ones
         # that are marked as processed.
@@ -857,6 +1051,13 @@ if __name__=="__main__":
             else:
                 all_files_processed = True
 
+        # Rebuild any primary keys and indexes dropped for an initial load
+        if all_files_processed == True and "database" in args_array['command_args'] and args_array['database_type'] == "postgresql":
+            USPTOInitialLoad.finish_initial_load(args_array)
+
+        # Write the status of each link to the link log files
+        USPTOLogger.write_link_files_from_process_state(args_array)
+
         # Handle the closing of the application
         handle_application_close(start_time, all_files_processed, args_array)
         exit(0)
@@ -0,0 +1,141 @@
+# USPTOPrefetchDownloads.py
+# USPTO Bulk Data Parser - Prefetch Downloads
+# Description: Imported to the main USPTOParser.py.  Downloads the next files in the job list
+# into the downloads directory ahead of the processes that parse them.
+# Author: Joseph Lee
+# Email: joseph@ripplesoftware.ca
+# Website: www.ripplesoftware.ca
+# Github: www.github.com/rippledj/uspto
+
+# Import Python Modules
+import time
+import traceback
+import os
+import sys
+import threading
+
+# Import USPTO Parser Functions
+import USPTOLogger
+import USPTOProcessLinks
+
+# Returns the total size of the files in a directory
+def get_directory_size(dirpath):
+    total_size = 0
+    for entry in os.scandir(dirpath):
+        try:
+            if entry.is_file():
+                total_size += entry.stat().st_size
+        # The file was moved or removed while checking
+        except OSError as e:
+            pass
+    return total_size
+
+# Returns the size still to be downloaded by the prefetch downloads in progress.
+# Each download reserves the estimated size of its file, less the bytes of the
+# file already in the downloads directory.
+def get_reserved_size(prefetch_downloads):
+    reserved_size = 0
+    for prefetch_thread, download_file_path, estimated_size in prefetch_downloads:
+        if prefetch_thread.is_alive():
+            downloaded_size = 0
+            for file_path in [download_file_path, download_file_path + ".part"]:
+                try:
+                    downloaded_size += os.path.getsize(file_path)
+                # The file was not created yet or was moved or removed while checking
+                except OSError as e:
+                    pass
+            reserved_size += max(estimated_size - downloaded_size, 0)
+    return reserved_size
+
+# Download a single file into the downloads directory
+def prefetch_zip_file(link, args_array):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    # Set process start time
+    start_time = time.time()
+
+    base_file_name = link[0].split("/")[-1]
+    download_file_path = args_array['sandbox_downloads_dirpath'] + base_file_name
+
+    try:
+        # Use a download slot so prefetch shares the download limit with the processes
+        args_array['download_semaphore'].acquire()
+        try:
+            # Check the file was not downloaded while waiting for the slot
+            if not os.path.isfile(download_file_path):
+                print('[Prefetching .zip file: {0}]'.format(base_file_name))
+                logger.info('Prefetching .zip file: {0}'.format(base_file_name))
+                USPTOProcessLinks.download_url_to_file(link[0], download_file_path)
+                print('[Prefetched .zip file: {0} Time:{1} Finish Time: {2}]'.format(base_file_name, time.time() - start_time, time.strftime("%c")))
+                logger.info('Prefetched .zip file: {0} Time:{1} Finish Time: {2}'.format(base_file_name, time.time() - start_time, time.strftime("%c")))
+        finally:
+            args_array['download_semaphore'].release()
+
+    # A process started downloading the file first
+    except FileExistsError as e:
+        pass
+
+    # If prefetch fails the process will resume the download itself
+    except Exception as e:
+        print('[Prefetching .zip file {0} failed...]'.format(base_file_name))
+        logger.warning('Prefetching .zip file {0} failed...'.format(base_file_name))
+        traceback.print_exc()
+
+# Prefetch process function.  Follows the job list in the order the processes
+# take jobs from the queue and keeps up to prefetch_files downloaded ahead of them.
+# A file is only downloaded if the size of the downloads directory, the sizes
+# reserved by the downloads in progress and the estimated size of the file fit
+# in prefetch_disk_budget.
+def prefetch_process(job_array, args_array, all_jobs_finished):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    print("[Starting download prefetch process... ]")
+    logger.info("Starting download prefetch process...")
+
+    # Keep track of the download threads with the file path and estimated size of each
+    prefetch_downloads = []
+
+    for job_number, link in enumerate(job_array):
+
+        # Only web resources are downloaded
+        if not link[0].startswith('http://') and not link[0].startswith('https://'):
+            continue
+
+        # Wait until the job is within prefetch_files of the jobs already started
+        while job_number >= args_array['jobs_started'].value + args_array['prefetch_files']:
+            if all_jobs_finished.wait(5):
+                return
+
+        # Skip the job if a process has already started it
+        if job_number < args_array['jobs_started'].value:
+            continue
+
+        # Skip the file if already downloaded
+        base_file_name = link[0].split("/")[-1]
+        if os.path.isfile(args_array['sandbox_downloads_dirpath'] + base_file_name):
+            continue
+
+        # Wait until the file fits in the disk budget with the downloads in progress
+        estimated_size = USPTOProcessLinks.estimate_link_size(link, args_array)
+        while get_directory_size(args_array['sandbox_downloads_dirpath']) + get_reserved_size(prefetch_downloads) + estimated_size > args_array['prefetch_disk_budget']:
+            if all_jobs_finished.wait(30):
+                return
+            # Skip the job if a process started it while waiting
+            if job_number < args_array['jobs_started'].value:
+                break
+        if job_number < args_array['jobs_started'].value:
+            continue
+
+        # Download the file in a thread so several files can be prefetched at once
+        prefetch_thread = threading.Thread(target=prefetch_zip_file, args=(link, args_array))
+        prefetch_thread.start()
+        prefetch_downloads.append((prefetch_thread, args_array['sandbox_downloads_dirpath'] + base_file_name, estimated_size))
+
+    # Wait for the remaining downloads to finish
+    for prefetch_thread, download_file_path, estimated_size in prefetch_downloads:
+        prefetch_thread.join()
+
+    print("[Download prefetch process finished... ]")
+    logger.info("Download prefetch process finished...")
@@ -15,9 +15,12 @@ import sys
 # Import USPTO Parser Functions
 import USPTOLogger
 import USPTOCSVHandler
+import USPTOBulkLoader
 import USPTOSanitizer
+import USPTORecords
 import USPTOProcessZipFile
 import USPTOStoreGrantData
+import USPTOShardProcessor
 
 # Used to parse xml files of the type APS
 def process_APS_grant_content(args_array):
@@ -32,8 +35,85 @@ def process_APS_grant_content(args_array):
     logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
 
     # If csv file insertion is required, then open all the files
-    if "csv" in args_array['command_args'] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
-        args_array['csv_file_array'] = USPTOCSVHandler.open_csv_files(args_array['document_type'], args_array['file_name'], args_array['csv_directory'])
+    if "csv" in args_array['command_args'] or "parquet" in args_array['command_args'] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
+        args_array['csv_file_array'] = USPTOCSVHandler.open_csv_files(args_array['document_type'], args_array['file_name'], args_array['csv_directory'], output_format=USPTOCSVHandler.get_output_format(args_array))
+        # If streaming to the database, clean the database of a previous attempt to
+        # process the file before the first rows are copied
+        if USPTOCSVHandler.is_copy_stream_mode(args_array):
+            if args_array['database_connection'].remove_previous_file_records(args_array['document_type'], args_array['file_name']) == False:
+                return False
+
+    # If sharding is set, split the .dat file into chunks of patents and
+    # parse the chunks in a process pool
+    if USPTOShardProcessor.is_shard_mode(args_array):
+        if USPTOShardProcessor.process_APS_content_in_shards(args_array) == False:
+            return False
+
+    else:
+        # Extract the .dat file from the .zip file
+        data_file_contents = USPTOProcessZipFile.extract_dat_file_from_zip(args_array)
+
+        # If xml_file_contents is None or False, then return False immediately
+        if data_file_contents == None or data_file_contents == False:
+            return False
+
+        # Parse the .dat file contents and store the data
+        parse_APS_grant_data(data_file_contents, args_array)
+
+    # Close all the open .csv files
+    USPTOCSVHandler.close_csv_files(args_array)
+    #print("Patents found: " + str(total_patents_found))
+    # If the bulk load can run while the next file is parsed, load the
+    # file in the background and return a Future of the file processed status
+    if USPTOBulkLoader.is_pipeline_mode(args_array):
+        return USPTOBulkLoader.start_pipelined_load(load_APS_grant_content, args_array, start_time)
+    else:
+        return load_APS_grant_content(args_array, start_time)
+
+# Loads the csv files of a parsed APS grant file into the database and writes log file success
+def load_APS_grant_content(args_array, start_time):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    # Set a flag file_processed to ensure that the bulk insert succeeds
+    file_processed = True
+
+    # If data is inserted after each item, insert the items remaining in the batch buffers
+    if "database" in args_array["command_args"] and args_array['database_insert_mode'] == 'each':
+        file_processed = args_array['database_connection'].flush_insert_buffers(args_array)
+
+    # If data is to be inserted as bulk csv files, then call the sql function
+    if "database" in args_array["command_args"] and args_array['database_insert_mode'] == 'bulk':
+        # If streaming to the database, copy the rows remaining in the buffers
+        if USPTOCSVHandler.is_copy_stream_mode(args_array):
+            file_processed = USPTOCSVHandler.flush_copy_streams(args_array, final=True)
+        else:
+            # Clean the database of a previous attempt and bulk copy each csv file into database
+            file_processed = USPTOBulkLoader.load_csv_files(args_array)
+
+    if file_processed:
+        # Send the information to USPTOLogger.write_process_log to mark the file "Processed" and record its processing time
+        USPTOLogger.write_process_log(args_array, start_time)
+        if "csv" not in args_array['command_args'] and "parquet" not in args_array['command_args']:
+            # Close all the open csv files
+            USPTOCSVHandler.delete_csv_files(args_array)
+
+        # Print message to stdout and log
+        print('[Processed .bat or .txt File. Total time:{0}  Time: {1}]'.format(time.time()-start_time, time.strftime('%c')))
+        # Return the file processed status
+        return file_processed
+    else:
+        # Print message to stdout and log
+        print('[Failed to bulk load {0} data for {1} into database. Time:{2} Finished Time: {3} ]'.format(args_array['document_type'], args_array['url_link'], time.time() - start_time, time.strftime("%c")))
+        logger.error('Failed to bulk load {0} data for {1} into database. Time:{2} Finished Time: {3} ]'.format(args_array['document_type'], args_array['url_link'], time.time() - start_time, time.strftime("%c")))
+        # Return None to show database insertion failed
+        return None
+
+# Parses the contents of an APS .dat file and stores the data for each patent grant
+def parse_APS_grant_data(data_file_contents, args_array):
+
+    # Import logger
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
 
     # Colect arguments from args array
     url_link = args_array['url_link']
@@ -53,13 +133,6 @@ def process_APS_grant_content(args_array):
     processed_nonpatcit = []
     processed_foreignpriority = []
 
-    # Extract the .dat file from the .zip file
-    data_file_contents = USPTOProcessZipFile.extract_dat_file_from_zip(args_array)
-
-    # If xml_file_contents is None or False, then return False immediately
-    if data_file_contents == None or data_file_contents == False:
-        return False
-
     # Define variables required to parse the file
     is_first_patent_tag = True
     next_line_loaded_already = False
@@ -409,17 +482,16 @@ def process_APS_grant_content(args_array):
                             # Try to append the item.  If items are missinng it will not append
                             # and error will be written to log
                             try:
-                                # Append data into dictionary to be written later
-                                processed_gracit.append({
-                                    "table_name" : "uspto.GRACIT_G",
-                                    "GrantID" : document_id,
-                                    "Position" : position_uref,
-                                    "CitedID" : citation_document_number,
-                                    "Name" : citation_name,
-                                    "Date" : citation_date,
-                                    "Country" : "US",
-                                    "FileName" : args_array['file_name']
-                                })
+                                # Append data into record to be written later
+                                processed_gracit.append(USPTORecords.GracitRecord(
+                                    GrantID = document_id,
+                                    Position = position_uref,
+                                    CitedID = citation_document_number,
+                                    Name = citation_name,
+                                    Date = citation_date,
+                                    Country = "US",
+                                    FileName = args_array['file_name']
+                                ))
                                 #print(processed_gracit)
                                 position_uref += 1
                                 # Reset all variables to avoid overlap
@@ -456,16 +528,15 @@ def process_APS_grant_content(args_array):
                     elif line[0:4].strip() not in accepted_headers_array:
 
                         # Append final UREF to gracit items array
-                        processed_gracit.append({
-                            "table_name" : "uspto.GRACIT_G",
-                            "GrantID" : document_id,
-                            "Position" : position_uref,
-                            "CitedID" : citation_document_number,
-                            "Name" : citation_name,
-                            "Date" : citation_date,
-                            "Country" : "US",
-                            "FileName" : args_array['file_name']
-                        })
+                        processed_gracit.append(USPTORecords.GracitRecord(
+                            GrantID = document_id,
+                            Position = position_uref,
+                            CitedID = citation_document_number,
+                            Name = citation_name,
+                            Date = citation_date,
+                            Country = "US",
+                            FileName = args_array['file_name']
+                        ))
                         # Reset all variables to avoid overlap
                         citation_document_number = None
                         citation_name = None
@@ -580,16 +651,15 @@ def process_APS_grant_content(args_array):
                             # Try to append the item.  If items are missingn it will not append
                             # and error will be written to log
                             try:
-                                # Append data into dictionary to be written later
-                                processed_forpatcit.append({
-                                    "table_name" : "uspto.FORPATCIT_G",
-                                    "GrantID" : document_id,
-                                    "Position" : position_forpat,
-                                    "CitedID" : citation_document_number,
-                                    "Date" : citation_date,
-                                    "Country" : citation_country,
-                                    "FileName" : args_array['file_name']
-                                })
+                                # Append data into record to be written later
+                                processed_forpatcit.append(USPTORecords.ForpatcitRecord(
+                                    GrantID = document_id,
+                                    Position = position_forpat,
+                                    CitedID = citation_document_number,
+                                    Date = citation_date,
+                                    Country = citation_country,
+                                    FileName = args_array['file_name']
+                                ))
                                 #print(processed_forpatcit)
                                 position_forpat += 1
                                 # Reset variable to avoid overlap
@@ -626,16 +696,15 @@ def process_APS_grant_content(args_array):
                     # If the tag found is not for FREF data, new data set found.
                     elif line[0:4].strip() not in accepted_headers_array:
 
-                        # Append data into dictionary to be written later
-                        processed_forpatcit.append({
-                            "table_name" : "uspto.FORPATCIT_G",
-                            "GrantID" : document_id,
-                            "Position" : position_forpat,
-                            "CitedID" : citation_document_number,
-                            "Date" : citation_date,
-                            "Country" : citation_country,
-                            "FileName" : args_array['file_name']
-                        })
+                        # Append data into record to be written later
+                        processed_forpatcit.append(USPTORecords.ForpatcitRecord(
+                            GrantID = document_id,
+                            Position = position_forpat,
+                            CitedID = citation_document_number,
+                            Date = citation_date,
+                            Country = citation_country,
+                            FileName = args_array['file_name']
+                        ))
                         #print(processed_forpatcit)
                         position_forpat += 1
                         # Reset variable to avoid overlap
@@ -1069,19 +1138,18 @@ def process_APS_grant_content(args_array):
 
                             # Append data into dictionary to be written later
                             try:
-                                processed_inventor.append({
-                                    "table_name" : "uspto.INVENTOR_G",
-                                    "GrantID" : document_id,
-                                    "Position" : position_inventor,
-                                    "FirstName" : inventor_first_name,
-                                    "LastName" : inventor_last_name,
-                                    "City" : inventor_city,
-                                    "State" : inventor_state,
-                                    "Country" : inventor_country,
-                                    "Nationality" : inventor_nationality,
-                                    "Residence" : inventor_residence,
-                                    "FileName" : args_array['file_name']
-                                })
+                                processed_inventor.append(USPTORecords.InventorGrantRecord(
+                                    GrantID = document_id,
+                                    Position = position_inventor,
+                                    FirstName = inventor_first_name,
+                                    LastName = inventor_last_name,
+                                    City = inventor_city,
+                                    State = inventor_state,
+                                    Country = inventor_country,
+                                    Nationality = inventor_nationality,
+                                    Residence = inventor_residence,
+                                    FileName = args_array['file_name']
+                                ))
                                 #print(processed_inventor)
                                 position_inventor += 1
                                 # Reset all the variables associated so they don't get reused
@@ -1182,20 +1250,19 @@ def process_APS_grant_content(args_array):
                                 inventor_country = "US"
                             else: inventor_country = None
 
-                        # Append data into dictionary to be written later
-                        processed_inventor.append({
-                            "table_name" : "uspto.INVENTOR_G",
-                            "GrantID" : document_id,
-                            "Position" : position_inventor,
-                            "FirstName" : inventor_first_name,
-                            "LastName" : inventor_last_name,
-                            "City" : inventor_city,
-                            "State" : inventor_state,
-                            "Country" : inventor_country,
-                            "Nationality" : inventor_nationality,
-                            "Residence" : inventor_residence,
-                            "FileName" : args_array['file_name']
-                        })
+                        # Append data into record to be written later
+                        processed_inventor.append(USPTORecords.InventorGrantRecord(
+                            GrantID = document_id,
+                            Position = position_inventor,
+                            FirstName = inventor_first_name,
+                            LastName = inventor_last_name,
+                            City = inventor_city,
+                            State = inventor_state,
+                            Country = inventor_country,
+                            Nationality = inventor_nationality,
+                            Residence = inventor_residence,
+                            FileName = args_array['file_name']
+                        ))
                         #print(processed_inventor)
                         position_inventor += 1
                         # Reset all the variables associated so they don't get reused
@@ -1678,35 +1745,5 @@ def process_APS_grant_content(args_array):
             try: description = description.strip()
             except: description = None
 
-    # Close all the open .csv files
-    USPTOCSVHandler.close_csv_files(args_array)
-    #print("Patents found: " + str(total_patents_found))
-    # Set a flag file_processed to ensure that the bulk insert succeeds
-    file_processed = True
-
-    # If data is to be inserted as bulk csv files, then call the sql function
-    if "database" in args_array["command_args"] and args_array['database_insert_mode'] == 'bulk':
-        # Check for previous attempt to process the file and clean database if required
-        args_array['database_connection'].remove_previous_file_records(args_array['document_type'], args_array['file_name'])
-        # Loop through each csv file and bulk copy into database
-        for key, csv_file in list(args_array['csv_file_array'].items()):
-            # Load CSV file into database
-            file_processed = args_array['database_connection'].load_csv_bulk_data(args_array, key, csv_file)
-
-    if file_processed:
-        # Send the information to USPTOLogger.write_process_log to have log file rewritten to "Processed"
-        USPTOLogger.write_process_log(args_array)
-        if "csv" not in args_array['command_args']:
-            # Close all the open csv files
-            USPTOCSVHandler.delete_csv_files(args_array)
-
-        # Print message to stdout and log
-        print('[Processed .bat or .txt File. Total time:{0}  Time: {1}]'.format(time.time()-start_time, time.strftime('%c')))
-        # Return the file processed status
-        return file_processed
-    else:
-        # Print message to stdout and log
-        print('[Failed to bulk load {0} data for {1} into database. Time:{2} Finished Time: {3} ]'.format(args_array['document_type'], args_array['url_link'], time.time() - start_time, time.strftime("%c")))
-        logger.error('Failed to bulk load {0} data for {1} into database. Time:{2} Finished Time: {3} ]'.format(args_array['document_type'], args_array['url_link'], time.time() - start_time, time.strftime("%c")))
-        # Return None to show database insertion failed
-        return None
+    # Log the warnings found while formatting dates
+    USPTOSanitizer.flush_date_warnings()
@@ -16,10 +16,14 @@ import traceback
 import urllib.request, urllib.parse, urllib.error
 #from urllib.request import Request
 import ssl
+import fcntl
+import hashlib
+import zipfile
 from bs4 import BeautifulSoup
 
 # Import USPTO Parser Functions
 import USPTOLogger
+import USPTOLinkCache
 import USPTOProcessXMLGrant
 import USPTOProcessAPSGrant
 import USPTOProcessXMLApplication
@@ -84,6 +88,25 @@ def return_file_format_from_filename(file_name):
             if re.compile(value).match(file_name.split("/")[-1]):
                 return key
 
+# Estimate the size of the file for a link so jobs can be ordered largest first
+# and prefetch downloads can be counted against the disk budget.  Uses the size
+# of a previously downloaded file if one exists, otherwise the estimated size
+# for the file format.
+def estimate_link_size(link, args_array):
+
+    # Check for a previously downloaded or local file
+    base_file_name = link[0].split("/")[-1]
+    if os.path.isfile(args_array['sandbox_downloads_dirpath'] + base_file_name):
+        return os.path.getsize(args_array['sandbox_downloads_dirpath'] + base_file_name)
+    elif os.path.isfile(link[0]):
+        return os.path.getsize(link[0])
+
+    # Use the estimated size for the file format
+    for file_format, estimated_size in args_array['estimated_link_sizes'].items():
+        if file_format in link[1]:
+            return estimated_size
+    return 0
+
 # Download a link into temporary path and return filename
 def download_zip_file(args_array):
 
@@ -97,8 +120,7 @@ def download_zip_file(args_array):
 
         # Strip the file from the url_link
         base_file_name = args_array['url_link'].split("/")[-1]
-        # Set the context for SSL (not checking!)
-        context = ssl.SSLContext()
+        download_file_path = args_array['sandbox_downloads_dirpath'] + base_file_name
 
         # Set the attempts number to 0
         download_attempts = 0
@@ -107,32 +129,51 @@ def download_zip_file(args_array):
         while download_attempts < max_attempts:
             # Try to download the zip file to temporary location
             try:
+                # Wait if the file is being downloaded by the prefetch stage or another process
+                wait_for_partial_download(download_file_path)
+                # Remove a previously downloaded file that is not a complete .zip file
+                if os.path.isfile(download_file_path) and download_file_path.lower().endswith(".zip") and not zipfile.is_zipfile(download_file_path):
+                    print('[Removing incomplete previously downloaded .zip file: {0}]'.format(download_file_path))
+                    logger.warning('Removing incomplete previously downloaded .zip file: {0}'.format(download_file_path))
+                    os.remove(download_file_path)
                 # Check if the file is in the downloads folder first
-                if os.path.isfile(args_array['sandbox_downloads_dirpath'] + base_file_name):
+                if os.path.isfile(download_file_path):
                     # Try the previously downloaded file
-                    print('[Using previosly downloaded .zip file: {0}]'.format(args_array['sandbox_downloads_dirpath'] + base_file_name))
+                    print('[Using previosly downloaded .zip file: {0}]'.format(download_file_path))
                     # Use the previously downloaded file as the temp_zip filename
-                    return args_array['sandbox_downloads_dirpath'] + base_file_name
+                    return download_file_path
                 else:
-                    print('[Downloading .zip file to sandbox directory: {0}]'.format(args_array['sandbox_downloads_dirpath'] + base_file_name))
-                    logger.info('Downloading .zip file to sandbox directory: {0}]'.format(args_array['sandbox_downloads_dirpath'] + base_file_name))
-                    with urllib.request.urlopen(args_array['url_link'], context=context) as response, open(args_array['sandbox_downloads_dirpath'] + base_file_name, 'wb') as out_file:
-                        shutil.copyfileobj(response, out_file)
+                    # Wait for a download slot if the number of concurrent downloads is limited
+                    if "download_semaphore" in args_array:
+                        if not args_array['download_semaphore'].acquire(block=False):
+                            print('[Waiting for a download slot for .zip file: {0}]'.format(base_file_name))
+                            logger.info('Waiting for a download slot for .zip file: {0}'.format(base_file_name))
+                            args_array['download_semaphore'].acquire()
+                    try:
+                        print('[Downloading .zip file to sandbox directory: {0}]'.format(download_file_path))
+                        logger.info('Downloading .zip file to sandbox directory: {0}]'.format(download_file_path))
+                        download_url_to_file(args_array['url_link'], download_file_path)
+                    # Release the download slot
+                    finally:
+                        if "download_semaphore" in args_array:
+                            args_array['download_semaphore'].release()
                     print('[Downloaded .zip file: {0} Time:{1} Finish Time: {2}]'.format(base_file_name,time.time()-start_time, time.strftime("%c")))
                     logger.info('Downloaded .zip file: {0} Time:{1} Finish Time: {2}]'.format(base_file_name,time.time()-start_time, time.strftime("%c")))
                     # Return the file name
-                    return args_array['sandbox_downloads_dirpath'] + base_file_name
+                    return download_file_path
+
+            # Another process started downloading the file first so wait for it
+            except FileExistsError as e:
+                print('[.zip file {0} is being downloaded by another process...]'.format(base_file_name))
+                logger.info('.zip file {0} is being downloaded by another process...'.format(base_file_name))
 
             except Exception as e:
                 download_attempts += 1
                 traceback.print_exc()
                 print('Downloading  contents of ' + args_array['url_link'] + ' failed...')
                 logger.info('Downloading  contents of ' + args_array['url_link'] + ' failed...')
-                # Delete the failed zip file if it exists
-                if os.path.exists(base_file_name):
-                    os.remove(base_file_name)
-                    print('Failed download contents of ' + args_array['url_link'] + ' have been purged...')
-                    logger.info('Failed download contents of ' + args_array['url_link'] + ' have been purged...')
+                # The .part file is kept and resumed on the next attempt
+                time.sleep(5)
 
     # Skip download if the resource is local
     else:
@@ -141,6 +182,143 @@ def download_zip_file(args_array):
         # Return the original filepath
         return args_array['url_link']
 
+# Download a url to a .part file and rename it to the file path when complete
+# so a partially downloaded file is never used.  An existing .part file left by
+# a failed download is resumed with an HTTP Range request, sent with If-Range and
+# the ETag stored in a .etag file so a file that changed upstream is downloaded
+# again instead of appended to.  The size and checksum are validated before the rename.  The .part file is locked while downloading and
+# FileExistsError is raised if another process is already downloading it.
+def download_url_to_file(url_link, file_path):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    # Set the context for SSL (not checking!)
+    context = ssl.SSLContext()
+    part_file_path = file_path + ".part"
+    etag_file_path = file_path + ".etag"
+
+    with open(part_file_path, 'ab') as part_file:
+
+        # Lock the .part file so only one process downloads the file
+        try:
+            fcntl.flock(part_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError as e:
+            raise FileExistsError(part_file_path)
+
+        # Hash the previously downloaded part of the file
+        resume_offset = os.path.getsize(part_file_path)
+        file_hash = hashlib.md5()
+        with open(part_file_path, 'rb') as previous_part_file:
+            for chunk in iter(lambda: previous_part_file.read(1048576), b''):
+                file_hash.update(chunk)
+
+        # Request the rest of the file if resuming
+        request = urllib.request.Request(url_link)
+        if resume_offset > 0:
+            print('[Resuming download of {0} from byte {1}]'.format(url_link, resume_offset))
+            logger.info('Resuming download of {0} from byte {1}'.format(url_link, resume_offset))
+            request.add_header("Range", "bytes=" + str(resume_offset) + "-")
+            # Only resume if the file has the same ETag as the .part file
+            if os.path.isfile(etag_file_path):
+                with open(etag_file_path, 'r') as etag_file:
+                    request.add_header("If-Range", etag_file.read())
+
+        try:
+            response = urllib.request.urlopen(request, context=context)
+        except urllib.error.HTTPError as e:
+            # If the range cannot be satisfied the .part file is either already
+            # complete or does not match the file so it is downloaded again
+            if e.code == 416 and resume_offset > 0:
+                content_range = e.headers.get("Content-Range", "")
+                if content_range.endswith("/" + str(resume_offset)):
+                    response = None
+                else:
+                    part_file.truncate(0)
+                    remove_file_if_exists(etag_file_path)
+                    raise
+            else:
+                raise
+
+        # Collect the expected size and checksum of the file
+        expected_size = None
+        expected_hash = None
+        if response is not None:
+            with response:
+                # If the server did not return the requested range, start again
+                if resume_offset > 0 and response.status != 206:
+                    part_file.truncate(0)
+                    file_hash = hashlib.md5()
+                    resume_offset = 0
+                # Get the full size of the file from the headers
+                content_range = response.headers.get("Content-Range")
+                if content_range and "/" in content_range and content_range.split("/")[-1] != "*":
+                    expected_size = int(content_range.split("/")[-1])
+                elif response.headers.get("Content-Length"):
+                    expected_size = resume_offset + int(response.headers.get("Content-Length"))
+                # Store the ETag to send with If-Range if the download is resumed.
+                # Weak ETags cannot be used with If-Range.
+                etag = response.headers.get("ETag", "")
+                if etag and not etag.startswith("W/"):
+                    with open(etag_file_path, 'w') as etag_file:
+                        etag_file.write(etag)
+                else:
+                    remove_file_if_exists(etag_file_path)
+                # Use the ETag as a checksum if it is an MD5 hash
+                etag = etag.strip('"')
+                if re.fullmatch("[0-9a-fA-F]{32}", etag):
+                    expected_hash = etag.lower()
+                # Write the response to the .part file
+                for chunk in iter(lambda: response.read(1048576), b''):
+                    part_file.write(chunk)
+                    file_hash.update(chunk)
+        part_file.flush()
+
+        # Check that the file is complete.  An incomplete .part file is kept
+        # so the download can be resumed.
+        downloaded_size = os.path.getsize(part_file_path)
+        if expected_size is not None and downloaded_size != expected_size:
+            raise IOError("Downloaded size " + str(downloaded_size) + " does not match expected size " + str(expected_size) + " for " + url_link)
+        # Check the checksum and zip structure.  A corrupt .part file is removed.
+        if expected_hash is not None and file_hash.hexdigest() != expected_hash:
+            os.remove(part_file_path)
+            remove_file_if_exists(etag_file_path)
+            raise IOError("Downloaded checksum " + file_hash.hexdigest() + " does not match ETag " + expected_hash + " for " + url_link)
+        if file_path.lower().endswith(".zip") and not zipfile.is_zipfile(part_file_path):
+            os.remove(part_file_path)
+            remove_file_if_exists(etag_file_path)
+            raise IOError("Downloaded file is not a valid .zip file for " + url_link)
+
+        # Move the completed download into place
+        os.replace(part_file_path, file_path)
+        remove_file_if_exists(etag_file_path)
+
+# Remove a file if it exists
+def remove_file_if_exists(file_path):
+    try:
+        os.remove(file_path)
+    except FileNotFoundError as e:
+        pass
+
+# Wait while the .part file for the file path is locked by another process
+# downloading the file
+def wait_for_partial_download(file_path):
+
+    while not os.path.isfile(file_path):
+        # Open the .part file without creating it.  If it is not found the download
+        # has been renamed into place or removed, so there is nothing to wait for.
+        try:
+            part_file_descriptor = os.open(file_path + ".part", os.O_WRONLY | os.O_APPEND)
+        except FileNotFoundError as e:
+            return
+        try:
+            # If the lock can be taken then no process is downloading the file
+            fcntl.flock(part_file_descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return
+        except BlockingIOError as e:
+            time.sleep(5)
+        finally:
+            os.close(part_file_descriptor)
+
 # Function to route the extraction of raw data from a link
 def process_link_file(args_array):
 
@@ -190,6 +368,9 @@ def process_link_file(args_array):
             print("[*] Finished the data storage process for contents of: " + args_array['url_link'] + " Finished at: " + time.strftime("%c"))
             logger.info("[*] Finished the data storage process for contents of: " + args_array['url_link'] + " Finished at: " + time.strftime("%c"))
 
+    # Return the processing status
+    return file_processed_success
+
 
 # Collect all patent grant and publications data files
 def get_all_links(args_array):
@@ -296,14 +477,10 @@ def PAIR_links_parser(args_array, bulk_source_url):
     temp_zip_file_link_array = []
     final_zip_file_link_array = []
 
-    # Set the context for SSL (not checking!)
-    context = ssl.SSLContext()
     # First collect all links on USPTO bulk data page
-    content = urllib.request.urlopen(bulk_source_url, context=context).read()
-    soup = BeautifulSoup(content, "html.parser")
-    for link in soup.find_all('a', href=True):
-        if ".csv.zip" in link['href'] and is_parsable_PAIR_link(link['href']):
-            link_array.append([bulk_source_url + link['href'], "PAIR"])
+    for href in USPTOLinkCache.get_page_hrefs(bulk_source_url, args_array):
+        if ".csv.zip" in href and is_parsable_PAIR_link(href):
+            link_array.append([bulk_source_url + href, "PAIR"])
     # Return the final array of links
     return link_array
 
@@ -318,15 +495,10 @@ def legal_links_parser(args_array, bulk_source_url):
     temp_zip_file_link_array = []
     final_zip_file_link_array = []
 
-    # Set the context for SSL (not checking!)
-    # TODO: check the SSL context to allow validation of SSL certificate!
-    context = ssl.SSLContext()
     # First collect all links on USPTO bulk-data page
-    content = urllib.request.urlopen(bulk_source_url, context=context).read()
-    soup = BeautifulSoup(content, "html.parser")
-    for link in soup.find_all('a', href=True):
-        if ".csv.zip" in link['href'] and is_parsable_legal_link(link['href']):
-            link_array.append([bulk_source_url + link['href'], "LEGAL"])
+    for href in USPTOLinkCache.get_page_hrefs(bulk_source_url, args_array):
+        if ".csv.zip" in href and is_parsable_legal_link(href):
+            link_array.append([bulk_source_url + href, "LEGAL"])
     # Return the final array of links
     return link_array
 
@@ -346,54 +518,45 @@ def links_parser(args_array, source_type, link_type, bulk_data_source, bulk_sour
 
     # If using USPTO bulk data source
     if bulk_data_source == "uspto":
-        # Set the context for SSL (not checking!)
-        # TODO: check the SSL context to allow validation of SSL certificate!
-        context = ssl.SSLContext()
         # First collect all links on USPTO bulk data page
-        content = urllib.request.urlopen(bulk_source_url, context=context).read()
-        soup = BeautifulSoup(content, "html.parser")
-        for link in soup.find_all('a', href=True):
+        for href in USPTOLinkCache.get_page_hrefs(bulk_source_url, args_array):
             # Collet links based on type requested by argument in function call
 
             # Patent grant
             if link_type == "PG":
                 if source_type == "biblio":
-                    if "https://bulkdata.uspto.gov/data/patent/grant/redbook/bibliographic/" in link['href']:
-                        link_array.append(link['href'])
+                    if "https://bulkdata.uspto.gov/data/patent/grant/redbook/bibliographic/" in href:
+                        link_array.append(href)
                 elif source_type == "full":
-                    if "https://bulkdata.uspto.gov/data/patent/grant/redbook/fulltext/" in link['href']:
-                        link_array.append(link['href'])
+                    if "https://bulkdata.uspto.gov/data/patent/grant/redbook/fulltext/" in href:
+                        link_array.append(href)
             # Patent Application
             elif link_type == "PA":
                 if source_type == "biblio":
-                    if "https://bulkdata.uspto.gov/data/patent/application/redbook/bibliographic/" in link['href']:
-                        link_array.append(link['href'])
+                    if "https://bulkdata.uspto.gov/data/patent/application/redbook/bibliographic/" in href:
+                        link_array.append(href)
                 elif source_type == "full":
-                    if "https://bulkdata.uspto.gov/data/patent/application/redbook/fulltext/" in link['href']:
-                        link_array.append(link['href'])
+                    if "https://bulkdata.uspto.gov/data/patent/application/redbook/fulltext/" in href:
+                        link_array.append(href)
+
+        # Collect the links on each year page found on the main USPTO page.
+        # The pages are fetched concurrently and unchanged pages are read from the cache.
+        page_href_arrays = USPTOLinkCache.get_all_page_hrefs(link_array, args_array)
 
         # Go through each found link on the main USPTO page and get the
         # zip files as links and return that array.
-        for item in link_array:
-            # Sleep the process to prevent getting blocked
-            if args_array['sleep_link_building']: time.sleep(2)
+        for item, page_href_array in zip(link_array, page_href_arrays):
             print(item)
-            # Collect link
-            content = urllib.request.urlopen(item, context=context).read()
-            #print("-- Collected link in link array: " + item)
-            # Parse content of link
-            soup = BeautifulSoup(content, "html.parser")
-            #print("-- Parsed link in link array: " + item)
             # Check links for zip files and add to array
-            for link in soup.find_all('a', href=True):
-                if ".zip" in link['href']:
+            for href in page_href_array:
+                if ".zip" in href:
                     # Check if an annualized link.  If annualized link found then
                     # add flag so ONLY that link can be added
-                    if re.compile("[0-9]{4}.zip").match(link['href']):
-                        annualized_file_link = [item + "/" + link['href'], return_file_format_from_filename(link['href'])]
+                    if re.compile("[0-9]{4}.zip").match(href):
+                        annualized_file_link = [item + "/" + href, return_file_format_from_filename(href)]
                         annualized_file_found = True
-                    elif re.compile("[0-9]{4}[0-9_]{1,4}_xml.zip").match(link['href']) is None and re.compile("[0-9]{4}_xml.zip").match(link['href']) is None:
-                        temp_zip_file_link_array.append([item + "/" + link['href'], return_file_format_from_filename(link['href'])])
+                    elif re.compile("[0-9]{4}[0-9_]{1,4}_xml.zip").match(href) is None and re.compile("[0-9]{4}_xml.zip").match(href) is None:
+                        temp_zip_file_link_array.append([item + "/" + href, return_file_format_from_filename(href)])
 
             # Check if Annualized file found
             if annualized_file_found == True:
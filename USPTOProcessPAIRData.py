@@ -44,8 +44,8 @@ def process_PAIR_content(args_array):
 
     # If csv file insertion is required, then open all the files
     # into args_array
-    if "csv" in args_array['command_args'] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
-        args_array['csv_file_array'] = USPTOCSVHandler.open_csv_files(args_array['document_type'], csv_output_filename, args_array['csv_directory'], args_array['extraction_type'])
+    if "csv" in args_array['command_args'] or "parquet" in args_array['command_args'] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
+        args_array['csv_file_array'] = USPTOCSVHandler.open_csv_files(args_array['document_type'], csv_output_filename, args_array['csv_directory'], args_array['extraction_type'], output_format=USPTOCSVHandler.get_output_format(args_array))
 
     # Eliminate duplicate lines from the file
     print("-- Eliminating duplicate lines from " + args_array['document_type'] + " file : " + csv_file_name)
@@ -106,21 +106,25 @@ def process_PAIR_content(args_array):
     # This should be true, in case the database insertion method is not bulk
     file_processed = True
 
+    # If data is inserted after each item, insert the items remaining in the batch buffers
+    if "database" in args_array["command_args"] and args_array['database_insert_mode'] == 'each':
+        file_processed = args_array['database_connection'].flush_insert_buffers(args_array)
+
     # If data is to be inserted as bulk csv files, then call the sql function
     if "database" in args_array["command_args"] and args_array['database_insert_mode'] == 'bulk':
         # Check for previous attempt to process the file and clean database if required
-        args_array['database_connection'].remove_previous_file_records(args_array['document_type'], args_array['file_name'])
+        file_processed = args_array['database_connection'].remove_previous_file_records(args_array['document_type'], args_array['file_name'])
         # Loop through each csv file and bulk copy into database
         for key, csv_file in list(args_array['csv_file_array'].items()):
             # Only load csv file to database if its for this instance
-            if key == args_array['extraction_type']:
+            if key == args_array['extraction_type'] and file_processed:
                 # Load CSV file into database
                 file_processed = args_array['database_connection'].load_csv_bulk_data(args_array, key, csv_file)
 
     if file_processed:
-        # Send the information to USPTOLogger.write_process_log to have log file rewritten to "Processed"
-        USPTOLogger.write_process_log(args_array)
-        if "csv" not in args_array['command_args']:
+        # Send the information to USPTOLogger.write_process_log to mark the file "Processed" and record its processing time
+        USPTOLogger.write_process_log(args_array, start_time)
+        if "csv" not in args_array['command_args'] and "parquet" not in args_array['command_args']:
             # Delete all the open csv files
             USPTOCSVHandler.delete_csv_files(args_array)
 
@@ -16,9 +16,12 @@ import traceback
 import USPTOLogger
 import USPTOSanitizer
 import USPTOCSVHandler
+import USPTOBulkLoader
 import USPTOProcessLinks
 import USPTOStoreGrantData
 import USPTOProcessZipFile
+import USPTOXMLSplitter
+import USPTOShardProcessor
 
 # Function opens the zip file for XML based patent grant files and parses, inserts to database
 # and writes log file success
@@ -31,107 +34,76 @@ def process_XML_grant_content(args_array):
 
     # If csv file insertion is required, then open all the files
     # into args_array
-    if "csv" in args_array['command_args'] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
-        args_array['csv_file_array'] = USPTOCSVHandler.open_csv_files(args_array['document_type'], args_array['file_name'], args_array['csv_directory'])
+    if "csv" in args_array['command_args'] or "parquet" in args_array['command_args'] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
+        args_array['csv_file_array'] = USPTOCSVHandler.open_csv_files(args_array['document_type'], args_array['file_name'], args_array['csv_directory'], output_format=USPTOCSVHandler.get_output_format(args_array))
+        # If streaming to the database, clean the database of a previous attempt to
+        # process the file before the first rows are copied
+        if USPTOCSVHandler.is_copy_stream_mode(args_array):
+            if args_array['database_connection'].remove_previous_file_records(args_array['document_type'], args_array['file_name']) == False:
+                return False
+
+    # If sharding is set, split the file into chunks of documents and
+    # extract the chunks in a process pool
+    if USPTOShardProcessor.is_shard_mode(args_array):
+        if USPTOShardProcessor.process_XML_content_in_shards(args_array) == False:
+            return False
 
-    # Extract the XML file from the ZIP file
-    xml_file_contents = USPTOProcessZipFile.extract_xml_file_from_zip(args_array)
+    else:
+        # Extract the XML file from the ZIP file as a stream of lines
+        xml_file_contents = USPTOProcessZipFile.extract_xml_file_from_zip(args_array, stream=True)
 
-    # If xml_file_contents is None or False, then return immediately
-    if xml_file_contents == None or xml_file_contents == False:
-        return False
+        # If xml_file_contents is None or False, then return immediately
+        if xml_file_contents == None or xml_file_contents == False:
+            return False
 
-    # Create variables needed to parse the file
-    xml_string = ''
-    patent_xml_started = False
-    # read through the file and append into groups of string.
-    # Send the finished strings to be parsed
-    # Use uspto_xml_format to determine file contents and parse accordingly
-    #print "The xml format is: " + args_array['uspto_xml_format']
-    if args_array['uspto_xml_format'] == "gXML4":
-
-        # Loop through all lines in the xml file
-        for line in xml_file_contents:
-
-            # Decode the line from byte-object
-            line = USPTOSanitizer.decode_line(line)
-
-            # This identifies the start of well formed XML segment for patent
-            # Grant bibliographic information
-            if "<us-patent-grant" in line:
-                patent_xml_started = True
-                xml_string += "<us-patent-grant>"
-
-            # This identifies end of well-formed XML segement for single patent
-            # Grant bibliographic information
-            elif "</us-patent-grant" in line:
-                patent_xml_started = False
-                xml_string += "</us-patent-grant>"
-                # Call the function extract data
-                processed_data_array = USPTOProcessLinks.extract_data_router(xml_string, args_array)
-                # Call function to write data to csv or database
-                USPTOStoreGrantData.store_grant_data(processed_data_array, args_array)
-                # Reset the xml string
-                xml_string = ''
-
-            # This is used to append lines of file when inside single patent grant
-            elif patent_xml_started == True:
-                # Check which type of encoding should be used to fix the line string
-                xml_string += USPTOSanitizer.replace_new_html_characters(line)
-
-    # Used for gXML2 files
-    elif args_array['uspto_xml_format'] == "gXML2":
-
-        # Loop through all lines in the xml file
-        for line in xml_file_contents:
-
-            # Decode the line from byte-object
-            line = USPTOSanitizer.decode_line(line)
-
-            # This identifies the start of well formed XML segment for patent
-            # Grant bibliographic information
-            if "<PATDOC" in line:
-                patent_xml_started = True
-                xml_string += "<PATDOC>"
-
-            # This identifies end of well-formed XML segement for single patent
-            # Grant bibliographic information
-            elif "</PATDOC" in line:
-                patent_xml_started = False
-                xml_string += "</PATDOC>"
-
-                # Call the function extract data
-                processed_data_array = USPTOProcessLinks.extract_data_router(xml_string, args_array)
-                # Call function to write data to csv or database
-                USPTOStoreGrantData.store_grant_data(processed_data_array, args_array)
-                # Reset the xml string
-                xml_string = ''
-
-            # This is used to append lines of file when inside single patent grant
-            elif patent_xml_started == True:
-                # Check which type of encoding should be used to fix the line string
-                xml_string += USPTOSanitizer.replace_old_html_characters(line)
+        # Split the file into documents and parse each document into an element tree.
+        # Use uspto_xml_format to determine file contents and parse accordingly
+        for document_root in USPTOXMLSplitter.split_xml_documents(xml_file_contents, args_array):
+            # Call the function extract data
+            processed_data_array = USPTOProcessLinks.extract_data_router(document_root, args_array)
+            # Call function to write data to csv or database
+            USPTOStoreGrantData.store_grant_data(processed_data_array, args_array)
 
     # Close all the open .csv files being written to
     USPTOCSVHandler.close_csv_files(args_array)
 
+    # Fail the file if too many documents failed to parse
+    if USPTOXMLSplitter.check_document_parse_errors(args_array) == False:
+        return False
+
+    # If the bulk load can run while the next file is parsed, load the
+    # file in the background and return a Future of the file processed status
+    if USPTOBulkLoader.is_pipeline_mode(args_array):
+        return USPTOBulkLoader.start_pipelined_load(load_XML_grant_content, args_array, start_time)
+    else:
+        return load_XML_grant_content(args_array, start_time)
+
+# Loads the csv files of a parsed grant file into the database and writes log file success
+def load_XML_grant_content(args_array, start_time):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
     # Set a flag file_processed to ensure that the bulk insert succeeds
     # This should be true, in case the database insertion method is not bulk
     file_processed = True
 
+    # If data is inserted after each item, insert the items remaining in the batch buffers
+    if "database" in args_array["command_args"] and args_array['database_insert_mode'] == 'each':
+        file_processed = args_array['database_connection'].flush_insert_buffers(args_array)
+
     # If data is to be inserted as bulk csv files, then call the sql function
     if "database" in args_array["command_args"] and args_array['database_insert_mode'] == 'bulk':
-        # Check for previous attempt to process the file and clean database if required
-        args_array['database_connection'].remove_previous_file_records(args_array['document_type'], args_array['file_name'])
-        # Loop through each csv file and bulk copy into database
-        for key, csv_file in list(args_array['csv_file_array'].items()):
-            # Load CSV file into database
-            file_processed = args_array['database_connection'].load_csv_bulk_data(args_array, key, csv_file)
+        # If streaming to the database, copy the rows remaining in the buffers
+        if USPTOCSVHandler.is_copy_stream_mode(args_array):
+            file_processed = USPTOCSVHandler.flush_copy_streams(args_array, final=True)
+        else:
+            # Clean the database of a previous attempt and bulk copy each csv file into database
+            file_processed = USPTOBulkLoader.load_csv_files(args_array)
 
     if file_processed:
-        # Send the information to USPTOLogger.write_process_log to have log file rewritten to "Processed"
-        USPTOLogger.write_process_log(args_array)
-        if "csv" not in args_array['command_args']:
+        # Send the information to USPTOLogger.write_process_log to mark the file "Processed" and record its processing time
+        USPTOLogger.write_process_log(args_array, start_time)
+        if "csv" not in args_array['command_args'] and "parquet" not in args_array['command_args']:
             # Delete all the open csv files
             USPTOCSVHandler.delete_csv_files(args_array)
 
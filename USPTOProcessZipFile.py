@@ -19,9 +19,12 @@ import codecs
 
 # Import USPTO Parser Functions
 import USPTOLogger
+import USPTOXMLSplitter
 
-# Extract a zip file and return the contents of the XML file as an array of lines
-def extract_xml_file_from_zip(args_array):
+# Extract a zip file and return the contents of the XML file as an array of lines.
+# If stream is set, a lazy iterator over the lines of the XML file is returned
+# instead so the file can be parsed without holding the whole file in memory.
+def extract_xml_file_from_zip(args_array, stream=False):
 
     logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
 
@@ -41,6 +44,12 @@ def extract_xml_file_from_zip(args_array):
         # If sandbox mode then extract the xml file
         if args_array['sandbox'] == True:
             zip_file.extract(xml_file_name, args_array['temp_directory'] + "unzip/" + args_array['file_name'])
+        # If streaming, return an iterator that reads the file as it is consumed.
+        # The zip file is closed and purged when the iterator is exhausted.
+        if stream == True:
+            print('[xml file contents streaming from ' + xml_file_name + '...]')
+            logger.info('xml file contents streaming from ' + xml_file_name + '...')
+            return stream_xml_file_lines(zip_file, xml_file, args_array)
         # Extract the contents from the file
         xml_file_contents = xml_file.readlines()
         # Close the file being read from
@@ -51,6 +60,8 @@ def extract_xml_file_from_zip(args_array):
             print('[Purging .zip file ' + args_array['temp_zip_file_name'] + '...]')
             logger.info('Purging .zip file ' + args_array['temp_zip_file_name'] + '...')
             os.remove(args_array['temp_zip_file_name'])
+            # Remove the document index built for the .zip file
+            USPTOXMLSplitter.delete_xml_document_index(args_array['temp_zip_file_name'])
 
         print('[xml file contents extracted ' + xml_file_name + '...]')
         logger.info('xml file contents extracted ' + xml_file_name + '...')
@@ -85,6 +96,45 @@ def extract_xml_file_from_zip(args_array):
         #TODO: need to remove the zip file here if
 
 
+# Yields the lines of an open XML file inside a zip file one at a time.
+# Used by extract_xml_file_from_zip when stream is set.
+def stream_xml_file_lines(zip_file, xml_file, args_array):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    try:
+        # Read the file line by line from the compressed stream
+        for line in xml_file:
+            yield line
+        # Close the file being read from
+        xml_file.close()
+        zip_file.close()
+        print('[xml file contents extracted ' + xml_file.name + '...]')
+        logger.info('xml file contents extracted ' + xml_file.name + '...')
+        # If not sandbox mode, then delete the .zip file
+        if args_array['sandbox'] == False and os.path.exists(args_array['temp_zip_file_name']):
+            # Print message to stdout
+            print('[Purging .zip file ' + args_array['temp_zip_file_name'] + '...]')
+            logger.info('Purging .zip file ' + args_array['temp_zip_file_name'] + '...')
+            os.remove(args_array['temp_zip_file_name'])
+            # Remove the document index built for the .zip file
+            USPTOXMLSplitter.delete_xml_document_index(args_array['temp_zip_file_name'])
+
+    # The zip file failed part way through being read
+    except (zipfile.BadZipFile, EOFError, OSError) as e:
+        zip_file.close()
+        print('[X] Zip file ' + args_array['temp_zip_file_name'] + ' failed while streaming with Python module...')
+        logger.warning('[X] Zip file ' + args_array['temp_zip_file_name'] + ' failed while streaming with Python module...')
+        traceback.print_exc()
+        # Remove the corrupted zip file so it is downloaded again
+        if os.path.exists(args_array['temp_zip_file_name']):
+            delete_zip_file(args_array['temp_zip_file_name'])
+        # Raise the error so the file is not marked as processed
+        raise
+
+    # If the consumer stops early, close the zip file
+    finally:
+        zip_file.close()
 
 # Extract a zip file and return the contents of the CSV file as an array of lines
 def extract_csv_file_from_zip(args_array):
@@ -237,5 +287,7 @@ def delete_zip_file(filename):
     if ".zip" in filename:
         # Remove the file
         os.remove(filename)
+        # Remove the document index built for the .zip file
+        USPTOXMLSplitter.delete_xml_document_index(filename)
         print("[.Zip file " + filename + " has been removed...]")
         logger.warning(".Zip file " + filename + " has been removed...")
@@ -0,0 +1,38 @@
+# USPTORecords.py
+# USPTO Bulk Data Parser - Records
+# Description: Imported to the extraction, store and csv modules.  Defines compact records
+# for the grant tables with the most rows in each document.  Each record is a tuple with
+# the columns of the table in .csv file order, and the table name is kept on the record type.
+# Author: Joseph Lee
+# Email: joseph@ripplesoftware.ca
+# Website: www.ripplesoftware.ca
+# Github: www.github.com/rippledj/uspto
+
+# Import Python Modules
+import collections
+
+# Returns a record type for a table.  Columns that are not given are None.
+def new_record_type(type_name, table_name, field_names):
+    record_type = collections.namedtuple(type_name, field_names)
+    record_type.__new__.__defaults__ = (None,) * len(field_names)
+    record_type.table_name = table_name
+    return record_type
+
+# Records of the grant tables in .csv file column order
+InventorGrantRecord = new_record_type("InventorGrantRecord", "uspto.INVENTOR_G", ['GrantID', 'Position', 'FirstName', 'LastName', 'City', 'State', 'Country', 'Nationality', 'Residence', 'FileName'])
+GracitRecord = new_record_type("GracitRecord", "uspto.GRACIT_G", ['GrantID', 'Position', 'CitedID', 'Kind', 'Name', 'Date', 'Country', 'Category', 'FileName'])
+ForpatcitRecord = new_record_type("ForpatcitRecord", "uspto.FORPATCIT_G", ['GrantID', 'Position', 'CitedID', 'Kind', 'Name', 'Date', 'Country', 'Category', 'FileName'])
+CpcclassGrantRecord = new_record_type("CpcclassGrantRecord", "uspto.CPCCLASS_G", ['GrantID', 'Position', 'Section', 'Class', 'SubClass', 'MainGroup', 'SubGroup', 'Malformed', 'FileName'])
+
+# Returns the table name of a record or a dictionary row
+def get_table_name(row):
+    if isinstance(row, dict):
+        return row['table_name']
+    return row.table_name
+
+# Returns the table name of a record or a dictionary row, and
+# removes it from a dictionary row so only the columns are left
+def pop_table_name(row):
+    if isinstance(row, dict):
+        return row.pop('table_name')
+    return row.table_name
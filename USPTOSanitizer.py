@@ -169,121 +169,102 @@ def return_cpc_class(class_string):
     cpc_class_sec = class_string[0]
     class_string = class_string[1:len(class_string)]
 
-# Function to accept the date and return in MYSQL formated date
-# TODO: fix the date parsing. Problem of possibly one or two
-# characters for month and day
-def return_formatted_date(time_str, args_array, document_id):
-
-    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+# Dates parsed from each date string.  Each value is a tuple of the date, or None
+# if the flag date is returned, and the warning for the date string, or None.
+# There are only a few thousand distinct dates in each file.
+formatted_date_cache = {}
+# Number of date strings cached before the cache is cleared
+formatted_date_cache_size = 100000
+# Warnings found while formatting dates are logged together in batches
+date_warning_array = []
+date_warning_batch_size = 1000
+
+# Parses a date string into a date.  Returns a tuple of the date, or None if
+# the flag date should be returned, and the warning to log for the date, or None.
+def parse_date_string(time_str):
 
-    # Check if None has been passed in
-    if time_str is None:
-        logger.warning("None Type object was found as date for " + args_array['document_type'] + " documentID: " + document_id + " in the link: " + args_array['url_link'])
-        # Return false data as flag
-        return datetime.date(int(0000), int(1), int(1))
     # Check if '0000-01-01' has been passed in
-    elif time_str == '0000-01-01' or time_str == "00000101":
-        logger.warning("'0000-01-01' was found as date for " + args_array['document_type'] + " documentID: " + document_id + " in the link: " + args_array['url_link'])
-        # Return false date as flag
-        return datetime.date(int(0000), int(1), int(1))
+    if time_str == '0000-01-01' or time_str == "00000101":
+        return None, "'0000-01-01' was found as date"
     # Check if '0000-00-00' has been passed in
     elif time_str == '0000-00-00' or time_str == "00000000":
-        #logger.warning("'0000-00-00' was found as date for " + args_array['document_type'] + " documentID: " + document_id + " in the link: " + args_array['url_link'])
-        # Return false date as flag
-        return datetime.date(int(0000), int(1), int(1))
+        return None, None
 
     # Check all other conditions based on string length
     else:
-        # If the string length is correct
-        if len(time_str) ==  8:
+        # If the string length is too long, remove line breaks
+        if len(time_str) == 9:
+            time_str = time_str.replace("\n", "").replace("\r", "").strip()
+            if len(time_str) == 9:
+                return None, "Malformed date was found on length == 9 string: " + time_str
+            # Out of range month and day values are only corrected for 8 character strings
+            correct_range = False
+        elif len(time_str) == 8:
+            correct_range = True
+        else:
+            return None, "Malformed date was found on length != 8 or 9 string: " + time_str
 
-            # If the year value is out of range
-            if time_str[0:4] == "0000":
-                logger.warning("'0000' was found as year for " + args_array['document_type'] + " documentID: " + document_id + " in the link: " + args_array['url_link'])
-                # Return false date as flag
-                return datetime.date(int(0000), int(1), int(1))
-            # Else set the year value
-            else: year = time_str[0:4]
+        # If the year value is out of range
+        if time_str[0:4] == "0000":
+            return None, "'0000' was found as year"
+        year = time_str[0:4]
 
+        try:
             # If the month value is out of range
             if time_str[4:6] == "00" : month = "1"
-            elif int(time_str[4:6]) > 12 or int(time_str[4:6]) < 1: month = "01"
+            elif correct_range and (int(time_str[4:6]) > 12 or int(time_str[4:6]) < 1): month = "01"
             else: month = time_str[4:6].lstrip("0")
 
             # If the day value is out of range
             if time_str[6:8] == "00" : day = "1"
-            elif int(time_str[6:8]) > 31 or int(time_str[6:8]) < 1 : day = "01"
+            elif correct_range and (int(time_str[6:8]) > 31 or int(time_str[6:8]) < 1) : day = "01"
             else: day = time_str[6:8].lstrip("0")
+        except ValueError:
+            # A month or day that is not a number is reported like other invalid dates
+            return None, "Could not validate date: " + time_str
 
-            # Validate the date for other erors such as leap year, etc.
-            try:
-                # Validate the date
-                #print(year + "-" + month + "-" + day)
-                #print(datetime.date(int(year), int(month), int(day)))
-                return datetime.date(int(year), int(month), int(day))
-            except ValueError:
-                # Print the exception to stdout
-                traceback.print_exc()
-                logger.warning("Could not validate date: " + time_str +  " for " + args_array['document_type'] + " documentID: " + document_id + " in the link: " + args_array['url_link'])
-                # Return false date as flag
-                return datetime.date(int(0000), int(1), int(1))
-            except Exception as e:
-                # Print the exception to stdout
-                traceback.print_exc()
-                logger.warning("Could not validate date: " + time_str +  " for " + args_array['document_type'] + " documentID: " + document_id + " in the link: " + args_array['url_link'])
-                # Return false date as flag
-                return datetime.date(int(0000), int(1), int(1))
-
-        # If the string length is too long
-        elif len(time_str) == 9:
-            #print "Date length == 9"
-            time_str = time_str.replace("\n", "").replace("\r", "").strip()
-            if len(time_str) == 9:
-                # Log that a bad date was found and could not be cleaned
-                logger.warning("Malformed date was found on length == 9 string: " + time_str + " for " + args_array['document_type'] + " documentID: " + document_id + " in the link: " + args_array['url_link'])
-                # Return false date as flag
-                return datetime.date(int(0000), int(1), int(1))
-            if time_str[0:4] == "0000":
-                logger.warning("'0000' was found as year for " + args_array['document_type'] + " documentID: " + document_id + " in the link: " + args_array['url_link'])
-                # Return false date as flag
-                return datetime.date(int(0000), int(1), int(1))
-            else:
-                # If the year value is out of range
-                if time_str[0:4] == "0000":
-                    logger.warning("'0000' was found as year for " + args_array['document_type'] + " documentID: " + document_id + " in the link: " + args_array['url_link'])
-                    # Return false date as flag
-                    return datetime.date(int(0000), int(1), int(1))
-                # Else set the year value
-                else: year = time_str[0:4]
-                # Get the month
-                if  time_str[4:6] == "00" : month = "1"
-                else: month = time_str[4:6].lstrip("0")
-                # Get the day
-                if time_str[6:8] == "00" : day = "1"
-                else: day = time_str[6:8].lstrip("0")
-
-                # Validate the date for other erors such as leap year, etc.
-                try:
-                    # Validate the date
-                    #print(year + "-" + month + "-" + day)
-                    #print(datetime.date(int(year), int(month), int(day)))
-                    return datetime.date(int(year), int(month), int(day))
-                except ValueError:
-                    # Print the exception to stdout
-                    traceback.print_exc()
-                    logger.warning("Could not validate date: " + time_str +  " for " + args_array['document_type'] + " documentID: " + document_id + " in the link: " + args_array['url_link'])
-                    # Return false date as flag
-                    return datetime.date(int(0000), int(1), int(1))
-                except Exception as e:
-                    # Print the exception to stdout
-                    traceback.print_exc()
-                    logger.warning("Could not validate date: " + time_str +  " for " + args_array['document_type'] + " documentID: " + document_id + " in the link: " + args_array['url_link'])
-                    # Return false date as flag
-                    return datetime.date(int(0000), int(1), int(1))
-        else:
-            logger.warning("Malformed date was found on length != 8 or 9 string: " + time_str + " for " + args_array['document_type'] + " documentID: " + document_id + " in the link: " + args_array['url_link'])
-            # Return false date as flag
-            return datetime.date(int(0000), int(1), int(1))
+        # Validate the date for other erors such as leap year, etc.
+        try:
+            return datetime.date(int(year), int(month), int(day)), None
+        except Exception as e:
+            return None, "Could not validate date: " + time_str
+
+# Logs the warnings found while formatting dates
+def flush_date_warnings():
+
+    global date_warning_array
+
+    if len(date_warning_array):
+        logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+        logger.warning("\n".join(date_warning_array))
+        date_warning_array = []
+
+# Function to accept the date and return in MYSQL formated date.  The parsed
+# date for each date string is cached and the warnings are logged in batches.
+def return_formatted_date(time_str, args_array, document_id):
+
+    # Check if None has been passed in
+    if time_str is None:
+        date, warning = None, "None Type object was found as date"
+    # Get the date from the cache or parse the date string
+    else:
+        if time_str not in formatted_date_cache:
+            if len(formatted_date_cache) >= formatted_date_cache_size:
+                formatted_date_cache.clear()
+            formatted_date_cache[time_str] = parse_date_string(time_str)
+        date, warning = formatted_date_cache[time_str]
+
+    # Add the warning to the batch with the document it was found in
+    if warning is not None:
+        date_warning_array.append(warning + " for " + args_array['document_type'] + " documentID: " + document_id + " in the link: " + args_array['url_link'])
+        if len(date_warning_array) >= date_warning_batch_size:
+            flush_date_warnings()
+
+    if date is not None:
+        return date
+    else:
+        # Return false date as flag
+        return datetime.date(int(0000), int(1), int(1))
 
 # Used to fix patent numbers
 def return_patent_number(patternStr,inputStr):
@@ -381,6 +362,29 @@ def fix_old_APS_class(class_string):
 def utf_8_encoder(line):
     return line.encode('utf-8')
 
+# Patterns of the html encoded strings removed from the new and old XML
+# formats, compiled once for use on lines and on document byte buffers
+new_html_character_pattern = re.compile(r"\&#x[A-Za-z0-9]{1,}\;")
+old_html_character_pattern = re.compile(r"\&[A-Za-z0-9]{1,}\;")
+new_html_character_bytes_pattern = re.compile(rb"\&#x[A-Za-z0-9]{1,}\;")
+old_html_character_bytes_pattern = re.compile(rb"\&[A-Za-z0-9]{1,}\;")
+# Characters removed before the data is written to the pipe delimited .csv files
+csv_delimiter_characters = str.maketrans("", "", "|\n\t")
+csv_delimiter_bytes = b"|\n\t"
+
+# The byte buffer pattern used in place of each line sanitizer
+document_html_character_patterns = {
+    "replace_new_html_characters" : new_html_character_bytes_pattern,
+    "replace_old_html_characters" : old_html_character_bytes_pattern
+}
+
+# Decodes and sanitizes the bytes of a whole XML document in place of
+# calling decode_line and a replace_*_html_characters function on each line.
+# The html encoded strings are removed from the bytes, the delimiter characters
+# are removed with bytes.translate and the result is decoded once.
+def sanitize_document_bytes(document_bytes, html_character_pattern):
+    return html_character_pattern.sub(b"", document_bytes).translate(None, csv_delimiter_bytes).decode("iso-8859-1")
+
 # Converts html encoding to hex encoding for database insertion
 def replace_new_html_characters(line):
 
@@ -389,19 +393,12 @@ def replace_new_html_characters(line):
     # Use a regex replacement to replace all html encoded strings
     try:
         # Finally use regex to replace anything that looks like an html entity with nothing
-        pattern = re.compile(r"\&#x[A-Za-z0-9]{1,}\;")
-        line = re.sub(pattern, "", line)
+        line = new_html_character_pattern.sub("", line)
 
         # Replace all tab characters before putting into tab delimted .csv
-        line = line.replace("|", "")
-        line = line.replace("\n", "")
-        line = line.replace("\t", "")
-
-        # Remove all non ASCII characters
-        #line = line.decode("ascii", "ignore")
+        line = line.translate(csv_delimiter_characters)
 
     except Exception as e:
-        #print(line)
         traceback.print_exc()
         exc_type, exc_obj, exc_tb = sys.exc_info()
         fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
@@ -414,19 +411,15 @@ def replace_new_html_characters(line):
 #Converts html encoding to hex encoding for database insertion
 def replace_old_html_characters(line):
 
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
     # Use a regex replacement to replace all html encoded strings
     try:
         # Finally use regex to replace anything that looks like an html entity with nothing
-        pattern = re.compile(r"\&[A-Za-z0-9]{1,}\;")
-        line = re.sub(pattern, "", line)
+        line = old_html_character_pattern.sub("", line)
 
         # Replace all tab characters before putting into tab delimted .csv
-        line = line.replace("|", "")
-        line = line.replace("\n", "")
-        line = line.replace("\t", "")
-
-        # Remove all non ASCII characters
-        #line = line.decode("ascii", "ignore")
+        line = line.translate(csv_delimiter_characters)
 
     except Exception as e:
         print(line)
@@ -615,55 +608,26 @@ def replace_old_html_characters_old_version(line):
 
     return line
 
+# Decodes a line of bytes from the bulk data files.  Every byte is a valid
+# iso-8859-1 character, so a single decode gives the same string as decoding
+# and re-encoding through utf-8.
 def decode_line(line):
 
     logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
 
-    # Attempt strict decode in to utf-8
     try:
-        line = line.decode('iso-8859-1').encode("utf-8", 'ignore')
-        line = line.decode("utf-8", 'ignore')
-        return line
+        return line.decode('iso-8859-1')
     except Exception as e:
-        # Attempt replace decode to utf-8
-        try:
-            logger.warning("Santizer was unable to decode to UTF-8 with strict mode:")
-            logger.warning(line)
-            print("Santizer was unable to decode with to UTF-8 strict mode:")
-            print(line)
-            traceback.print_exc()
-            exc_type, exc_obj, exc_tb = sys.exc_info()
-            fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
-            logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
-            line = line.decode('iso-8859-1').decode("utf-8", errors='replace')
-            line = line.decode("utf-8", errors='replace')
-            return line
-        except Exception as e:
-            # Attempt decode to ascii
-            try:
-                logger.warning("Santizer was unable to decode to UTF-8 with replace mode:")
-                logger.warning(line)
-                print("Santizer was unable to decode to UTF-8 with replace mode:")
-                print(line)
-                traceback.print_exc()
-                exc_type, exc_obj, exc_tb = sys.exc_info()
-                fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
-                logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
-                line = line.decode('iso-8859-1').decode('ascii')
-                line = line.decode('ascii')
-                return line
-            except Exception as e:
-                logger.warning("Santizer was unable to decode to ASCII:")
-                logger.warning(line)
-                print("Santizer was unable to decode to ASCII:")
-                traceback.print_exc()
-                exc_type, exc_obj, exc_tb = sys.exc_info()
-                fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
-                logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
-
-                print(line)
-                # Return empty string
-                return ""
+        logger.warning("Santizer was unable to decode line:")
+        logger.warning(line)
+        print("Santizer was unable to decode line:")
+        print(line)
+        traceback.print_exc()
+        exc_type, exc_obj, exc_tb = sys.exc_info()
+        fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+        logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+        # Return empty string
+        return ""
 
 
 # Fix the country code
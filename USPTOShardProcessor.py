@@ -0,0 +1,285 @@
+# USPTOShardProcessor.py
+# USPTO Bulk Data Parser - Processes Files in Shards
+# Description: Imported to Process Modules.  Splits a single bulk data file into chunks of
+# whole documents, extracts the chunks in a process pool and merges the csv files in order.
+# Author: Joseph Lee
+# Email: joseph@ripplesoftware.ca
+# Website: www.ripplesoftware.ca
+# Github: www.github.com/rippledj/uspto
+
+# Import Python Modules
+import time
+import traceback
+import os
+import sys
+import shutil
+import codecs
+import multiprocessing
+
+# Import USPTO Parser Functions
+import USPTOLogger
+import USPTOCSVHandler
+import USPTOXMLSplitter
+import USPTOProcessZipFile
+import USPTOProcessLinks
+import USPTOProcessAPSGrant
+import USPTOStoreGrantData
+import USPTOStoreApplicationData
+
+# Check if the file should be processed in shards.  Shards write to their own
+# csv files which are merged, so only csv or bulk database insertion is supported.
+def is_shard_mode(args_array):
+    if "shard" in args_array['command_args']:
+        if "csv" in args_array['command_args'] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
+            return True
+    return False
+
+# Returns a copy of args_array that can be passed to a shard process
+def build_shard_args_array(args_array, shard_number):
+
+    # Copy all items except the database connection, open csv files and
+    # shared process objects which cannot be passed to a process pool
+    shard_args_array = {}
+    for key, value in args_array.items():
+        if key not in ["database_connection", "csv_file_array", "download_semaphore", "jobs_started"]:
+            shard_args_array[key] = value
+    # Set the shard number and the filename used for the shard's csv files
+    shard_args_array['shard_number'] = shard_number
+    shard_args_array['shard_file_name'] = args_array['file_name'] + "_shard" + str(shard_number)
+    return shard_args_array
+
+# Returns the filenames and table names of a shard's csv files to be passed
+# back from the shard process
+def build_shard_csv_file_array(shard_args_array):
+    shard_csv_file_array = {}
+    for key, csv_file in shard_args_array['csv_file_array'].items():
+        shard_csv_file_array[key] = { "csv_file_name" : csv_file['csv_file_name'] }
+        if "table_name" in csv_file:
+            shard_csv_file_array[key]['table_name'] = csv_file['table_name']
+    return shard_csv_file_array
+
+# Split a list of document byte ranges into contiguous groups of roughly equal size
+def build_shard_ranges(document_index, shard_count):
+
+    # Calculate the size of each shard
+    total_size = document_index[-1][1] - document_index[0][0]
+    shard_size = total_size / shard_count
+
+    shard_ranges = []
+    shard_start = document_index[0][0]
+    for document in document_index:
+        # Close the shard once it has reached its size
+        if document[1] - shard_start >= shard_size and len(shard_ranges) < shard_count - 1:
+            shard_ranges.append([shard_start, document[1]])
+            shard_start = document[1]
+    # Append the remaining documents to the last shard
+    if shard_start < document_index[-1][1]:
+        shard_ranges.append([shard_start, document_index[-1][1]])
+    return shard_ranges
+
+# Runs the shard function over the list of shard args arrays in a process pool
+# and returns the results in shard order
+def run_shard_processes(shard_function, shard_args_arrays, args_array):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    print('[Starting {0} shard(s) of {1} in {2} process(es)...]'.format(len(shard_args_arrays), args_array['file_name'], args_array['shard_processes']))
+    logger.info('Starting {0} shard(s) of {1} in {2} process(es)...'.format(len(shard_args_arrays), args_array['file_name'], args_array['shard_processes']))
+
+    pool = multiprocessing.Pool(processes=args_array['shard_processes'])
+    try:
+        shard_results = pool.map(shard_function, shard_args_arrays)
+    finally:
+        pool.close()
+        pool.join()
+    return shard_results
+
+# Append the rows of each shard's csv files to the file's csv files in shard order
+# and remove the shard csv files
+def merge_shard_csv_files(args_array, shard_results):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    for shard_csv_file_array in shard_results:
+        for key, shard_csv_file in shard_csv_file_array.items():
+            # Copy all rows except the header into the file's csv file
+            with open(shard_csv_file['csv_file_name'], 'r', encoding='utf-8-sig', newline='') as shard_file:
+                shard_file.readline()
+                shutil.copyfileobj(shard_file, args_array['csv_file_array'][key]['file'])
+            # Set the table name if the shard wrote any rows to the table
+            if "table_name" in shard_csv_file:
+                args_array['csv_file_array'][key]['table_name'] = shard_csv_file['table_name']
+            os.remove(shard_csv_file['csv_file_name'])
+
+    print('[Merged {0} shard(s) of {1} into .csv files...]'.format(len(shard_results), args_array['file_name']))
+    logger.info('Merged {0} shard(s) of {1} into .csv files...'.format(len(shard_results), args_array['file_name']))
+
+# Remove the csv files of shards that finished when another shard failed
+def delete_shard_csv_files(shard_results):
+    for shard_csv_file_array in shard_results:
+        if shard_csv_file_array:
+            for key, shard_csv_file in shard_csv_file_array.items():
+                if os.path.exists(shard_csv_file['csv_file_name']):
+                    os.remove(shard_csv_file['csv_file_name'])
+
+# Merge the results of all shards, or clean up if any shard failed
+def finish_shard_processes(args_array, shard_results):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    # If any of the shards failed then the file has failed
+    if False in shard_results:
+        print('[X] One or more shards of ' + args_array['file_name'] + ' failed...')
+        logger.error('[X] One or more shards of ' + args_array['file_name'] + ' failed...')
+        delete_shard_csv_files(shard_results)
+        return False
+
+    # Merge the shard csv files into the file's csv files
+    merge_shard_csv_files(args_array, shard_results)
+    return True
+
+# Log an exception raised in a shard process
+def log_shard_exception(shard_args_array):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    print("Processing shard " + str(shard_args_array['shard_number']) + " of " + shard_args_array['file_name'] + " failed...")
+    logger.error("Processing shard " + str(shard_args_array['shard_number']) + " of " + shard_args_array['file_name'] + " failed...")
+    traceback.print_exc()
+    exc_type, exc_obj, exc_tb = sys.exc_info()
+    fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+    logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+
+# Extracts the XML documents in one shard of a file into the shard's csv files
+def process_XML_shard(shard_args_array):
+
+    try:
+        # Open the csv files for the shard
+        shard_args_array['csv_file_array'] = USPTOCSVHandler.open_csv_files(shard_args_array['document_type'], shard_args_array['shard_file_name'], shard_args_array['csv_directory'])
+
+        # Read the lines for the shard's documents from the zip file
+        xml_file_contents = USPTOXMLSplitter.read_xml_document_lines(shard_args_array, shard_args_array['shard_start_offset'], shard_args_array['shard_end_offset'])
+
+        # Split the lines into documents and extract each one
+        for document_root in USPTOXMLSplitter.split_xml_documents(xml_file_contents, shard_args_array):
+            # Call the function extract data
+            processed_data_array = USPTOProcessLinks.extract_data_router(document_root, shard_args_array)
+            # Call function to write data to csv
+            if shard_args_array['document_type'] == "grant":
+                USPTOStoreGrantData.store_grant_data(processed_data_array, shard_args_array)
+            else:
+                USPTOStoreApplicationData.store_application_data(processed_data_array, shard_args_array)
+
+        # Close the shard's csv files
+        USPTOCSVHandler.close_csv_files(shard_args_array)
+        # Return the filenames of the csv files to be merged and
+        # the number of documents that failed to parse
+        return [build_shard_csv_file_array(shard_args_array), shard_args_array['document_parse_errors']]
+
+    except Exception as e:
+        log_shard_exception(shard_args_array)
+        return False
+
+# Splits an XML file into shards of whole documents using the document index,
+# extracts the shards in a process pool and merges the csv files.
+def process_XML_content_in_shards(args_array):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    # Get the byte offsets of all documents in the file
+    document_index = USPTOXMLSplitter.get_xml_document_index(args_array)
+
+    # If the index could not be built the zip file is corrupted or has no XML file
+    if document_index == None or document_index == False:
+        if os.path.exists(args_array['temp_zip_file_name']):
+            USPTOProcessZipFile.delete_zip_file(args_array['temp_zip_file_name'])
+        return False
+
+    # Build an args array for each shard
+    shard_args_arrays = []
+    if len(document_index):
+        for shard_range in build_shard_ranges(document_index, args_array['shard_processes']):
+            shard_args_array = build_shard_args_array(args_array, len(shard_args_arrays))
+            shard_args_array['shard_start_offset'] = shard_range[0]
+            shard_args_array['shard_end_offset'] = shard_range[1]
+            shard_args_arrays.append(shard_args_array)
+
+    # Extract the shards in the process pool
+    shard_results = run_shard_processes(process_XML_shard, shard_args_arrays, args_array)
+    # Count the documents that failed to parse in all shards
+    args_array['document_parse_errors'] = sum(shard_result[1] for shard_result in shard_results if shard_result != False)
+    shard_results = [shard_result[0] if shard_result != False else False for shard_result in shard_results]
+    if finish_shard_processes(args_array, shard_results) == False:
+        return False
+
+    # If not sandbox mode, then delete the .zip file
+    if args_array['sandbox'] == False and os.path.exists(args_array['temp_zip_file_name']):
+        print('[Purging .zip file ' + args_array['temp_zip_file_name'] + '...]')
+        logger.info('Purging .zip file ' + args_array['temp_zip_file_name'] + '...')
+        os.remove(args_array['temp_zip_file_name'])
+        USPTOXMLSplitter.delete_xml_document_index(args_array['temp_zip_file_name'])
+
+    return True
+
+# Parses the APS patents in one shard of a .dat file into the shard's csv files
+def process_APS_shard(shard_args_array):
+
+    try:
+        # Open the csv files for the shard
+        shard_args_array['csv_file_array'] = USPTOCSVHandler.open_csv_files(shard_args_array['document_type'], shard_args_array['shard_file_name'], shard_args_array['csv_directory'])
+
+        # Parse the shard's .dat file
+        with codecs.open(shard_args_array['shard_data_file_path'], 'r', 'iso-8859-1') as data_file_contents:
+            USPTOProcessAPSGrant.parse_APS_grant_data(data_file_contents, shard_args_array)
+
+        # Close the shard's csv files
+        USPTOCSVHandler.close_csv_files(shard_args_array)
+        # Return the filenames of the csv files to be merged
+        return build_shard_csv_file_array(shard_args_array)
+
+    except Exception as e:
+        log_shard_exception(shard_args_array)
+        return False
+
+# Splits an APS .dat file into shards on the PATN lines that start each patent,
+# parses the shards in a process pool and merges the csv files.
+def process_APS_content_in_shards(args_array):
+
+    # Extract the .dat file from the .zip file
+    data_file_contents = USPTOProcessZipFile.extract_dat_file_from_zip(args_array)
+
+    # If data_file_contents is None or False, then return False immediately
+    if data_file_contents == None or data_file_contents == False:
+        return False
+
+    # Calculate the size of each shard from the size of the .dat file.
+    # APS files are iso-8859-1 so one character is one byte.
+    shard_size = os.fstat(data_file_contents.fileno()).st_size / args_array['shard_processes']
+
+    # Write the .dat file into shard files, starting a new shard at
+    # the first PATN line after the shard size is reached
+    shard_args_arrays = []
+    shard_file = None
+    for line in data_file_contents:
+        if shard_file == None or (written_size >= shard_size and line.strip() == "PATN" and len(shard_args_arrays) < args_array['shard_processes']):
+            if shard_file != None: shard_file.close()
+            shard_args_array = build_shard_args_array(args_array, len(shard_args_arrays))
+            shard_args_array['shard_data_file_path'] = args_array['temp_directory'] + "unzip/" + shard_args_array['shard_file_name'] + ".dat"
+            shard_args_arrays.append(shard_args_array)
+            shard_file = codecs.open(shard_args_array['shard_data_file_path'], 'w', 'iso-8859-1')
+            written_size = 0
+        shard_file.write(line)
+        written_size += len(line)
+    if shard_file != None: shard_file.close()
+    data_file_contents.close()
+
+    # Parse the shards in the process pool
+    try:
+        shard_results = run_shard_processes(process_APS_shard, shard_args_arrays, args_array)
+    finally:
+        # Remove the shard .dat files
+        for shard_args_array in shard_args_arrays:
+            if os.path.exists(shard_args_array['shard_data_file_path']):
+                os.remove(shard_args_array['shard_data_file_path'])
+
+    return finish_shard_processes(args_array, shard_results)
@@ -15,6 +15,7 @@ from pprint import pprint
 
 # Import USPTO Parser Functions
 import USPTOLogger
+import USPTOCSVHandler
 import SQLProcessor
 
 # Funtion to store patent application data to csv and/or database
@@ -32,17 +33,16 @@ def store_application_data(processed_data_array, args_array):
     file_name = args_array['file_name']
 
     # If the argument specified to store data into csv file or csv is needed for bulk database insertion
-    if "csv" in args_array["command_args"] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
+    if "csv" in args_array["command_args"] or "parquet" in args_array["command_args"] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
 
         # Process all the collected application data for one patent record into .csv file
-        # Using the already opened csv.DictWriter object stored in args array.
+        # Using the already opened RowWriter object stored in args array.
         if "processed_application" in processed_data_array and len(processed_data_array['processed_application']):
             for data_item in processed_data_array["processed_application"]:
                 # Print start message to stdout and log
                 if args_array['stdout_level'] == 1:
                     print('- Starting to write {0} to .csv file {1} for document: {2}. Start Time: {3}'.format(args_array['document_type'], file_name, data_item['ApplicationID'], time.strftime("%c")))
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['application']['csv_writer'].writerow(data_item)
@@ -55,7 +55,6 @@ def store_application_data(processed_data_array, args_array):
         if "processed_agent" in processed_data_array and len(processed_data_array['processed_agent']):
             for data_item in processed_data_array["processed_agent"]:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['agent']['csv_writer'].writerow(data_item)
@@ -68,7 +67,6 @@ def store_application_data(processed_data_array, args_array):
         if "processed_assignee" in processed_data_array and len(processed_data_array['processed_assignee']):
             for data_item in processed_data_array["processed_assignee"]:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['assignee']['csv_writer'].writerow(data_item)
@@ -81,7 +79,6 @@ def store_application_data(processed_data_array, args_array):
         if "processed_applicant" in processed_data_array and len(processed_data_array['processed_applicant']):
             for data_item in processed_data_array["processed_applicant"]:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['applicant']['csv_writer'].writerow(data_item)
@@ -94,7 +91,6 @@ def store_application_data(processed_data_array, args_array):
         if "processed_inventor" in processed_data_array and len(processed_data_array['processed_inventor']):
             for data_item in processed_data_array["processed_inventor"]:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['inventor']['csv_writer'].writerow(data_item)
@@ -107,7 +103,6 @@ def store_application_data(processed_data_array, args_array):
         if "processed_usclass" in processed_data_array and len(processed_data_array['processed_usclass']):
             for data_item in processed_data_array["processed_usclass"]:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['usclass']['csv_writer'].writerow(data_item)
@@ -120,7 +115,6 @@ def store_application_data(processed_data_array, args_array):
         if "processed_intclass" in processed_data_array and len(processed_data_array['processed_intclass']):
             for data_item in processed_data_array["processed_intclass"]:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['intclass']['csv_writer'].writerow(data_item)
@@ -133,7 +127,6 @@ def store_application_data(processed_data_array, args_array):
         if "processed_cpcclass" in processed_data_array and len(processed_data_array['processed_cpcclass']):
             for data_item in processed_data_array["processed_cpcclass"]:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['cpcclass']['csv_writer'].writerow(data_item)
@@ -146,7 +139,6 @@ def store_application_data(processed_data_array, args_array):
         if "processed_foreignpriority" in processed_data_array and len(processed_data_array['processed_foreignpriority']):
             for data_item in processed_data_array["processed_foreignpriority"]:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['foreignpriority']['csv_writer'].writerow(data_item)
@@ -157,6 +149,9 @@ def store_application_data(processed_data_array, args_array):
                     logger.info('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item['ApplicationID'], table_name, time.strftime("%c")))
                     traceback.print_exc()
 
+        # Copy the rows into the database if streaming and the buffers are full
+        USPTOCSVHandler.flush_copy_streams(args_array)
+
     elif "database" in args_array["command_args"] and args_array['database_insert_mode'] == "each":
 
         # Reset the start time
@@ -168,14 +163,15 @@ def store_application_data(processed_data_array, args_array):
         processed_application = processed_data_array['processed_application']
         del processed_data_array['processed_application']
         for item in processed_application:
-            args_array['table_name'] = item['table_name']
-            args_array['document_id'] = item['ApplicationID']
-            # Build query and pass to database loader
-            args_array['database_connection'].load(SQLProcessor.build_sql_insert_query(item, args_array), args_array)
+            # Buffer the item for batch insertion into the database
+            table_name = item['table_name']
+            del item['table_name']
+            args_array['database_connection'].insert_row(args_array, table_name, item)
 
         # Loop throught the processed_data_array and create sql queries and execute them
         for key, value in list(processed_data_array.items()):
             for item in value:
-                args_array['table_name'] = item['table_name']
-                args_array['document_id'] = item['ApplicationID']
-                args_array['database_connection'].load(SQLProcessor.build_sql_insert_query(item, args_array), args_array)
+                # Buffer the item for batch insertion into the database
+                table_name = item['table_name']
+                del item['table_name']
+                args_array['database_connection'].insert_row(args_array, table_name, item)
@@ -27,7 +27,7 @@ def store_classification_data(processed_data_array, args_array, class_id):
     logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
 
     # If the argument specified to store data into csv file or csv is needed for bulk database insertion
-    if "csv" in args_array["command_args"] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
+    if "csv" in args_array["command_args"] or "parquet" in args_array["command_args"] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
 
         # Process a single classification csv record into a new formatted csv file
         # Using the already opened csv.csv.DictWriter object stored in args array.
@@ -71,9 +71,13 @@ def store_classification_data(processed_data_array, args_array, class_id):
         if args_array['stdout_level'] == 1:
             print('- Starting to write {0} to database. Start Time: {1}'.format(file_name, time.strftime("%c")))
 
-        # Strip the metadata item off the array and process it first
-        # Store table name for stdout
-        args_array['table_name'] = processed_data_array['table_name']
-        del processed_data_array['table_name']
-        # Build query and pass to database loader
-        args_array['database_connection'].load(SQLProcessor.build_sql_insert_query(processed_data_array, args_array), args_array)
+        # Put a single item in a list so all items are inserted the same way
+        if type(processed_data_array) == list: item_array = processed_data_array
+        else: item_array = [processed_data_array]
+        for item in item_array:
+            # Move the table name to temp variable and remove the metadata from table
+            table_name = item['table_name']
+            del item['table_name']
+            del item['extraction_type']
+            # Buffer the item for batch insertion into the database
+            args_array['database_connection'].insert_row(args_array, table_name, item)
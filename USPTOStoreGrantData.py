@@ -14,6 +14,8 @@ import sys
 
 # Import USPTO Parser Functions
 import USPTOLogger
+import USPTOCSVHandler
+import USPTORecords
 import SQLProcessor
 
 # Function used to store grant data in CSV and/or database
@@ -29,19 +31,18 @@ def store_grant_data(processed_data_array, args_array):
     logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
 
     # If the argument specified to store data into csv file or csv is needed for bulk database insertion
-    if "csv" in args_array["command_args"] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
+    if "csv" in args_array["command_args"] or "parquet" in args_array["command_args"] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
 
         # Process all the collected grant data for one patent record into csv file
-        # Using the already opened csv.csv.DictWriter object stored in args array.
+        # Using the already opened RowWriter object stored in args array.
         # Table name must be appended to the dictionary for later processing
         if "processed_grant" in processed_data_array and len(processed_data_array['processed_grant']):
             for data_item in processed_data_array['processed_grant']:
                 if args_array['stdout_level'] == 1:
                     # Print start message to stdout and log
                     print('- Starting to write {0} to .csv file {1} for document: {2}. Start Time: {3}'.format(args_array['document_type'], file_name, data_item['GrantID'], time.strftime("%c")))
-                # Move the table name to temp variable and remove from table
+                # The table name is left in the row since the writer ignores it
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 # Try catch is to avoid failing the whole file when
                 # htmlentity characters found or other error occurs
                 try:
@@ -56,7 +57,6 @@ def store_grant_data(processed_data_array, args_array):
         if "processed_applicant" in processed_data_array and len(processed_data_array['processed_applicant']):
             for data_item in processed_data_array['processed_applicant']:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['applicant']['csv_writer'].writerow(data_item)
@@ -69,7 +69,6 @@ def store_grant_data(processed_data_array, args_array):
         if "processed_examiner" in processed_data_array and len(processed_data_array['processed_examiner']):
             for data_item in processed_data_array['processed_examiner']:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['examiner']['csv_writer'].writerow(data_item)
@@ -82,7 +81,6 @@ def store_grant_data(processed_data_array, args_array):
         if "processed_agent" in processed_data_array and len(processed_data_array['processed_agent']):
             for data_item in processed_data_array["processed_agent"]:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['agent']['csv_writer'].writerow(data_item)
@@ -95,7 +93,6 @@ def store_grant_data(processed_data_array, args_array):
         if "processed_assignee" in processed_data_array and len(processed_data_array['processed_assignee']):
             for data_item in processed_data_array["processed_assignee"]:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['assignee']['csv_writer'].writerow(data_item)
@@ -107,34 +104,31 @@ def store_grant_data(processed_data_array, args_array):
                     traceback.print_exc()
         if "processed_inventor" in processed_data_array and len(processed_data_array['processed_inventor']):
             for data_item in processed_data_array["processed_inventor"]:
-                table_name = data_item['table_name']
-                del data_item['table_name']
+                table_name = data_item.table_name
                 try:
-                    # Write the dictionary of document data to .csv file
+                    # Write the record of document data to .csv file
                     args_array['csv_file_array']['inventor']['csv_writer'].writerow(data_item)
                     # Append the table onto the array
                     args_array['csv_file_array']['inventor']['table_name'] = table_name
                 except Exception as e:
-                    print('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item['GrantID'], table_name, time.strftime("%c")))
-                    logger.info('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item['GrantID'], table_name, time.strftime("%c")))
+                    print('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item.GrantID, table_name, time.strftime("%c")))
+                    logger.info('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item.GrantID, table_name, time.strftime("%c")))
                     traceback.print_exc()
         if "processed_gracit" in processed_data_array and len(processed_data_array['processed_gracit']):
             for data_item in processed_data_array["processed_gracit"]:
-                table_name = data_item['table_name']
-                del data_item['table_name']
+                table_name = data_item.table_name
                 try:
-                    # Write the dictionary of document data to .csv file
+                    # Write the record of document data to .csv file
                     args_array['csv_file_array']['gracit']['csv_writer'].writerow(data_item)
                     # Append the table onto the array
                     args_array['csv_file_array']['gracit']['table_name'] = table_name
                 except Exception as e:
-                    print('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item['GrantID'], table_name, time.strftime("%c")))
-                    logger.info('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item['GrantID'], table_name, time.strftime("%c")))
+                    print('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item.GrantID, table_name, time.strftime("%c")))
+                    logger.info('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item.GrantID, table_name, time.strftime("%c")))
                     traceback.print_exc()
         if "processed_nonpatcit" in processed_data_array and len(processed_data_array['processed_nonpatcit']):
             for data_item in processed_data_array["processed_nonpatcit"]:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['nonpatcit']['csv_writer'].writerow(data_item)
@@ -146,21 +140,19 @@ def store_grant_data(processed_data_array, args_array):
                     traceback.print_exc()
         if "processed_forpatcit" in processed_data_array and len(processed_data_array['processed_forpatcit']):
             for data_item in processed_data_array["processed_forpatcit"]:
-                table_name = data_item['table_name']
-                del data_item['table_name']
+                table_name = data_item.table_name
                 try:
-                    # Write the dictionary of document data to .csv file
+                    # Write the record of document data to .csv file
                     args_array['csv_file_array']['forpatcit']['csv_writer'].writerow(data_item)
                     # Append the table onto the array
                     args_array['csv_file_array']['forpatcit']['table_name'] = table_name
                 except Exception as e:
-                    print('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item['GrantID'], table_name, time.strftime("%c")))
-                    logger.info('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item['GrantID'], table_name, time.strftime("%c")))
+                    print('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item.GrantID, table_name, time.strftime("%c")))
+                    logger.info('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item.GrantID, table_name, time.strftime("%c")))
                     traceback.print_exc()
         if "processed_usclass" in processed_data_array and len(processed_data_array['processed_usclass']):
             for data_item in processed_data_array["processed_usclass"]:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['usclass']['csv_writer'].writerow(data_item)
@@ -173,7 +165,6 @@ def store_grant_data(processed_data_array, args_array):
         if "processed_intclass" in processed_data_array and len(processed_data_array['processed_intclass']):
             for data_item in processed_data_array["processed_intclass"]:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['intclass']['csv_writer'].writerow(data_item)
@@ -185,21 +176,19 @@ def store_grant_data(processed_data_array, args_array):
                     traceback.print_exc()
         if "processed_cpcclass" in processed_data_array and len(processed_data_array['processed_cpcclass']):
             for data_item in processed_data_array["processed_cpcclass"]:
-                table_name = data_item['table_name']
-                del data_item['table_name']
+                table_name = data_item.table_name
                 try:
-                    # Write the dictionary of document data to .csv file
+                    # Write the record of document data to .csv file
                     args_array['csv_file_array']['cpcclass']['csv_writer'].writerow(data_item)
                     # Append the table onto the array
                     args_array['csv_file_array']['cpcclass']['table_name'] = table_name
                 except Exception as e:
-                    print('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item['GrantID'], table_name, time.strftime("%c")))
-                    logger.info('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item['GrantID'], table_name, time.strftime("%c")))
+                    print('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item.GrantID, table_name, time.strftime("%c")))
+                    logger.info('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item.GrantID, table_name, time.strftime("%c")))
                     traceback.print_exc()
         if "processed_foreignpriority" in processed_data_array and len(processed_data_array['processed_foreignpriority']):
             for data_item in processed_data_array["processed_foreignpriority"]:
                 table_name = data_item['table_name']
-                del data_item['table_name']
                 try:
                     # Write the dictionary of document data to .csv file
                     args_array['csv_file_array']['foreignpriority']['csv_writer'].writerow(data_item)
@@ -210,6 +199,9 @@ def store_grant_data(processed_data_array, args_array):
                     logger.info('- Error writing {0} to .csv file {1} for document: {2} into table {3}. Start Time: {4}'.format(args_array['document_type'], file_name, data_item['GrantID'], table_name, time.strftime("%c")))
                     traceback.print_exc()
 
+        # Copy the rows into the database if streaming and the buffers are full
+        USPTOCSVHandler.flush_copy_streams(args_array)
+
 
     # If command arg is set to put data into database
     elif "database" in args_array["command_args"] and args_array['database_insert_mode'] == "each":
@@ -224,17 +216,13 @@ def store_grant_data(processed_data_array, args_array):
         processed_grant = processed_data_array['processed_grant']
         del processed_data_array['processed_grant']
         for item in processed_grant:
-            # Store table name for stdout
-            args_array['table_name'] = item['table_name']
-            args_array['document_id'] = item['GrantID']
-            # Build query and pass to database loader
-            args_array['database_connection'].load(SQLProcessor.build_sql_insert_query(item, args_array), args_array)
+            # Buffer the item for batch insertion into the database
+            table_name = USPTORecords.pop_table_name(item)
+            args_array['database_connection'].insert_row(args_array, table_name, item)
 
         # Loop throught the processed_data_array and create sql queries and execute them
         for key, value in list(processed_data_array.items()):
             for item in value:
-                # Store table name for stdout
-                args_array['table_name'] = item['table_name']
-                args_array['document_id'] = item['GrantID']
-                # Build query and pass to database loader
-                args_array['database_connection'].load(SQLProcessor.build_sql_insert_query(item, args_array), args_array)
+                # Buffer the item for batch insertion into the database
+                table_name = USPTORecords.pop_table_name(item)
+                args_array['database_connection'].insert_row(args_array, table_name, item)
@@ -29,7 +29,7 @@ def store_PAIR_data(processed_data_array, args_array):
     logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
 
     # If the argument specified to store data into csv file or csv is needed for bulk database insertion
-    if "csv" in args_array["command_args"] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
+    if "csv" in args_array["command_args"] or "parquet" in args_array["command_args"] or ("database" in args_array['command_args'] and args_array['database_insert_mode'] == "bulk"):
 
         # Process a single PAIR csv record into a new formatted csv file
         # Using the already opened csv.csv.DictWriter object stored in args array.
@@ -63,12 +63,9 @@ def store_PAIR_data(processed_data_array, args_array):
         if args_array['stdout_level'] == 1:
             print('- Starting to write {0} to database. Start Time: {1}'.format(file_name, time.strftime("%c")))
 
-        # Strip the metadata item off the array and process it first
-        # Store table name for stdout
-        args_array['table_name'] = processed_data_array['table_name']
-        extraction_type =  processed_data_array['extraction_type']
+        # Strip the metadata off the item
+        table_name = processed_data_array['table_name']
         del processed_data_array['table_name']
         del processed_data_array['extraction_type']
-        args_array['document_id'] = processed_data_array['ApplicationID']
-        # Build query and pass to database loader
-        args_array['database_connection'].load(SQLProcessor.build_sql_insert_query(processed_data_array, args_array), args_array)
+        # Buffer the item for batch insertion into the database
+        args_array['database_connection'].insert_row(args_array, table_name, processed_data_array)
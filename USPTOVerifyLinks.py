@@ -72,6 +72,12 @@ def verify_link_file(args_array):
 
     logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
 
+    # Set process start time
+    start_time = time.time()
+
+    # Declare variable to track if file was verified successfully
+    file_processed_success = False
+
     # Download the file and append temp location to args array
     args_array['temp_zip_file_name'] = USPTOProcessLinks.download_zip_file(args_array)
     # Route to the correct extraction function
@@ -80,7 +86,7 @@ def verify_link_file(args_array):
     if counts_dict:
         file_processed_success = args_array['database_connection'].storeVerificationExtraction(counts_dict, args_array)
         # Log the file as verified
-        if file_processed_success == True: USPTOLogger.write_verified_log(args_array)
+        if file_processed_success == True: USPTOLogger.write_verified_log(args_array, start_time)
         else:
             # Print to stdout and log
             print("The contents of: " + args_array['file_name'] + " could not be stored into the database! Time Finished: " + time.strftime("%c"))
@@ -94,6 +100,9 @@ def verify_link_file(args_array):
     print("-- Finished the verificaction process for contents of: " + args_array['file_name'] + " Time Finished: " + time.strftime("%c"))
     logger.info("Finished the verification process for contents of: " + args_array['file_name'] + " Time Finished: " + time.strftime("%c"))
 
+    # Return the verification status
+    return file_processed_success
+
 # Extract the tag count for APS grant files
 def extract_APS_grant_tag_counts(args_array):
 
@@ -0,0 +1,307 @@
+# USPTOXMLSplitter.py
+# USPTO Bulk Data Parser - Splits XML Files Into Documents
+# Description: Imported to Process Modules.  Splits the concatenated XML documents in a
+# bulk data file, sanitizes each one in a single pass and parses it into an Element Tree object.
+# Builds byte offset indexes of the documents in a bulk data file.
+# Author: Joseph Lee
+# Email: joseph@ripplesoftware.ca
+# Website: www.ripplesoftware.ca
+# Github: www.github.com/rippledj/uspto
+
+# Import Python Modules
+import xml.etree.ElementTree as ET
+import traceback
+import time
+import os
+import sys
+import re
+import zipfile
+
+# lxml is only required for the -lxml argument
+try:
+    import lxml.etree
+except ImportError:
+    lxml = None
+
+# Import USPTO Parser Functions
+import USPTOLogger
+import USPTOSanitizer
+
+# Document start tag, end tag, root element and name of the line sanitizer for each XML format.
+# Each bulk file is many XML documents concatenated together, each with its own
+# xml declaration and DOCTYPE, so every document gets its own parser.
+xml_document_formats = {
+    "gXML4" : ("<us-patent-grant", "</us-patent-grant", "us-patent-grant", "replace_new_html_characters"),
+    "gXML2" : ("<PATDOC", "</PATDOC", "PATDOC", "replace_old_html_characters"),
+    "aXML4" : ("<us-patent-application", "</us-patent-application", "us-patent-application", "replace_new_html_characters"),
+    "aXML1" : ("<patent-application-publication", "</patent-application-publication", "patent-application-publication", "replace_old_html_characters")
+}
+
+# Errors raised by the XML parsers when a document cannot be parsed
+if lxml is not None: xml_parse_errors = (ET.ParseError, lxml.etree.XMLSyntaxError)
+else: xml_parse_errors = (ET.ParseError,)
+
+# Returns a new parser for a document.  ElementTree is used unless the -lxml
+# argument is set.  The lxml elements have the find, findall and findtext
+# methods used by the extraction modules, so they work with either parser.
+def new_document_parser(args_array):
+    if "lxml" in args_array['command_args']:
+        # Comments and processing instructions are dropped as ElementTree does
+        return lxml.etree.XMLParser(remove_comments=True, remove_pis=True, huge_tree=True)
+    else:
+        return ET.XMLParser()
+
+# Check that the -lxml argument can be used
+def validate_xml_parser_arguments(command_args):
+    if "lxml" in command_args and lxml is None:
+        print("-- The -lxml argument requires the lxml module.  Install it with: pip install lxml")
+        return False
+    return True
+
+# Yields the root element of each document in the xml file contents.
+# The lines of each document are collected as bytes and the whole document
+# is decoded and sanitized in one pass before it is parsed.  Documents that
+# fail to parse are logged and counted in args_array['document_parse_errors'].
+def split_xml_documents(xml_file_contents, args_array):
+
+    # Get the tags and sanitizer used to split the file
+    start_tag, end_tag, root_tag, sanitizer_name = xml_document_formats[args_array['uspto_xml_format']]
+    start_tag = start_tag.encode()
+    end_tag = end_tag.encode()
+    html_character_pattern = USPTOSanitizer.document_html_character_patterns[sanitizer_name]
+
+    # Create variables needed to parse the file
+    document_lines = None
+    line_number = 0
+    if 'document_parse_errors' not in args_array:
+        args_array['document_parse_errors'] = 0
+
+    # Loop through all lines in the xml file
+    for line in xml_file_contents:
+
+        line_number += 1
+
+        # This identifies the start of well formed XML segment for a single document.
+        # The attributes on the opening tag are dropped.
+        if start_tag in line:
+            document_lines = []
+            start_line_number = line_number
+
+        # This identifies end of well-formed XML segement for a single document
+        elif end_tag in line:
+            # Skip the closing tag if the document was never started
+            if document_lines is None:
+                continue
+            try:
+                parser = new_document_parser(args_array)
+                parser.feed("<" + root_tag + ">")
+                parser.feed(USPTOSanitizer.sanitize_document_bytes(b"".join(document_lines), html_character_pattern))
+                parser.feed("</" + root_tag + ">")
+                document_root = parser.close()
+            except xml_parse_errors as e:
+                args_array['document_parse_errors'] += 1
+                log_document_parse_error(start_line_number, args_array)
+                document_lines = None
+                continue
+            document_lines = None
+            # Pass the document to be extracted
+            yield document_root
+            # Clear the element tree once the document has been extracted
+            document_root.clear()
+
+        # This is used to collect the lines of file when inside a single document
+        elif document_lines is not None:
+            document_lines.append(line)
+
+    # Log the warnings found while formatting dates
+    USPTOSanitizer.flush_date_warnings()
+
+# Logs a document in an xml file that could not be parsed
+def log_document_parse_error(start_line_number, args_array):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    print("[XML document starting on line " + str(start_line_number) + " failed to parse in file: " + args_array['url_link'] + "]")
+    logger.error("XML document starting on line " + str(start_line_number) + " failed to parse in file: " + args_array['url_link'])
+    traceback.print_exc()
+    exc_type, exc_obj, exc_tb = sys.exc_info()
+    fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+    logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+
+# Check the number of documents in a file that failed to parse.  Returns False
+# if there are more than document_parse_error_threshold so the file is failed.
+def check_document_parse_errors(args_array):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    parse_errors = args_array.get('document_parse_errors', 0)
+    if parse_errors > args_array['document_parse_error_threshold']:
+        print("[X] " + str(parse_errors) + " XML document(s) failed to parse in file: " + args_array['url_link'] + ".  The file will be processed again.")
+        logger.error("[X] " + str(parse_errors) + " XML document(s) failed to parse in file: " + args_array['url_link'] + ".  The file will be processed again.")
+        return False
+    return True
+
+# Regular expressions used to find the document number and kind for each
+# XML format when building the document index
+xml_document_index_patterns = {
+    "gXML4" : (re.compile(rb"<doc-number>([^<]+)</doc-number>"), re.compile(rb"<kind>([^<]+)</kind>")),
+    "gXML2" : (re.compile(rb"<B110><DNUM><PDAT>([^<]+)</PDAT>"), re.compile(rb"<B130><PDAT>([^<]+)</PDAT>")),
+    "aXML4" : (re.compile(rb"<doc-number>([^<]+)</doc-number>"), re.compile(rb"<kind>([^<]+)</kind>")),
+    "aXML1" : (re.compile(rb"<doc-number>([^<]+)</doc-number>"), re.compile(rb"<kind-code>([^<]+)</kind-code>"))
+}
+
+# Returns the filename of the document index stored next to the downloaded zip file
+def get_xml_document_index_file_name(zip_file_name):
+    return os.path.splitext(zip_file_name)[0] + ".idx"
+
+# Finds the XML file inside a zip file and returns the zip file and its ZipInfo.
+# The ZipInfo is None if the zip file has no .xml or .sgml file.
+def open_xml_zip_member(args_array):
+    zip_file = zipfile.ZipFile(args_array['temp_zip_file_name'], 'r')
+    xml_zip_info = None
+    # Find the first xml file from the extracted filenames
+    for zip_info in zip_file.infolist():
+        if zip_info.filename.lower().endswith('.xml') or zip_info.filename.lower().endswith('.sgml'):
+            xml_zip_info = zip_info
+            break
+    return zip_file, xml_zip_info
+
+# Logs a zip file that has no .xml or .sgml file
+def log_missing_xml_zip_member(args_array):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    print('[X] No .xml or .sgml file found in zip file ' + args_array['temp_zip_file_name'])
+    logger.error('[X] No .xml or .sgml file found in zip file ' + args_array['temp_zip_file_name'])
+
+# Builds an index of the byte offsets where each document starts and ends
+# in the uncompressed XML file, with the document number and kind, in
+# one pass over the zip member.  The index is written next to the zip file.
+# Returns False if the zip file has no XML file and None if the index failed.
+def build_xml_document_index(args_array):
+
+    logger = USPTOLogger.logging.getLogger("USPTO_Database_Construction")
+
+    # Set process start time
+    start_time = time.time()
+
+    # Get the tags and patterns used to find documents
+    start_tag, end_tag, root_tag, sanitizer_name = xml_document_formats[args_array['uspto_xml_format']]
+    start_tag = start_tag.encode()
+    end_tag = end_tag.encode()
+    doc_number_pattern, kind_pattern = xml_document_index_patterns[args_array['uspto_xml_format']]
+
+    # Create variables needed to index the file
+    document_index = []
+    offset = 0
+    document = None
+
+    try:
+        zip_file, xml_zip_info = open_xml_zip_member(args_array)
+        if xml_zip_info is None:
+            zip_file.close()
+            log_missing_xml_zip_member(args_array)
+            return False
+        with zip_file.open(xml_zip_info, 'r') as xml_file:
+            # Loop through all lines in the xml file
+            for line in xml_file:
+                # This identifies the start of a single document
+                if start_tag in line:
+                    document = [offset, None, "", ""]
+                # This identifies the end of a single document
+                elif end_tag in line:
+                    if document is not None:
+                        document[1] = offset + len(line)
+                        document_index.append(document)
+                    document = None
+                # Look for the document number and kind until both are found
+                elif document is not None and (document[2] == "" or document[3] == ""):
+                    if document[2] == "":
+                        match = doc_number_pattern.search(line)
+                        if match: document[2] = match.group(1).decode("iso-8859-1").strip()
+                    if document[3] == "":
+                        match = kind_pattern.search(line)
+                        if match: document[3] = match.group(1).decode("iso-8859-1").strip()
+                offset += len(line)
+        zip_file.close()
+
+        # Write the index to file with the zip member details in the first line
+        # so a stale index can be detected
+        with open(get_xml_document_index_file_name(args_array['temp_zip_file_name']), "w") as index_file:
+            index_file.write(xml_zip_info.filename + "|" + str(xml_zip_info.file_size) + "|" + str(xml_zip_info.CRC) + "\n")
+            for document in document_index:
+                index_file.write(str(document[0]) + "|" + str(document[1]) + "|" + document[2] + "|" + document[3] + "\n")
+
+        print('[Built document index for {0} with {1} documents. Time:{2}]'.format(args_array['file_name'], len(document_index), time.time() - start_time))
+        logger.info('Built document index for {0} with {1} documents. Time:{2}'.format(args_array['file_name'], len(document_index), time.time() - start_time))
+        # Return the index as a list of [start_offset, end_offset, doc_number, kind]
+        return document_index
+
+    except Exception as e:
+        print('[Failed to build document index for ' + args_array['temp_zip_file_name'] + ']')
+        logger.error('Failed to build document index for ' + args_array['temp_zip_file_name'])
+        traceback.print_exc()
+        exc_type, exc_obj, exc_tb = sys.exc_info()
+        fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+        logger.error("Exception: " + str(exc_type) + " in Filename: " + str(fname) + " on Line: " + str(exc_tb.tb_lineno) + " Traceback: " + traceback.format_exc())
+        # Return None to signal failed status
+        return None
+
+# Returns the document index for the zip file, reading it from the index file
+# if it matches the zip file or building it otherwise
+def get_xml_document_index(args_array):
+
+    index_file_name = get_xml_document_index_file_name(args_array['temp_zip_file_name'])
+
+    # Check for a previously built index
+    if os.path.isfile(index_file_name):
+        try:
+            zip_file, xml_zip_info = open_xml_zip_member(args_array)
+            zip_file.close()
+            if xml_zip_info is None:
+                log_missing_xml_zip_member(args_array)
+                return False
+            with open(index_file_name, "r") as index_file:
+                header = index_file.readline().rstrip("\n")
+                # Only use the index if it was built from the same zip member
+                if header == xml_zip_info.filename + "|" + str(xml_zip_info.file_size) + "|" + str(xml_zip_info.CRC):
+                    document_index = []
+                    for line in index_file:
+                        item = line.rstrip("\n").split("|")
+                        document_index.append([int(item[0]), int(item[1]), item[2], item[3]])
+                    return document_index
+        except Exception as e:
+            traceback.print_exc()
+
+    # Build the index if there is no valid index file
+    return build_xml_document_index(args_array)
+
+# Yields the lines of the XML file in the zip file between two byte offsets
+# taken from the document index.  The lines can be passed to split_xml_documents.
+# IOError is raised if the zip file has no XML file.
+def read_xml_document_lines(args_array, start_offset, end_offset):
+
+    zip_file, xml_zip_info = open_xml_zip_member(args_array)
+    try:
+        if xml_zip_info is None:
+            log_missing_xml_zip_member(args_array)
+            raise IOError("No .xml or .sgml file found in zip file " + args_array['temp_zip_file_name'])
+        with zip_file.open(xml_zip_info, 'r') as xml_file:
+            # Seek to the start of the first document
+            xml_file.seek(start_offset)
+            offset = start_offset
+            # Read lines until the end of the last document
+            while offset < end_offset:
+                line = xml_file.readline()
+                if not line:
+                    break
+                offset += len(line)
+                yield line
+    finally:
+        zip_file.close()
+
+# Removes the document index for a zip file
+def delete_xml_document_index(zip_file_name):
+    index_file_name = get_xml_document_index_file_name(zip_file_name)
+    if os.path.exists(index_file_name):
+        os.remove(index_file_name)
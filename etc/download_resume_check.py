@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# USPTOParser: Check Resumable Downloads
+# Description: Runs download_url_to_file against a local http.server stand-in for
+# the bulk data server and checks that partial downloads are resumed, restarted
+# or rejected as expected.
+#
+# Usage: python download_resume_check.py
+
+# Import Modules
+import os
+import sys
+import io
+import hashlib
+import zipfile
+import tempfile
+import threading
+import http.server
+
+# Import USPTO Parser Functions from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import USPTOProcessLinks
+
+# Returns the bytes of a .zip file holding one XML file
+def build_zip_file(xml_string):
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("ipg000000.xml", xml_string)
+    return zip_buffer.getvalue()
+
+# Returns an ETag header value of the MD5 hash of the content
+def md5_etag(content):
+    return '"' + hashlib.md5(content).hexdigest() + '"'
+
+# Request handler that serves one file.  The content, ETag and whether Range
+# requests are answered are set on the server, and the headers of each request
+# are kept so the checks can look at them.
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server = self.server
+        server.request_headers.append(dict(self.headers))
+        content = server.content
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+
+        # Answer a Range request unless the file changed since the If-Range ETag
+        if server.honor_range and range_header and (if_range is None or if_range == server.etag):
+            start = int(range_header.split("=")[1].split("-")[0])
+            if start >= len(content):
+                self.send_response(416)
+                self.send_header("Content-Range", "bytes */" + str(len(content)))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes " + str(start) + "-" + str(len(content) - 1) + "/" + str(len(content)))
+            body = content[start:]
+        else:
+            self.send_response(200)
+            body = content
+        self.send_header("Content-Length", str(len(body)))
+        if server.etag is not None:
+            self.send_header("ETag", server.etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    # Keep the request log out of the check output
+    def log_message(self, format, *args):
+        pass
+
+# Start the stand-in server on a free local port
+def start_server():
+    server = http.server.HTTPServer(("127.0.0.1", 0), StandInHandler)
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.daemon = True
+    server_thread.start()
+    return server
+
+# Set up the server and the downloads directory for a check, run the download
+# and return the error raised, if any
+def run_download(server, download_dirpath, content, etag, honor_range, part_content=None, stored_etag=None):
+    server.content = content
+    server.etag = etag
+    server.honor_range = honor_range
+    server.request_headers = []
+    file_path = os.path.join(download_dirpath, "ipg000000.zip")
+    for path in [file_path, file_path + ".part", file_path + ".etag"]:
+        if os.path.exists(path):
+            os.remove(path)
+    if part_content is not None:
+        with open(file_path + ".part", 'wb') as part_file:
+            part_file.write(part_content)
+    if stored_etag is not None:
+        with open(file_path + ".etag", 'w') as etag_file:
+            etag_file.write(stored_etag)
+    try:
+        USPTOProcessLinks.download_url_to_file("http://127.0.0.1:" + str(server.server_port) + "/ipg000000.zip", file_path)
+        return file_path, None
+    except Exception as e:
+        return file_path, e
+
+# Returns the content of a file, or None if it does not exist
+def read_file(file_path):
+    if not os.path.isfile(file_path):
+        return None
+    with open(file_path, 'rb') as downloaded_file:
+        return downloaded_file.read()
+
+# Main Function
+if __name__ == "__main__":
+
+    content = build_zip_file("<us-patent-grant>" + "x" * 100000 + "</us-patent-grant>")
+    changed_content = build_zip_file("<us-patent-grant>" + "y" * 100000 + "</us-patent-grant>")
+    half = len(content) // 2
+    server = start_server()
+    failures = 0
+
+    with tempfile.TemporaryDirectory() as download_dirpath:
+
+        checks = []
+
+        # A .part file is resumed with a Range request answered with 206
+        file_path, error = run_download(server, download_dirpath, content, md5_etag(content), True, content[:half], md5_etag(content))
+        checks.append(("resume with 206", error is None and read_file(file_path) == content and server.request_headers[0].get("Range") == "bytes=" + str(half) + "-" and server.request_headers[0].get("If-Range") == md5_etag(content)))
+
+        # A server that ignores the Range header and answers 200 restarts the download
+        file_path, error = run_download(server, download_dirpath, content, md5_etag(content), False, content[:half])
+        checks.append(("server ignores Range and answers 200", error is None and read_file(file_path) == content))
+
+        # A complete .part file is answered with 416 and moved into place
+        file_path, error = run_download(server, download_dirpath, content, md5_etag(content), True, content)
+        checks.append(("416 on a complete .part file", error is None and read_file(file_path) == content))
+
+        # A file that changed upstream is downloaded again instead of appended to
+        file_path, error = run_download(server, download_dirpath, changed_content, '"changed"', True, content[:half], md5_etag(content))
+        checks.append(("If-Range with a changed ETag answers 200", error is None and read_file(file_path) == changed_content))
+
+        # A download that does not match the MD5 ETag is removed
+        file_path, error = run_download(server, download_dirpath, content, md5_etag(changed_content), True)
+        checks.append(("ETag MD5 mismatch", isinstance(error, IOError) and read_file(file_path) is None and read_file(file_path + ".part") is None))
+
+        # A truncated .zip file is removed
+        file_path, error = run_download(server, download_dirpath, content[:half], None, True)
+        checks.append(("truncated .zip file", isinstance(error, IOError) and read_file(file_path) is None and read_file(file_path + ".part") is None))
+
+        for check_name, passed in checks:
+            print(("[OK] " if passed else "[FAILED] ") + check_name)
+            if not passed:
+                failures += 1
+
+    server.shutdown()
+    if failures:
+        print("Found " + str(failures) + " failed checks")
+        sys.exit(1)
+    print("All download checks passed")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# USPTOParser: Compare Sanitizers
+# Description: Checks that USPTOSanitizer.decode_line, the replace_*_html_characters
+# functions and the single pass document sanitizer used by USPTOXMLSplitter.py
+# give byte-for-byte the same output as the original line by line functions.
+# Runs on a generated corpus, and on any bulk data .xml or .zip files passed.
+#
+# Usage: python sanitizer_compare.py [.xml or .zip bulk data files...]
+
+# Import Modules
+import os
+import re
+import sys
+import random
+import zipfile
+
+# Import USPTO Parser Functions from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import USPTOSanitizer
+import USPTOXMLSplitter
+
+# Original decode_line without the error handling
+def original_decode_line(line):
+    line = line.decode('iso-8859-1').encode("utf-8", 'ignore')
+    line = line.decode("utf-8", 'ignore')
+    return line
+
+# Original replace_new_html_characters without the error handling
+def original_replace_new_html_characters(line):
+    pattern = re.compile(r"\&#x[A-Za-z0-9]{1,}\;")
+    line = re.sub(pattern, "", line)
+    line = line.replace("|", "")
+    line = line.replace("\n", "")
+    line = line.replace("\t", "")
+    return line
+
+# Original replace_old_html_characters without the error handling
+def original_replace_old_html_characters(line):
+    pattern = re.compile(r"\&[A-Za-z0-9]{1,}\;")
+    line = re.sub(pattern, "", line)
+    line = line.replace("|", "")
+    line = line.replace("\n", "")
+    line = line.replace("\t", "")
+    return line
+
+original_sanitizers = {
+    "replace_new_html_characters" : original_replace_new_html_characters,
+    "replace_old_html_characters" : original_replace_old_html_characters
+}
+
+# Builds random lines from the characters that matter to the sanitizers
+def build_corpus(line_count):
+    random.seed(0)
+    pieces = [b"&#x2014;", b"&#x0A;", b"&amp;", b"&lt;", b"&#x;", b"&;", b"&#xZZ9", b"&&#x1;#x2;", b"|", b"\t", b"\r", b"<p>", b"</p>", b"abc", b"123", b" "]
+    corpus = [bytes(range(256)) + b"\n"]
+    for i in range(line_count):
+        line = b"".join(random.choice(pieces) if random.random() < 0.7 else bytes([random.randrange(256)]) for j in range(random.randrange(40)))
+        corpus.append(line.replace(b"\n", b"") + b"\n")
+    return corpus
+
+# Compares the functions on each line and on each group of lines as one document
+def compare_lines(lines, sanitizer_name, document_size=50):
+
+    original_sanitizer = original_sanitizers[sanitizer_name]
+    sanitizer = getattr(USPTOSanitizer, sanitizer_name)
+    html_character_pattern = USPTOSanitizer.document_html_character_patterns[sanitizer_name]
+    mismatches = 0
+
+    for line in lines:
+        if USPTOSanitizer.decode_line(line) != original_decode_line(line):
+            print("decode_line mismatch: " + repr(line))
+            mismatches += 1
+        if sanitizer(original_decode_line(line)) != original_sanitizer(original_decode_line(line)):
+            print(sanitizer_name + " mismatch: " + repr(line))
+            mismatches += 1
+
+    for i in range(0, len(lines), document_size):
+        document_lines = lines[i:i + document_size]
+        original_document = "".join(original_sanitizer(original_decode_line(line)) for line in document_lines)
+        document = USPTOSanitizer.sanitize_document_bytes(b"".join(document_lines), html_character_pattern)
+        if document.encode("utf-8") != original_document.encode("utf-8"):
+            print("sanitize_document_bytes mismatch in lines " + str(i) + " to " + str(i + len(document_lines)))
+            mismatches += 1
+
+    return mismatches
+
+# Reads the lines of a bulk data .xml file, or the .xml file in a .zip file
+def read_file_lines(file_name):
+    if file_name.lower().endswith(".zip"):
+        with zipfile.ZipFile(file_name, 'r') as zip_file:
+            for zip_info in zip_file.infolist():
+                if zip_info.filename.lower().endswith('.xml') or zip_info.filename.lower().endswith('.sgml'):
+                    with zip_file.open(zip_info, 'r') as xml_file:
+                        return xml_file.readlines()
+    with open(file_name, "rb") as xml_file:
+        return xml_file.readlines()
+
+# Main Function
+if __name__ == "__main__":
+
+    mismatches = 0
+
+    # Check the generated corpus with both sanitizers
+    corpus = build_corpus(100000)
+    for sanitizer_name in original_sanitizers:
+        mismatches += compare_lines(corpus, sanitizer_name)
+        print("Checked " + str(len(corpus)) + " generated lines with " + sanitizer_name)
+
+    # Check the bulk data files with the sanitizer of their XML format
+    for file_name in sys.argv[1:]:
+        lines = read_file_lines(file_name)
+        for xml_format, (start_tag, end_tag, root_tag, sanitizer_name) in USPTOXMLSplitter.xml_document_formats.items():
+            if start_tag.encode() in b"".join(lines[:1000]):
+                mismatches += compare_lines(lines, sanitizer_name)
+                print("Checked " + str(len(lines)) + " lines of " + file_name + " with " + sanitizer_name)
+                break
+
+    if mismatches:
+        print("Found " + str(mismatches) + " mismatches")
+        sys.exit(1)
+    print("All sanitizer output matches the original functions")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# USPTOParser: Benchmark XML Parsers
+# Description: Splits, parses and extracts every document in weekly bulk data
+# .zip files with ElementTree and with lxml, prints the time taken by each and
+# checks that both give the same processed data for every document.
+#
+# Usage: python xml_backend_benchmark.py [weekly grant or application .zip files...]
+
+# Import Modules
+import os
+import sys
+import time
+import zipfile
+
+# Import USPTO Parser Functions from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import USPTOProcessLinks
+import USPTOXMLSplitter
+
+# Parsers to compare and the command_args used to select each one
+xml_parser_backends = {
+    "etree" : {},
+    "lxml" : {"lxml" : True}
+}
+
+# Split, parse and extract all documents in a bulk data .zip file and return
+# the processed data of each document, the time taken and the part of that
+# time spent in the extraction modules
+def run_backend(zip_file_name, command_args):
+
+    args_array = {
+        "command_args" : command_args,
+        "uspto_xml_format" : USPTOProcessLinks.return_file_format_from_filename(os.path.basename(zip_file_name)),
+        "url_link" : zip_file_name,
+        "file_name" : os.path.basename(zip_file_name).split(".")[0],
+        "document_type" : "grant" if os.path.basename(zip_file_name).startswith(("ipg", "pg")) else "application",
+        "temp_zip_file_name" : zip_file_name
+    }
+
+    processed_data = []
+    extract_time = 0
+    start_time = time.time()
+    zip_file, xml_zip_info = USPTOXMLSplitter.open_xml_zip_member(args_array)
+    with zip_file.open(xml_zip_info, 'r') as xml_file:
+        for document_root in USPTOXMLSplitter.split_xml_documents(xml_file, args_array):
+            extract_start_time = time.time()
+            processed_data.append(USPTOProcessLinks.extract_data_router(document_root, args_array))
+            extract_time += time.time() - extract_start_time
+    zip_file.close()
+    return processed_data, time.time() - start_time, extract_time
+
+# Main Function
+if __name__ == "__main__":
+
+    if len(sys.argv) < 2:
+        print("Usage: python xml_backend_benchmark.py [weekly grant or application .zip files...]")
+        sys.exit(1)
+    if USPTOXMLSplitter.lxml is None:
+        print("The lxml module is required.  Install it with: pip install lxml")
+        sys.exit(1)
+
+    mismatches = 0
+
+    for zip_file_name in sys.argv[1:]:
+        results = {}
+        for backend, command_args in xml_parser_backends.items():
+            results[backend] = run_backend(zip_file_name, command_args)
+            print(zip_file_name + " " + backend + ": " + str(len(results[backend][0])) + " documents in {0:.2f} seconds, {1:.2f} seconds extracting".format(results[backend][1], results[backend][2]))
+        print(zip_file_name + " lxml speedup: {0:.2f}x".format(results["etree"][1] / results["lxml"][1]))
+
+        # Check that both parsers give the same processed data
+        if len(results["etree"][0]) != len(results["lxml"][0]):
+            print(zip_file_name + " document count mismatch")
+            mismatches += 1
+        for document_number, (etree_data, lxml_data) in enumerate(zip(results["etree"][0], results["lxml"][0])):
+            if etree_data != lxml_data:
+                print(zip_file_name + " processed data mismatch in document " + str(document_number))
+                mismatches += 1
+
+    if mismatches:
+        print("Found " + str(mismatches) + " mismatches")
+        sys.exit(1)
+    print("Both parsers gave the same processed data")
@@ -675,6 +675,63 @@ CREATE TABLE IF NOT EXISTS uspto.STARTED_FILES (
   FileName VARCHAR(45),
   PRIMARY KEY (FileName));
 
+-- -----------------------------------------------------
+-- Table uspto.BULK_LOAD_ERRORS
+-- -----------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS uspto.BULK_LOAD_ERRORS (
+  TableName VARCHAR(45),
+  FileName VARCHAR(45),
+  ErrorType VARCHAR(45),
+  RowData TEXT,
+  ErrorDate TIMESTAMP DEFAULT NOW());
+
+-- -----------------------------------------------------
+-- FileName indexes used to remove the records of a file
+-- -----------------------------------------------------
+
+CREATE INDEX IF NOT EXISTS application_pair_filename_idx ON uspto.APPLICATION_PAIR (FileName);
+CREATE INDEX IF NOT EXISTS application_filename_idx ON uspto.APPLICATION (FileName);
+CREATE INDEX IF NOT EXISTS grant_filename_idx ON uspto.GRANT (FileName);
+CREATE INDEX IF NOT EXISTS intclass_a_filename_idx ON uspto.INTCLASS_A (FileName);
+CREATE INDEX IF NOT EXISTS cpcclass_a_filename_idx ON uspto.CPCCLASS_A (FileName);
+CREATE INDEX IF NOT EXISTS usclass_a_filename_idx ON uspto.USCLASS_A (FileName);
+CREATE INDEX IF NOT EXISTS inventor_a_filename_idx ON uspto.INVENTOR_A (FileName);
+CREATE INDEX IF NOT EXISTS attorney_p_filename_idx ON uspto.ATTORNEY_P (FileName);
+CREATE INDEX IF NOT EXISTS foreignpriority_a_filename_idx ON uspto.FOREIGNPRIORITY_A (FileName);
+CREATE INDEX IF NOT EXISTS transaction_p_filename_idx ON uspto.TRANSACTION_P (FileName);
+CREATE INDEX IF NOT EXISTS correspondence_p_filename_idx ON uspto.CORRESPONDENCE_P (FileName);
+CREATE INDEX IF NOT EXISTS continuityparent_p_filename_idx ON uspto.CONTINUITYPARENT_P (FileName);
+CREATE INDEX IF NOT EXISTS continuitychild_p_filename_idx ON uspto.CONTINUITYCHILD_P (FileName);
+CREATE INDEX IF NOT EXISTS adjustment_p_filename_idx ON uspto.ADJUSTMENT_P (FileName);
+CREATE INDEX IF NOT EXISTS adjustmentdesc_p_filename_idx ON uspto.ADJUSTMENTDESC_P (FileName);
+CREATE INDEX IF NOT EXISTS extension_p_filename_idx ON uspto.EXTENSION_P (FileName);
+CREATE INDEX IF NOT EXISTS extensiondesc_p_filename_idx ON uspto.EXTENSIONDESC_P (FileName);
+CREATE INDEX IF NOT EXISTS agent_a_filename_idx ON uspto.AGENT_A (FileName);
+CREATE INDEX IF NOT EXISTS assignee_a_filename_idx ON uspto.ASSIGNEE_A (FileName);
+CREATE INDEX IF NOT EXISTS applicant_a_filename_idx ON uspto.APPLICANT_A (FileName);
+CREATE INDEX IF NOT EXISTS usclass_c_filename_idx ON uspto.USCLASS_C (FileName);
+CREATE INDEX IF NOT EXISTS cpcclass_c_filename_idx ON uspto.CPCCLASS_C (FileName);
+CREATE INDEX IF NOT EXISTS uscpc_c_filename_idx ON uspto.USCPC_C (FileName);
+CREATE INDEX IF NOT EXISTS wipost3_c_filename_idx ON uspto.WIPOST3_C (FileName);
+CREATE INDEX IF NOT EXISTS intclass_g_filename_idx ON uspto.INTCLASS_G (FileName);
+CREATE INDEX IF NOT EXISTS cpcclass_g_filename_idx ON uspto.CPCCLASS_G (FileName);
+CREATE INDEX IF NOT EXISTS nonpatcit_g_filename_idx ON uspto.NONPATCIT_G (FileName);
+CREATE INDEX IF NOT EXISTS applicant_g_filename_idx ON uspto.APPLICANT_G (FileName);
+CREATE INDEX IF NOT EXISTS inventor_g_filename_idx ON uspto.INVENTOR_G (FileName);
+CREATE INDEX IF NOT EXISTS usclass_g_filename_idx ON uspto.USCLASS_G (FileName);
+CREATE INDEX IF NOT EXISTS agent_g_filename_idx ON uspto.AGENT_G (FileName);
+CREATE INDEX IF NOT EXISTS assignee_g_filename_idx ON uspto.ASSIGNEE_G (FileName);
+CREATE INDEX IF NOT EXISTS examiner_g_filename_idx ON uspto.EXAMINER_G (FileName);
+CREATE INDEX IF NOT EXISTS gracit_g_filename_idx ON uspto.GRACIT_G (FileName);
+CREATE INDEX IF NOT EXISTS forpatcit_g_filename_idx ON uspto.FORPATCIT_G (FileName);
+CREATE INDEX IF NOT EXISTS foreignpriority_g_filename_idx ON uspto.FOREIGNPRIORITY_G (FileName);
+CREATE INDEX IF NOT EXISTS case_l_filename_idx ON uspto.CASE_L (FileName);
+CREATE INDEX IF NOT EXISTS attorney_l_filename_idx ON uspto.ATTORNEY_L (FileName);
+CREATE INDEX IF NOT EXISTS party_l_filename_idx ON uspto.PARTY_L (FileName);
+CREATE INDEX IF NOT EXISTS patent_l_filename_idx ON uspto.PATENT_L (FileName);
+CREATE INDEX IF NOT EXISTS bulk_load_errors_filename_idx ON uspto.BULK_LOAD_ERRORS (FileName);
+
 -- -----------------------------------------------------
 -- Create PostgreSQL Users
 -- -----------------------------------------------------
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# USPTOParser: Create Partitioned PostgreSQL Schema
+# Description: Reads the PostgreSQL database creation script and writes a version of it
+# where the data tables are partitioned by FileName.  USPTOParser.py creates a partition
+# for each file it processes, so processing a file again truncates its partitions instead
+# of deleting its rows from the whole table.
+#
+# Usage: python uspto_create_partitioned_postgresql.py [input .sql file] [output .sql file]
+
+# Import Modules
+import os
+import re
+import sys
+
+# Tables that are not partitioned
+unpartitioned_table_array = [
+    "STARTED_FILES",
+    "BULK_LOAD_ERRORS"
+]
+
+# Matches each CREATE TABLE statement in the creation script
+create_table_pattern = re.compile(r"(CREATE TABLE IF NOT EXISTS uspto\.(\w+) \((.*?)\));", re.S)
+
+# Returns True if the table can be partitioned by FileName.  The table must
+# have a FileName column and the primary key must include FileName.
+def is_partitionable_table(table_name, table_columns):
+    if table_name in unpartitioned_table_array:
+        return False
+    if not re.search(r"^\s*FileName\s", table_columns, re.M):
+        return False
+    primary_key = re.search(r"PRIMARY KEY \(([^)]*)\)", table_columns)
+    if primary_key and "FileName" not in [column.strip() for column in primary_key.group(1).split(",")]:
+        return False
+    return True
+
+# Build the partitioned creation script from the creation script
+def build_partitioned_schema(schema_sql):
+
+    partitioned_table_array = []
+
+    # Add PARTITION BY to each partitionable table and create a default
+    # partition for rows with a FileName that has no partition
+    def partition_table(match):
+        create_table_sql, table_name, table_columns = match.groups()
+        if not is_partitionable_table(table_name, table_columns):
+            return match.group(0)
+        partitioned_table_array.append(table_name)
+        return create_table_sql + " PARTITION BY LIST (FileName);\n\n" + "CREATE TABLE IF NOT EXISTS uspto." + table_name + "_DEFAULT PARTITION OF uspto." + table_name + " DEFAULT;"
+
+    schema_sql = create_table_pattern.sub(partition_table, schema_sql)
+
+    # Each partition holds a single file so the FileName indexes are not needed
+    for table_name in partitioned_table_array:
+        schema_sql = re.sub(r"CREATE INDEX IF NOT EXISTS \w+ ON uspto\." + table_name + r" \(FileName\);\n", "", schema_sql)
+
+    return schema_sql, partitioned_table_array
+
+# Main Function
+if __name__ == "__main__":
+
+    # Get the input and output filenames
+    installation_dirpath = os.path.dirname(os.path.abspath(__file__))
+    if len(sys.argv) > 1: schema_file_name = sys.argv[1]
+    else: schema_file_name = installation_dirpath + "/uspto_create_database_postgresql.sql"
+    if len(sys.argv) > 2: partitioned_schema_file_name = sys.argv[2]
+    else: partitioned_schema_file_name = installation_dirpath + "/uspto_create_database_postgresql_partitioned.sql"
+
+    # Read the creation script and write the partitioned version
+    with open(schema_file_name, "r") as schema_file:
+        schema_sql = schema_file.read()
+    partitioned_schema_sql, partitioned_table_array = build_partitioned_schema(schema_sql)
+    with open(partitioned_schema_file_name, "w") as partitioned_schema_file:
+        partitioned_schema_file.write(partitioned_schema_sql)
+
+    print("Partitioned " + str(len(partitioned_table_array)) + " tables by FileName: " + ", ".join(partitioned_table_array))
+    print("Partitioned schema written to: " + partitioned_schema_file_name)